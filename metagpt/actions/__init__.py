@@ -5,60 +5,43 @@
 @Author  : alexanderwu
 @File    : __init__.py
 """
-from enum import Enum
-
-from metagpt.actions.action import Action
-from metagpt.actions.action_output import ActionOutput
-from metagpt.actions.add_requirement import UserRequirement
-from metagpt.actions.debug_error import DebugError
-from metagpt.actions.design_api_review import DesignReview
-from metagpt.actions.project_management import WriteTasks
-from metagpt.actions.research import CollectLinks, WebBrowseAndSummarize, ConductResearch
-from metagpt.actions.prepare_documents import PrepareDocuments_Predefined_Requirement, PrepareEvaluatorDocuments
-from metagpt.actions.speak import Speak
-from metagpt.actions.chunk_inspection import ChunkInspection
-from metagpt.actions.run_code import RunCode
-from metagpt.actions.summarize import Summarize
-from metagpt.actions.review import Review
-from metagpt.actions.score import Score
-from metagpt.actions.search_and_summarize import SearchAndSummarize
-from metagpt.actions.notebook_convert import NotebookConvert
-from metagpt.actions.code_intepretation import CodeIntepretation
-from metagpt.actions.write_code import WriteCode
-from metagpt.actions.write_code_review import WriteCodeReview
-from archive.write_prd import WritePRD
-from archive.write_prd_review import WritePRDReview
-from metagpt.actions.write_test import WriteTest
-
-
-class ActionType(Enum):
-    """All types of Actions, used for indexing."""
-
-    ADD_REQUIREMENT = UserRequirement
-    WRITE_PRD = WritePRD
-    WRITE_PRD_REVIEW = WritePRDReview
-    DESIGN_REVIEW = DesignReview
-    WRTIE_CODE = WriteCode
-    WRITE_CODE_REVIEW = WriteCodeReview
-    WRITE_TEST = WriteTest
-    RUN_CODE = RunCode
-    DEBUG_ERROR = DebugError
-    WRITE_TASKS = WriteTasks
-    SEARCH_AND_SUMMARIZE = SearchAndSummarize
-    COLLECT_LINKS = CollectLinks
-    WEB_BROWSE_AND_SUMMARIZE = WebBrowseAndSummarize
-    CONDUCT_RESEARCH = ConductResearch
-    NOTEBOOK_CONVERT = NotebookConvert
-    CODE_INTERPRETATION = CodeIntepretation
-    CHUNK_INSPECTION = ChunkInspection
-    SPEAK = Speak
-    PREPARE_DOCUMENTS = PrepareDocuments_Predefined_Requirement
-    PREPARE_EVALUATOR_DOCUMENTS = PrepareEvaluatorDocuments
-    REVIEW = Review
-    SUMMARIZE = Summarize
-    SCORE = Score
-
+from metagpt.utils.lazy_import import lazy_attributes
 
+# Actions are imported on first use, some of them pull in the RAG stack, browsers or the notebook runtime
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "ActionType": "metagpt.actions.action_type",
+        "Action": "metagpt.actions.action",
+        "ActionOutput": "metagpt.actions.action_output",
+        "UserRequirement": "metagpt.actions.add_requirement",
+        "DebugError": "metagpt.actions.debug_error",
+        "DesignReview": "metagpt.actions.design_api_review",
+        "WriteTasks": "metagpt.actions.project_management",
+        "CollectLinks": "metagpt.actions.research",
+        "WebBrowseAndSummarize": "metagpt.actions.research",
+        "ConductResearch": "metagpt.actions.research",
+        "PrepareDocuments_Predefined_Requirement": "metagpt.actions.prepare_documents",
+        "PrepareEvaluatorDocuments": "metagpt.actions.prepare_documents",
+        "Speak": "metagpt.actions.speak",
+        "ChunkInspection": "metagpt.actions.chunk_inspection",
+        "RunCode": "metagpt.actions.run_code",
+        "Summarize": "metagpt.actions.summarize",
+        "Review": "metagpt.actions.review",
+        "Score": "metagpt.actions.score",
+        "SearchAndSummarize": "metagpt.actions.search_and_summarize",
+        "NotebookConvert": "metagpt.actions.notebook_convert",
+        "CodeIntepretation": "metagpt.actions.code_intepretation",
+        "WriteCode": "metagpt.actions.write_code",
+        "WriteCodeReview": "metagpt.actions.write_code_review",
+        "WritePRD": "archive.write_prd",
+        "WritePRDReview": "archive.write_prd_review",
+        "WriteTest": "metagpt.actions.write_test",
+        "ExecuteNbCode": "metagpt.actions.di.execute_nb_code",
+        "WriteAnalysisCode": "metagpt.actions.di.write_analysis_code",
+        "WritePlan": "metagpt.actions.di.write_plan",
+    },
+)
 
 __all__ = [
     "ActionType",
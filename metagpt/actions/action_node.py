@@ -11,18 +11,20 @@ NOTE: You should use typing.List instead of list to do type annotation. Because
 import json
 import typing
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
 
 from pydantic import BaseModel, Field, create_model, model_validator
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_random_exponential
 
 from metagpt.actions.action_outcls_registry import register_action_outcls
 from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.llm import BaseLLM
-from metagpt.logs import logger
+from metagpt.logs import listen_llm_stream, logger
 from metagpt.provider.postprocess.llm_output_postprocess import llm_output_postprocess
 from metagpt.utils.common import OutputParser, general_after_log
 from metagpt.utils.human_interaction import HumanInteraction
+from metagpt.utils.llm_cache import LLMCacheMissError, discard_cached_response
+from metagpt.utils.stream_parser import StreamingOutputParser
 
 
 class ReviewMode(Enum):
@@ -412,6 +414,7 @@ class ActionNode:
         wait=wait_random_exponential(min=1, max=20),
         stop=stop_after_attempt(6),
         after=general_after_log(logger),
+        retry=retry_if_not_exception_type(LLMCacheMissError),
     )
     async def _aask_v1(
         self,
@@ -422,21 +425,35 @@ class ActionNode:
         system_msgs: Optional[list[str]] = None,
         schema="markdown",  # compatible to original format
         timeout=USE_CONFIG_TIMEOUT,
+        on_field: Optional[Callable[[str, Any], None]] = None,
     ) -> (str, BaseModel):
-        """Use ActionOutput to wrap the output of aask"""
-        content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
-        logger.debug(f"llm raw output:\n{content}")
+        """Use ActionOutput to wrap the output of aask.
+        With the json schema, fields are validated while the output streams, an invalid one aborts the attempt early.
+        on_field is called with each field as soon as its value is complete, again if the attempt is retried.
+        """
         output_class = self.create_model_class(output_class_name, output_data_mapping)
-
-        if schema == "json":
-            parsed_data = llm_output_postprocess(
-                output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
-            )
-        else:  # using markdown parser
-            parsed_data = OutputParser.parse_data_with_mapping(content, output_data_mapping)
-
-        logger.debug(f"parsed_data:\n{parsed_data}")
-        instruct_content = output_class(**parsed_data)
+        parser = StreamingOutputParser(output_class, req_key=f"[{TAG}]", on_field=on_field)
+        try:
+            with listen_llm_stream(parser.feed if schema == "json" else lambda _: None):
+                content = await self.llm.aask(prompt, system_msgs, images=images, timeout=timeout)
+            logger.debug(f"llm raw output:\n{content}")
+
+            if schema == "json":
+                parsed_data = llm_output_postprocess(
+                    output=content, schema=output_class.model_json_schema(), req_key=f"[/{TAG}]"
+                )
+            else:  # using markdown parser
+                parsed_data = OutputParser.parse_data_with_mapping(content, output_data_mapping)
+
+            logger.debug(f"parsed_data:\n{parsed_data}")
+            instruct_content = output_class(**parsed_data)
+        except Exception:
+            discard_cached_response()  # the retry must ask the LLM again, not replay the response it failed to parse
+            raise
+        if on_field:  # the fields not streamed, e.g. from a cached or non-stream response
+            for key, value in instruct_content:
+                if key not in parser.fields:
+                    on_field(key, value)
         return content, instruct_content
 
     def get(self, key):
@@ -454,14 +471,20 @@ class ActionNode:
         self.set_recursive("context", context)
 
     async def simple_fill(
-        self, schema, mode, images: Optional[Union[str, list[str]]] = None, timeout=USE_CONFIG_TIMEOUT, exclude=None
+        self,
+        schema,
+        mode,
+        images: Optional[Union[str, list[str]]] = None,
+        timeout=USE_CONFIG_TIMEOUT,
+        exclude=None,
+        on_field: Optional[Callable[[str, Any], None]] = None,
     ):
         prompt = self.compile(context=self.context, schema=schema, mode=mode, exclude=exclude)
         if schema != "raw":
             mapping = self.get_mapping(mode, exclude=exclude)
             class_name = f"{self.key}_AN"
             content, scontent = await self._aask_v1(
-                prompt, class_name, mapping, images=images, schema=schema, timeout=timeout
+                prompt, class_name, mapping, images=images, schema=schema, timeout=timeout, on_field=on_field
             )
             self.content = content
             self.instruct_content = scontent
@@ -481,6 +504,7 @@ class ActionNode:
         images: Optional[Union[str, list[str]]] = None,
         timeout=USE_CONFIG_TIMEOUT,
         exclude=[],
+        on_field: Optional[Callable[[str, Any], None]] = None,
     ):
         """Fill the node(s) with mode.
 
@@ -500,6 +524,7 @@ class ActionNode:
         :param images: the list of image url or base64 for gpt4-v
         :param timeout: Timeout for llm invocation.
         :param exclude: The keys of ActionNode to exclude.
+        :param on_field: Called with the key and the value of each output field as soon as it is generated.
         :return: self
         """
         self.set_llm(llm)
@@ -508,14 +533,18 @@ class ActionNode:
             schema = self.schema
 
         if strgy == "simple":
-            return await self.simple_fill(schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude)
+            return await self.simple_fill(
+                schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude, on_field=on_field
+            )
         elif strgy == "complex":
             # 这里隐式假设了拥有children
             tmp = {}
             for _, i in self.children.items():
                 if exclude and i.key in exclude:
                     continue
-                child = await i.simple_fill(schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude)
+                child = await i.simple_fill(
+                    schema=schema, mode=mode, images=images, timeout=timeout, exclude=exclude, on_field=on_field
+                )
                 tmp.update(child.instruct_content.model_dump())
             cls = self._create_children_class()
             self.instruct_content = cls(**tmp)
@@ -1,14 +1,20 @@
-import shutil
-from pathlib import Path
+import asyncio
+import json
+import os
 import re
+import tempfile
+from pathlib import Path
 from typing import Optional, TYPE_CHECKING
 
-from metagpt.actions import Action, ActionOutput
-from metagpt.const import INTEPRETATION_FILENAME, RAG_ENGINE_DIR, EVAL_RAG_ENGINE_DIR
-from metagpt.schema import Message
+from llama_index.core.schema import NodeWithScore
+
+from metagpt.actions import Action
+from metagpt.const import RAG_ENGINE_DIR, EVAL_RAG_ENGINE_DIR, EVAL_CHECKPOINT_FILENAME
 from metagpt.logs import logger
+from metagpt.provider.llm_scheduler import LLMPriority, llm_priority
 from metagpt.rag.schema import FAISSIndexConfig
 from metagpt.rag.engines import SimpleEngine
+from metagpt.utils.common import NoMoneyException, read_json_file
 
 # Type checking imports for better IDE support
 if TYPE_CHECKING:
@@ -17,10 +23,26 @@ if TYPE_CHECKING:
     from metagpt.roles import Evaluator, Reviewer, Summarizer
     from metagpt.roles import Scorer
 
+# Comprehensive evaluation standards shared by every chunk debate
+EVALUATION_STANDARDS = [
+    "Confirm that all core functionalities and workflows from the original code (e.g., critical functions, input-output behaviors, side effects) still exist and produce the same outcomes in the modularized version.",
+    "Check if functionality is split into modules based on coherent responsibilities (e.g., a module focused on user interfaces, another on core business logic, etc.) without creating unnecessary fragmentation or inter-dependencies.",
+    "Ensure constant values, configuration settings, or environment references are unchanged and are now placed in the most logical module or file (e.g., a dedicated config module) without scattering them throughout the code.",
+    "Verify that each module imports only what it needs (no unused or redundant imports) and that any external dependencies required by the original code are still present and correctly imported in the relevant module(s).",
+    "Look for any syntactical mistakes, incorrect function signatures, or missing references that would prevent the code from executing. Confirm that module-to-module references (e.g., from foo import bar) match what's actually defined in the respective files.",
+    "Confirm that functions, classes, and variables keep consistent naming with the original code, unless changed to improve clarity. In those cases, verify that references to the old names have been updated across all modules.",
+    "Check that the order of function calls and the way parameters are passed among modules mirror the original logic. Any new abstractions should not alter the fundamental control flow or expected input-output transformations.",
+    "Confirm that docstrings, inline comments, and other documentation from the original code are preserved or enhanced to explain the newly introduced module boundaries and responsibilities. Look for any missing or outdated references that might confuse future readers.",
+    "Evaluate whether the modularized structure is clearer than the monolithic version. Check that related functions or classes are grouped logically, and that each file has a clear, singular responsibility, making the overall codebase easier to navigate.",
+    "Inspect whether the modularization enables easier future changes, testability, or feature additions. Look for signs of good modular design—such as reduced code duplication, fewer tightly coupled components, and well-defined module interfaces.",
+]
+
 class ChunkInspection(Action):
     """
     Action class responsible for evaluating the quality of code modularization through a multi-agent debate system.
     This class compares original code chunks with their modularized versions and facilitates a structured evaluation process.
+    Chunks are evaluated concurrently, bounded by `config.evaluation_concurrency`, and every finished chunk is
+    recorded in a checkpoint file so that an interrupted evaluation resumes where it stopped.
     """
     name: str = "ChunkIntepretation"
     i_context: Optional[str] = None  # Optional context for interpretation
@@ -35,47 +57,112 @@ class ChunkInspection(Action):
         """
         Main execution method that:
         1. Sets up RAG engines for both original and modularized code
-        2. Retrieves and compares code chunks
-        3. Initiates multi-agent debates for evaluation
-        4. Judging the evaluation results with a summarizer
+        2. Restores the scores of already evaluated chunks from the checkpoint file
+        3. Evaluates the remaining chunks concurrently, each one through its own multi-agent debate
+           and summarizer wrap-up
+        4. Records every chunk score in the checkpoint as soon as it is available
         5. Calculates final evaluation scores
         
         Returns:
             ActionOutput containing evaluation results
         """
-        # Import roles here to avoid circular imports
-        from metagpt.team import Team
-        from metagpt.environment import Environment 
-        from metagpt.roles import Evaluator, Reviewer, Summarizer
-        from metagpt.roles import Scorer
-       
         # Initialize RAG engine for original code chunks
         chunk_pathname = self.repo.workdir / RAG_ENGINE_DIR
         chunk_config = FAISSIndexConfig(persist_path=chunk_pathname)
-        engine = SimpleEngine.from_index(index_config=chunk_config)
+        engine = SimpleEngine.from_index_cached(index_config=chunk_config)
 
         # Initialize RAG engine for modularized code
         modularized_pathname = self.repo.workdir / EVAL_RAG_ENGINE_DIR
         modularized_config = FAISSIndexConfig(persist_path=modularized_pathname)
-        modularized_engine = SimpleEngine.from_index(index_config=modularized_config)
+        modularized_engine = SimpleEngine.from_index_cached(index_config=modularized_config)
 
         # Get all original code chunks for evaluation
         chunks = engine.retriever._docstore.docs
-        scores = 0
-        
-        # Evaluate each chunk against its modularized version
-        for chunk in chunks:
-            content = chunks[chunk].text
-            
-            # Retrieve corresponding modularized code for comparison
-            nodes = await modularized_engine.aretrieve( 
-                "Please find relative file correspond to the following code "+
-                f"##code content:({content})"
+
+        # Resume from the scores recorded by a previous, interrupted run
+        checkpoint_pathname = self.repo.workdir / EVAL_CHECKPOINT_FILENAME
+        scores = self._load_checkpoint(checkpoint_pathname, chunks)
+        if scores:
+            logger.info(f"Resuming evaluation | {len(scores)}/{len(chunks)} chunks restored from {checkpoint_pathname}")
+
+        # Retrieve the corresponding modularized code of the remaining chunks in one batch
+        remaining = [chunk_id for chunk_id in chunks if chunk_id not in scores]
+        nodes_list = await modularized_engine.aretrieve_many(
+            [
+                "Please find relative file correspond to the following code " + f"##code content:({chunks[chunk_id].text})"
+                for chunk_id in remaining
+            ]
+        )
+
+        # Evaluate the remaining chunks concurrently under a bounded semaphore
+        # Their LLM requests are batch work, which the request scheduler serves after interactive ones
+        semaphore = asyncio.Semaphore(max(1, self.config.evaluation_concurrency))
+        with llm_priority(LLMPriority.BATCH):
+            tasks = [
+                asyncio.create_task(self._evaluate_chunk(chunk_id, chunks[chunk_id].text, nodes, semaphore))
+                for chunk_id, nodes in zip(remaining, nodes_list)
+            ]
+        try:
+            # Stream per-chunk results as soon as each debate finishes
+            for future in asyncio.as_completed(tasks):
+                chunk_id, final_score = await future
+                if final_score is None:
+                    continue
+                scores[chunk_id] = final_score
+                self._save_checkpoint(checkpoint_pathname, scores)
+                logger.info(
+                    f"Chunk evaluated ({len(scores)}/{len(chunks)}) | chunk: {chunk_id} | score: {final_score}"
+                )
+        finally:
+            # Stop the remaining debates if one of them raised, e.g. when the budget is exhausted
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            # Wait for the cancelled debates to unwind, so none of them outlives the action
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if len(scores) < len(chunks):
+            logger.warning(
+                f"Evaluation incomplete | {len(chunks) - len(scores)} chunks failed, "
+                f"rerun to resume from {checkpoint_pathname}"
             )
-            
+            return
+
+        # Calculate and log the total evaluation score
+        total_score = len(chunks) * len(EVALUATION_STANDARDS)
+        logger.info(f"Evaluation completed | Evaluation score: {sum(scores.values())/total_score*100}%")
+        checkpoint_pathname.unlink(missing_ok=True)
+
+    async def _evaluate_chunk(
+        self, chunk_id: str, content: str, nodes: list[NodeWithScore], semaphore: asyncio.Semaphore
+    ) -> tuple[str, Optional[int]]:
+        """
+        Evaluate a single original code chunk against its modularized version.
+
+        Runs the Evaluator/Reviewer debate and the Summarizer/Scorer wrap-up for one chunk, against the modularized
+        code nodes retrieved for it.
+        Every chunk gets its own context sharing the config and the cost manager of the action, so that the
+        budget is enforced across all concurrent debates.
+
+        Returns:
+            A tuple of the chunk id and its score, the score is None if no score could be extracted.
+        """
+        # Import roles here to avoid circular imports
+        from metagpt.context import Context
+        from metagpt.team import Team
+        from metagpt.environment import Environment 
+        from metagpt.roles import Evaluator, Reviewer, Summarizer
+        from metagpt.roles import Scorer
+
+        async with semaphore:
+            cost_manager = self.context.cost_manager
+            if cost_manager.total_cost >= cost_manager.max_budget:
+                raise NoMoneyException(cost_manager.total_cost, f"Insufficient funds: {cost_manager.max_budget}")
+
             # Set up evaluation environment and team
+            debate_ctx = Context(config=self.config, cost_manager=cost_manager)
             debate_env = Environment(desc="Code modularization evaluation")
-            debate_team = Team(investment=10.0, env=debate_env)
+            debate_team = Team(context=debate_ctx, investment=10.0, env=debate_env)
             
             # Prepare context for evaluation debate
             debate_context = f"""
@@ -86,20 +173,6 @@ class ChunkInspection(Action):
             #{"    #".join([node.text for node in nodes])}
             """
 
-            # Define comprehensive evaluation standards
-            evaluation_standards = [
-                "Confirm that all core functionalities and workflows from the original code (e.g., critical functions, input-output behaviors, side effects) still exist and produce the same outcomes in the modularized version.",
-                "Check if functionality is split into modules based on coherent responsibilities (e.g., a module focused on user interfaces, another on core business logic, etc.) without creating unnecessary fragmentation or inter-dependencies.",
-                "Ensure constant values, configuration settings, or environment references are unchanged and are now placed in the most logical module or file (e.g., a dedicated config module) without scattering them throughout the code.",
-                "Verify that each module imports only what it needs (no unused or redundant imports) and that any external dependencies required by the original code are still present and correctly imported in the relevant module(s).",
-                "Look for any syntactical mistakes, incorrect function signatures, or missing references that would prevent the code from executing. Confirm that module-to-module references (e.g., from foo import bar) match what's actually defined in the respective files.",
-                "Confirm that functions, classes, and variables keep consistent naming with the original code, unless changed to improve clarity. In those cases, verify that references to the old names have been updated across all modules.",
-                "Check that the order of function calls and the way parameters are passed among modules mirror the original logic. Any new abstractions should not alter the fundamental control flow or expected input-output transformations.",
-                "Confirm that docstrings, inline comments, and other documentation from the original code are preserved or enhanced to explain the newly introduced module boundaries and responsibilities. Look for any missing or outdated references that might confuse future readers." ,
-                "Evaluate whether the modularized structure is clearer than the monolithic version. Check that related functions or classes are grouped logically, and that each file has a clear, singular responsibility, making the overall codebase easier to navigate.",
-                "Inspect whether the modularization enables easier future changes, testability, or feature additions. Look for signs of good modular design—such as reduced code duplication, fewer tightly coupled components, and well-defined module interfaces."
-                ]
-            
             # Create evaluators with different perspectives
             evaluator1 = Evaluator(
                     name="Bob",
@@ -110,7 +183,7 @@ class ChunkInspection(Action):
                     ),
                     opponent_name="Alice",
                     send_to="Alice",
-                    evaluation_standards=evaluation_standards
+                    evaluation_standards=EVALUATION_STANDARDS
                 )
 
             evaluator2 = Evaluator(
@@ -122,7 +195,7 @@ class ChunkInspection(Action):
                     ),
                     opponent_name="Bob",
                     send_to="Charlie",
-                    evaluation_standards=evaluation_standards
+                    evaluation_standards=EVALUATION_STANDARDS
                 )
 
             # Create reviewer to synthesize evaluations
@@ -160,8 +233,9 @@ class ChunkInspection(Action):
             scorer = Scorer(name="Steven", profile="Senior manager")
 
             # Set up wrap-up environment and team
+            wrapup_ctx = Context(config=self.config, cost_manager=cost_manager)
             wrapup_env = Environment(desc="Code modularization evaluation wrap-up")
-            wrapup_team = Team(investment=10.0, env=wrapup_env)
+            wrapup_team = Team(context=wrapup_ctx, investment=10.0, env=wrapup_env)
 
             wrapup_team.hire([summarizer, scorer])
 
@@ -172,11 +246,34 @@ class ChunkInspection(Action):
                 send_to="Sarah"
             )
 
-            # Extract numerical score from the final answer
-            final_score = int(re.search(r'\d+', final_answer[::-1]).group()[::-1])
-            scores += final_score
+        # Extract numerical score from the final answer
+        match = re.search(r'\d+', final_answer[::-1]) if final_answer else None
+        if not match:
+            logger.warning(f"No score found for chunk {chunk_id}, it will be evaluated again on the next run")
+            return chunk_id, None
+        return chunk_id, int(match.group()[::-1])
 
-        # Calculate and log the total evaluation score
-        total_score =  len(chunks) * len(evaluation_standards)
-        logger.info(f"Evaluation completed | Evaluation score: {scores/total_score*100}%")
-            
+    @staticmethod
+    def _load_checkpoint(pathname, chunks) -> dict[str, int]:
+        """Load the scores of already evaluated chunks, ignoring chunks no longer in the RAG engine"""
+        if not pathname.exists():
+            return {}
+        try:
+            checkpoint = read_json_file(pathname)
+        except ValueError:
+            logger.warning(f"Invalid evaluation checkpoint {pathname}, start from scratch")
+            return {}
+        return {chunk_id: score for chunk_id, score in checkpoint.items() if chunk_id in chunks}
+
+    @staticmethod
+    def _save_checkpoint(pathname: Path, scores: dict[str, int]):
+        """Replace the checkpoint atomically, an interrupted write never leaves a truncated checkpoint"""
+        pathname.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_filename = tempfile.mkstemp(dir=pathname.parent, prefix=f".{pathname.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as writer:
+                json.dump(scores, writer)
+            os.replace(tmp_filename, pathname)
+        except BaseException:
+            Path(tmp_filename).unlink(missing_ok=True)
+            raise
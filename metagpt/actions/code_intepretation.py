@@ -1,14 +1,15 @@
-import shutil
+import asyncio
+import hashlib
+import json
 from pathlib import Path
 from typing import Optional
 
-from metagpt.actions import Action, ActionOutput
-from metagpt.const import RAG_ENGINE_DIR
-from metagpt.schema import Documents
-from metagpt.utils.file_repository import FileRepository
-import json
+from metagpt.actions import Action
+from metagpt.const import INTEPRETATION_CACHE_FILENAME, RAG_ENGINE_DIR
+from metagpt.logs import logger
 from metagpt.rag.engines import SimpleEngine
 from metagpt.rag.schema import LLMRankerConfig, FAISSRetrieverConfig
+from metagpt.utils.common import read_json_file, write_json_file
 
 # System message prompt for code interpretation task
 CODEINTEPRETATIONSYSTEMMSG = """Please explicitly explain the code in the nodes below in few sentences:"""
@@ -18,6 +19,8 @@ class CodeIntepretation(Action):
     
     This class processes code chunks, generates explanations using LLM, and stores
     the results in a RAG (Retrieval Augmented Generation) engine together for better context retrieval.
+    Explanations are cached in the project workdir by a hash of (chunk text, system prompt, model),
+    so only new or changed chunks are sent to the LLM on later runs.
     """
 
     name: str = "CodeIntepretation"  # Name of the action
@@ -34,8 +37,9 @@ class CodeIntepretation(Action):
         
         This method:
         1. Converts input files into nodes for processing
-        2. Generates explanations for each code chunk using LLM
-        3. Creates and persists a RAG engine with the processed nodes
+        2. Generates explanations for each code chunk using LLM, reusing cached explanations
+           and interpreting the remaining chunks concurrently
+        3. Incrementally updates and persists a RAG engine with the processed nodes
         
         Args:
             with_messages: Messages to process
@@ -45,7 +49,6 @@ class CodeIntepretation(Action):
             None - Results are stored in the RAG engine
         """
 
-        intepretations = []  # List to store code interpretations
         workdir = self.repo.scripts.workdir  # Get working directory
         
         # Convert input files to nodes with optimized chunk sizes
@@ -54,29 +57,60 @@ class CodeIntepretation(Action):
             optimize_chunk_size=True
         )
         
-        # Process each node and generate explanations
-        for node in nodes:
-            code = node.text
-            # Get explanation from LLM
-            rsp = await self._aask(code, system_msgs=[CODEINTEPRETATIONSYSTEMMSG])
-            # Append explanation to node text
-            node.text += "\n##The following is the explaination of this part of code:" + rsp
-            intepretations.append(node.text)
+        # Load explanations of previous runs
+        cache_pathname = self.repo.workdir / INTEPRETATION_CACHE_FILENAME
+        cache = self._load_cache(cache_pathname)
+        keys = [self._cache_key(node.text) for node in nodes]
+        misses = {key: node.text for key, node in zip(keys, nodes) if key not in cache}
+        logger.info(f"Code interpretation | {len(nodes) - len(misses)} cached, {len(misses)} to interpret")
+
+        # Get explanations of new or changed chunks from LLM concurrently
+        semaphore = asyncio.Semaphore(max(1, self.config.intepretation_concurrency))
+
+        async def _interpret(key: str, code: str):
+            async with semaphore:
+                cache[key] = await self._aask(code, system_msgs=[CODEINTEPRETATIONSYSTEMMSG])
+
+        results = await asyncio.gather(
+            *[_interpret(key, code) for key, code in misses.items()], return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            # Keep the explanations already paid for, a re-run only interprets the failed chunks
+            write_json_file(cache_pathname, cache)
+            logger.error(f"Code interpretation | {len(errors)} of {len(misses)} chunks failed")
+            raise errors[0]
+
+        # Append explanation to node text
+        for key, node in zip(keys, nodes):
+            node.text += "\n##The following is the explaination of this part of code:" + cache[key]
+
+        # Only keep the explanations of current chunks to bound the cache size
+        write_json_file(cache_pathname, {key: cache[key] for key in keys})
 
         # Configure ranking if enabled
         ranker_configs = [LLMRankerConfig()] if self._use_llm_ranker else None
 
-        # Create RAG engine from processed nodes
-        engine = SimpleEngine.from_nodes_to_engine(
+        # Update and persist RAG engine, only new or changed nodes are embedded
+        SimpleEngine.from_nodes_incrementally(
             nodes=nodes,
+            persist_dir=self.repo.workdir / RAG_ENGINE_DIR,
             retriever_configs=[FAISSRetrieverConfig()],
             ranker_configs=ranker_configs,
         )
 
-        # Create directory and persist RAG engine
-        pathname = self.repo.workdir / RAG_ENGINE_DIR
-        pathname.mkdir(parents=True, exist_ok=True)
-        engine.persist(pathname)
+    def _cache_key(self, code: str) -> str:
+        """Hash of the chunk text, system prompt and model identifying an explanation"""
+        payload = json.dumps([code, CODEINTEPRETATIONSYSTEMMSG, self.llm.config.model], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-        
-        
\ No newline at end of file
+    @staticmethod
+    def _load_cache(pathname: Path) -> dict[str, str]:
+        """Load cached explanations, an unreadable cache is ignored"""
+        if not pathname.exists():
+            return {}
+        try:
+            return read_json_file(pathname)
+        except ValueError:
+            logger.warning(f"Invalid interpretation cache {pathname}, ignored")
+            return {}
@@ -9,13 +9,16 @@ from __future__ import annotations
 import asyncio
 import base64
 import re
-from typing import Literal, Tuple
+import time
+from queue import Empty
+from typing import Literal, Optional, Tuple
 
 import nbformat
 from nbclient import NotebookClient
 from nbclient.exceptions import CellTimeoutError, DeadKernelError
 from nbformat import NotebookNode
 from nbformat.v4 import new_code_cell, new_markdown_cell, new_output
+from pydantic import Field, PrivateAttr
 from rich.box import MINIMAL
 from rich.console import Console, Group
 from rich.live import Live
@@ -24,22 +27,61 @@ from rich.panel import Panel
 from rich.syntax import Syntax
 
 from metagpt.actions import Action
+from metagpt.actions.di.kernel_pool import KernelLease, KernelPool
 from metagpt.logs import logger
 
+# Kernel code saving all the variables of the namespace, modules are saved by name. dill pickles more than pickle, such
+# as the functions defined in the notebook.
+SAVE_NAMESPACE = """
+import types as __metagpt_types
+try:
+    import dill as __metagpt_pickle
+except ImportError:
+    import pickle as __metagpt_pickle
+__metagpt_values, __metagpt_modules = {{}}, {{}}
+for __metagpt_k, __metagpt_v in list(globals().items()):
+    if __metagpt_k.startswith("_") or __metagpt_k in ("In", "Out", "get_ipython", "exit", "quit"):
+        continue
+    if isinstance(__metagpt_v, __metagpt_types.ModuleType):
+        __metagpt_modules[__metagpt_k] = __metagpt_v.__name__
+    else:
+        __metagpt_values[__metagpt_k] = __metagpt_v
+with open({path!r}, "wb") as __metagpt_file:
+    __metagpt_pickle.dump((__metagpt_values, __metagpt_modules), __metagpt_file)
+"""
+LOAD_NAMESPACE = """
+import importlib as __metagpt_importlib
+try:
+    import dill as __metagpt_pickle
+except ImportError:
+    import pickle as __metagpt_pickle
+with open({path!r}, "rb") as __metagpt_file:
+    __metagpt_values, __metagpt_modules = __metagpt_pickle.load(__metagpt_file)
+globals().update({{k: __metagpt_importlib.import_module(v) for k, v in __metagpt_modules.items()}})
+globals().update(__metagpt_values)
+"""
+
 
 class ExecuteNbCode(Action):
-    """execute notebook code block, return result to llm, and display it."""
+    """execute notebook code block, return result to llm, and display it.
+
+    With a `kernel_pool`, the code runs in a kernel leased from the pool instead of a kernel started on demand.
+    """
 
     nb: NotebookNode
     nb_client: NotebookClient
     console: Console
     interaction: str
     timeout: int = 600
+    kernel_pool: Optional[KernelPool] = Field(default=None, exclude=True)
+
+    _lease: Optional[KernelLease] = PrivateAttr(default=None)
 
     def __init__(
         self,
         nb=nbformat.v4.new_notebook(),
         timeout=600,
+        kernel_pool: Optional[KernelPool] = None,
     ):
         super().__init__(
             nb=nb,
@@ -47,16 +89,33 @@ class ExecuteNbCode(Action):
             timeout=timeout,
             console=Console(),
             interaction=("ipython" if self.is_ipython() else "terminal"),
+            kernel_pool=kernel_pool,
         )
 
     async def build(self):
         if self.nb_client.kc is None or not await self.nb_client.kc.is_alive():
+            if self.kernel_pool:
+                self._release_lease()
+                self._lease = await self.kernel_pool.acquire()
+                self.nb_client.km, self.nb_client.kc = self._lease.km, self._lease.kc
+                return
             self.nb_client.create_kernel_manager()
             self.nb_client.start_new_kernel()
             self.nb_client.start_new_kernel_client()
 
+    def _release_lease(self):
+        if self._lease:
+            self.kernel_pool.release(self._lease)
+            self._lease = None
+            self.nb_client.kc = None
+            self.nb_client.km = None
+
     async def terminate(self):
         """kill NotebookClient"""
+        if self._lease:
+            # the pool shuts the kernel down in the background
+            self._release_lease()
+            return
         if self.nb_client.km is not None and await self.nb_client.km.is_alive():
             await self.nb_client.km.shutdown_kernel(now=True)
             await self.nb_client.km.cleanup_resources()
@@ -79,10 +138,46 @@ class ExecuteNbCode(Action):
         """reset NotebookClient"""
         await self.terminate()
 
-        # sleep 1s to wait for the kernel to be cleaned up completely
-        await asyncio.sleep(1)
-        await self.build()
+        if not self.kernel_pool:
+            # sleep 1s to wait for the kernel to be cleaned up completely
+            await asyncio.sleep(1)
         self.nb_client = NotebookClient(self.nb, timeout=self.timeout)
+        await self.build()
+
+    async def execute_silently(self, code: str) -> Tuple[bool, str]:
+        """Run code in the kernel without adding it to the notebook, return the success and the error if any."""
+        await self.build()
+        msg_id = self.nb_client.kc.execute(code, silent=True, store_history=False)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            # poll in short steps like nbclient, a long poll of the channel may miss a reply already received
+            try:
+                reply = await self.nb_client.kc.get_shell_msg(timeout=1)
+            except Empty:
+                if time.monotonic() > deadline:
+                    return False, "Execution timed out"
+                continue
+            if reply["parent_header"].get("msg_id") == msg_id:
+                break
+        content = reply["content"]
+        if content["status"] == "ok":
+            return True, ""
+        return False, f"{content.get('ename')}: {content.get('evalue')}"
+
+    async def save_namespace(self, path: str) -> bool:
+        """Save to a file all the variables of the kernel namespace, modules by name, and return whether all of them
+        could be pickled. Objects changed in place are saved as well as the rebound ones."""
+        success, error = await self.execute_silently(SAVE_NAMESPACE.format(path=str(path)))
+        if not success:
+            logger.debug(f"Failed to save the kernel namespace: {error}")
+        return success
+
+    async def load_namespace(self, path: str) -> bool:
+        """Bind in the kernel namespace the variables saved by `save_namespace`."""
+        success, error = await self.execute_silently(LOAD_NAMESPACE.format(path=str(path)))
+        if not success:
+            logger.warning(f"Failed to load the kernel namespace: {error}")
+        return success
 
     def add_code_cell(self, code: str):
         self.nb.cells.append(new_code_cell(source=code))
@@ -182,8 +277,9 @@ class ExecuteNbCode(Action):
             error_msg = "Cell execution timed out: Execution exceeded the time limit and was stopped; consider optimizing your code for better performance."
             return False, error_msg
         except DeadKernelError:
+            reason = self._lease.expired if self._lease else ""
             await self.reset()
-            return False, "DeadKernelError"
+            return False, f"DeadKernelError: {reason}" if reason else "DeadKernelError"
         except Exception:
             return self.parse_outputs(self.nb.cells[-1].outputs)
 
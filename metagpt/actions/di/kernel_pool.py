@@ -0,0 +1,224 @@
+# -*- encoding: utf-8 -*-
+"""
+@File    :   kernel_pool.py
+@Desc    :   Pool of pre-warmed jupyter kernels shared by the ExecuteNbCode actions.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+from jupyter_client import AsyncKernelManager
+from jupyter_client.asynchronous import AsyncKernelClient
+
+from metagpt.logs import logger
+
+DEFAULT_WARMUP_CODE = """
+import numpy as np
+import pandas as pd
+import sklearn
+"""
+
+
+class KernelLease:
+    """A kernel handed out by a KernelPool, it must be given back with `KernelPool.release`."""
+
+    def __init__(self, km: AsyncKernelManager, kc: AsyncKernelClient):
+        self.km = km
+        self.kc = kc
+        self.leased_at: float = 0.0
+        self.expired: str = ""  # why the pool killed the kernel, if it did
+
+
+class KernelPool:
+    """Keep `size` kernels started and warmed up by `warmup_code`, so that a cell can run as soon as a kernel is
+    leased. A released kernel is not reused, it is shut down and replaced in the background.
+
+    Leased kernels are killed by a watchdog when they use more than `memory_limit` MB of memory or are held for more
+    than `max_lease_time` seconds, 0 means unlimited. The executor sees a dead kernel and leases a new one.
+
+    The pool belongs to the event loop it is first used in.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        warmup_code: str = DEFAULT_WARMUP_CODE,
+        kernel_name: str = "python3",
+        memory_limit: int = 0,
+        max_lease_time: float = 0,
+        check_interval: float = 1.0,
+        startup_timeout: float = 60,
+    ):
+        if memory_limit:
+            try:
+                import psutil  # noqa: F401
+            except ImportError:
+                raise ImportError("`psutil` package not found, please run `pip install psutil` to limit kernel memory")
+        self.size = size
+        self.warmup_code = warmup_code
+        self.kernel_name = kernel_name
+        self.memory_limit = memory_limit
+        self.max_lease_time = max_lease_time
+        self.check_interval = check_interval
+        self.startup_timeout = startup_timeout
+        self._idle: list[KernelLease] = []
+        self._leased: set[KernelLease] = set()
+        self._starting: set[asyncio.Task] = set()
+        self._tasks: set[asyncio.Task] = set()  # kernels being shut down, referenced until done
+        self._watchdog: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def start(self):
+        """Start the kernels up front instead of on the first lease, wait until they are warm."""
+        self._refill()
+        await asyncio.gather(*self._starting, return_exceptions=True)
+
+    async def acquire(self) -> KernelLease:
+        """Lease a warm kernel, or wait for the next one being started if none is ready yet."""
+        while True:
+            if self._closed:
+                raise RuntimeError("The kernel pool is closed")
+            if self._idle:
+                lease = self._idle.pop(0)
+                if await lease.km.is_alive():
+                    break
+                self._spawn(self._shutdown(lease))
+                continue
+            self._refill()
+            if not self._starting:
+                lease = await self._start_kernel()
+                break
+            done, _ = await asyncio.wait(self._starting, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception():
+                    raise task.exception()
+        lease.leased_at = time.monotonic()
+        self._leased.add(lease)
+        self._refill()
+        self._ensure_watchdog()
+        return lease
+
+    def release(self, lease: KernelLease):
+        """Give back a kernel, it is shut down and replaced in the background."""
+        self._leased.discard(lease)
+        self._spawn(self._shutdown(lease))
+        self._refill()
+
+    async def close(self):
+        """Shut down all the kernels of the pool."""
+        self._closed = True
+        for task in [*self._starting, self._watchdog]:
+            if task:
+                task.cancel()
+        await asyncio.gather(*self._starting, *self._tasks, return_exceptions=True)
+        leases = self._idle + list(self._leased)
+        self._idle, self._leased = [], set()
+        await asyncio.gather(*[self._shutdown(lease) for lease in leases], return_exceptions=True)
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def _refill(self):
+        if self._closed:
+            return
+        for _ in range(self.size - len(self._idle) - len(self._starting)):
+            task = asyncio.create_task(self._start_kernel())
+            self._starting.add(task)
+            task.add_done_callback(self._on_started)
+
+    def _on_started(self, task: asyncio.Task):
+        self._starting.discard(task)
+        if task.cancelled():
+            return
+        if task.exception():
+            logger.warning(f"Failed to start a kernel for the pool: {task.exception()}")
+            return
+        lease = task.result()
+        if self._closed:
+            self._spawn(self._shutdown(lease))
+        else:
+            self._idle.append(lease)
+
+    async def _start_kernel(self) -> KernelLease:
+        km = AsyncKernelManager(kernel_name=self.kernel_name)
+        await km.start_kernel(extra_arguments=["--HistoryManager.hist_file=:memory:"])
+        kc = km.client()
+        try:
+            kc.start_channels()
+            await kc.wait_for_ready(timeout=self.startup_timeout)
+            kc.allow_stdin = False
+            lease = KernelLease(km, kc)
+            if self.warmup_code.strip():
+                await self._warmup(lease)
+        except BaseException:
+            await self._shutdown(KernelLease(km, kc))
+            raise
+        return lease
+
+    async def _warmup(self, lease: KernelLease):
+        reply = await lease.kc.execute_interactive(
+            self.warmup_code, silent=True, store_history=False, timeout=self.startup_timeout, output_hook=lambda _: None
+        )
+        if reply["content"]["status"] != "ok":
+            # a missing package only leaves the kernel less warm
+            logger.debug(f"Kernel warmup failed: {reply['content'].get('ename')}: {reply['content'].get('evalue')}")
+
+    @staticmethod
+    async def _shutdown(lease: KernelLease):
+        lease.kc.stop_channels()
+        if await lease.km.is_alive():
+            await lease.km.shutdown_kernel(now=True)
+        await lease.km.cleanup_resources()
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _ensure_watchdog(self):
+        if (self.memory_limit or self.max_lease_time) and (self._watchdog is None or self._watchdog.done()):
+            self._watchdog = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        while self._leased:
+            await asyncio.sleep(self.check_interval)
+            for lease in list(self._leased):
+                if lease.expired:
+                    continue
+                reason = self._check_limits(lease)
+                if reason:
+                    logger.warning(f"Kill the kernel {lease.km.kernel_id}: {reason}")
+                    lease.expired = reason
+                    await lease.km.shutdown_kernel(now=True)
+
+    def _check_limits(self, lease: KernelLease) -> str:
+        if self.max_lease_time and time.monotonic() - lease.leased_at > self.max_lease_time:
+            return f"leased for more than {self.max_lease_time}s"
+        if self.memory_limit:
+            memory = self._memory_usage(lease)
+            if memory > self.memory_limit:
+                return f"using {memory:.0f}MB of memory, more than {self.memory_limit}MB"
+        return ""
+
+    @staticmethod
+    def _memory_usage(lease: KernelLease) -> float:
+        """Resident memory in MB of the kernel process and its children"""
+        import psutil
+
+        pid = getattr(lease.km.provisioner, "pid", None)
+        if pid is None:
+            return 0
+        try:
+            process = psutil.Process(pid)
+            rss = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    rss += child.memory_info().rss
+                except psutil.NoSuchProcess:
+                    pass
+        except psutil.NoSuchProcess:
+            return 0
+        return rss / 2**20
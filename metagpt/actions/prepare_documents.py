@@ -120,17 +120,13 @@ class PrepareEvaluatorDocuments(Action):
             enable_chunking=False
         )
 
-        # Configure and create RAG engine
+        # Configure RAG engine, then update and save it for future use, reusing unchanged embeddings
         ranker_configs = [LLMRankerConfig()] if self._use_llm_ranker else None
-        engine = SimpleEngine.from_nodes_to_engine(
+        SimpleEngine.from_nodes_incrementally(
             nodes=nodes,
+            persist_dir=self.repo.workdir / EVAL_RAG_ENGINE_DIR,
             retriever_configs=[FAISSRetrieverConfig()],
             ranker_configs=ranker_configs,
         )
 
-        # Save RAG engine for future use
-        pathname = self.repo.workdir / EVAL_RAG_ENGINE_DIR
-        pathname.mkdir(parents=True, exist_ok=True)
-        engine.persist(pathname)
-
         
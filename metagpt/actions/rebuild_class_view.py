@@ -51,7 +51,7 @@ class RebuildClassView(Action):
         graph_repo_pathname = self.context.git_repo.workdir / GRAPH_REPO_FILE_REPO / self.context.git_repo.workdir.name
         self.graph_db = await DiGraphRepository.load_from(str(graph_repo_pathname.with_suffix(".json")))
         repo_parser = RepoParser(base_directory=Path(self.i_context))
-        # use pylint
+        # class views
         class_views, relationship_views, package_root = await repo_parser.rebuild_class_views(path=Path(self.i_context))
         await GraphRepository.update_graph_db_with_class_views(self.graph_db, class_views)
         await GraphRepository.update_graph_db_with_class_relationship_views(self.graph_db, relationship_views)
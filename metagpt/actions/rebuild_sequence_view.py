@@ -15,7 +15,7 @@ from pathlib import Path
 from typing import List, Optional, Set
 
 from pydantic import BaseModel
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_random_exponential
 
 from metagpt.actions import Action
 from metagpt.config2 import config
@@ -36,6 +36,7 @@ from metagpt.utils.common import (
 )
 from metagpt.utils.di_graph_repository import DiGraphRepository
 from metagpt.utils.graph_repository import SPO, GraphKeyword, GraphRepository
+from metagpt.utils.llm_cache import LLMCacheMissError
 
 
 class ReverseUseCase(BaseModel):
@@ -108,6 +109,7 @@ class RebuildSequenceView(Action):
         wait=wait_random_exponential(min=1, max=20),
         stop=stop_after_attempt(6),
         after=general_after_log(logger),
+        retry=retry_if_not_exception_type(LLMCacheMissError),
     )
     async def _rebuild_main_sequence_view(self, entry: SPO):
         """
@@ -223,6 +225,7 @@ class RebuildSequenceView(Action):
         wait=wait_random_exponential(min=1, max=20),
         stop=stop_after_attempt(6),
         after=general_after_log(logger),
+        retry=retry_if_not_exception_type(LLMCacheMissError),
     )
     async def _rebuild_use_case(self, ns_class_name: str):
         """
@@ -301,6 +304,7 @@ class RebuildSequenceView(Action):
         wait=wait_random_exponential(min=1, max=20),
         stop=stop_after_attempt(6),
         after=general_after_log(logger),
+        retry=retry_if_not_exception_type(LLMCacheMissError),
     )
     async def _rebuild_sequence_view(self, ns_class_name: str):
         """
@@ -521,6 +525,7 @@ class RebuildSequenceView(Action):
         wait=wait_random_exponential(min=1, max=20),
         stop=stop_after_attempt(6),
         after=general_after_log(logger),
+        retry=retry_if_not_exception_type(LLMCacheMissError),
     )
     async def _merge_participant(self, entry: SPO, class_name: str):
         """
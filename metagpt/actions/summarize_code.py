@@ -8,11 +8,12 @@
 from pathlib import Path
 
 from pydantic import Field
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_random_exponential
 
 from metagpt.actions.action import Action
 from metagpt.logs import logger
 from metagpt.schema import CodeSummarizeContext
+from metagpt.utils.llm_cache import LLMCacheMissError
 
 PROMPT_TEMPLATE = """
 NOTICE
@@ -91,7 +92,11 @@ class SummarizeCode(Action):
     name: str = "SummarizeCode"
     i_context: CodeSummarizeContext = Field(default_factory=CodeSummarizeContext)
 
-    @retry(stop=stop_after_attempt(2), wait=wait_random_exponential(min=1, max=60))
+    @retry(
+        stop=stop_after_attempt(2),
+        wait=wait_random_exponential(min=1, max=60),
+        retry=retry_if_not_exception_type(LLMCacheMissError),
+    )
     async def summarize_code(self, prompt):
         code_rsp = await self._aask(prompt)
         return code_rsp
@@ -18,7 +18,7 @@
 import json
 
 from pydantic import Field
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_random_exponential
 
 from metagpt.actions.action import Action
 from metagpt.actions.project_management_an import REFINED_TASK_LIST, TASK_LIST
@@ -26,6 +26,7 @@ from metagpt.const import BUGFIX_FILENAME, REQUIREMENT_FILENAME
 from metagpt.logs import logger
 from metagpt.schema import CodingContext, Document, RunCodeResult
 from metagpt.utils.common import CodeParser
+from metagpt.utils.llm_cache import LLMCacheMissError
 from metagpt.utils.project_repo import ProjectRepo
 
 PROMPT_TEMPLATE = """
@@ -115,7 +116,11 @@ class WriteCode(Action):
     name: str = "WriteCode"
     i_context: Document = Field(default_factory=Document)
 
-    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
+    @retry(
+        wait=wait_random_exponential(min=1, max=60),
+        stop=stop_after_attempt(6),
+        retry=retry_if_not_exception_type(LLMCacheMissError),
+    )
     async def write_code(self, prompt) -> str:
         code_rsp = await self._aask(prompt)
         code = CodeParser.parse_code(block="", text=code_rsp)
@@ -9,7 +9,7 @@
 """
 
 from pydantic import Field
-from tenacity import retry, stop_after_attempt, wait_random_exponential
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_random_exponential
 
 from metagpt.actions import WriteCode
 from metagpt.actions.action import Action
@@ -17,6 +17,7 @@ from metagpt.const import REQUIREMENT_FILENAME
 from metagpt.logs import logger
 from metagpt.schema import CodingContext
 from metagpt.utils.common import CodeParser
+from metagpt.utils.llm_cache import LLMCacheMissError
 
 PROMPT_TEMPLATE = """
 # System
@@ -131,7 +132,11 @@ class WriteCodeReview(Action):
     name: str = "WriteCodeReview"
     i_context: CodingContext = Field(default_factory=CodingContext)
 
-    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
+    @retry(
+        wait=wait_random_exponential(min=1, max=60),
+        stop=stop_after_attempt(6),
+        retry=retry_if_not_exception_type(LLMCacheMissError),
+    )
     async def write_code_review_and_rewrite(self, context_prompt, cr_prompt, filename):
         cr_rsp = await self._aask(context_prompt + cr_prompt)
         result = CodeParser.parse_block("Code Review Result", cr_rsp)
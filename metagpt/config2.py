@@ -17,6 +17,7 @@ from metagpt.configs.file_parser_config import OmniParseConfig
 from metagpt.configs.llm_config import LLMConfig, LLMType
 from metagpt.configs.mermaid_config import MermaidConfig
 from metagpt.configs.redis_config import RedisConfig
+from metagpt.configs.role_memory_config import RoleMemoryConfig
 from metagpt.configs.s3_config import S3Config
 from metagpt.configs.search_config import SearchConfig
 from metagpt.configs.workspace_config import WorkspaceConfig
@@ -30,6 +31,7 @@ class CLIParams(BaseModel):
     project_path: str = ""
     project_name: str = ""
     evaluation_rounds: int = 3
+    evaluation_concurrency: int = 4
     inc: bool = False
     reqa_file: str = ""
     max_auto_summarize_code: int = 0
@@ -73,7 +75,9 @@ class Config(CLIParams, YamlModel):
     prompt_schema: Literal["json", "markdown", "raw"] = "json"
     workspace: WorkspaceConfig = WorkspaceConfig()
     enable_longterm_memory: bool = False
+    role_memory: RoleMemoryConfig = RoleMemoryConfig()
     code_review_k_times: int = 2
+    intepretation_concurrency: int = 8
     agentops_api_key: str = ""
 
     # Will be removed in the future
@@ -125,7 +129,7 @@ class Config(CLIParams, YamlModel):
         final = merge_dict(dicts)
         return Config(**final)
 
-    def update_via_cli(self, project_path, evaluation_rounds=3):
+    def update_via_cli(self, project_path, evaluation_rounds=3, evaluation_concurrency=4):
         """update config via cli"""
 
         # Use in the PrepareDocuments action according to Section 2.2.3.5.1 of RFC 135.
@@ -135,6 +139,7 @@ class Config(CLIParams, YamlModel):
         self.project_name = project_name
         self.inc = True
         self.evaluation_rounds = evaluation_rounds
+        self.evaluation_concurrency = evaluation_concurrency
     @property
     def extra(self):
         return self._extra
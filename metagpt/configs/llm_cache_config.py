@@ -0,0 +1,28 @@
+from enum import Enum
+from pathlib import Path
+
+from metagpt.const import CONFIG_ROOT
+from metagpt.utils.yaml_model import YamlModel
+
+
+class LLMCacheMode(Enum):
+    OFF = "off"
+    RECORD = "record"  # serve cached responses, call the LLM and record the misses
+    REPLAY = "replay"  # serve cached responses only, a miss raises LLMCacheMissError
+
+
+class LLMCacheConfig(YamlModel):
+    """Config for the LLM response cache.
+
+    Examples:
+    ---------
+    mode: "record"
+    path: "~/.metagpt/llm_cache.db"
+    ttl: 86400
+    max_entries: 10000
+    """
+
+    mode: LLMCacheMode = LLMCacheMode.OFF
+    path: Path = CONFIG_ROOT / "llm_cache.db"
+    ttl: int = 0  # seconds a response stays valid, 0 means never expires
+    max_entries: int = 10000  # least recently used responses beyond it are evicted, 0 means unlimited
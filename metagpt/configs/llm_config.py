@@ -10,6 +10,7 @@ from typing import Optional
 
 from pydantic import field_validator
 
+from metagpt.configs.llm_cache_config import LLMCacheConfig
 from metagpt.const import CONFIG_ROOT, LLM_API_TIMEOUT, METAGPT_ROOT
 from metagpt.utils.yaml_model import YamlModel
 
@@ -87,9 +88,17 @@ class LLMConfig(YamlModel):
     # For Network
     proxy: Optional[str] = None
 
+    # Rate Limit of the model, shared by every LLM instance, 0 means unlimited
+    rpm: int = 0  # requests per minute
+    tpm: int = 0  # tokens per minute
+    max_concurrency: int = 0
+
     # Cost Control
     calc_usage: bool = True
 
+    # Response Cache, off by default
+    cache: LLMCacheConfig = LLMCacheConfig()
+
     @field_validator("api_key")
     @classmethod
     def check_llm_key(cls, v):
@@ -0,0 +1,14 @@
+from metagpt.utils.yaml_model import YamlModel
+
+
+class RoleMemoryConfig(YamlModel):
+    """Config for the memory policy of roles, older messages spill to the workspace beyond the limits.
+
+    Examples:
+    ---------
+    max_messages: 200
+    max_tokens: 16000
+    """
+
+    max_messages: int = 0  # messages kept in RAM, 0 means unlimited
+    max_tokens: int = 0  # tokens kept in RAM and formatted into the prompts of roles, 0 means unlimited
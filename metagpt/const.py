@@ -62,6 +62,8 @@ SOURCE_ROOT = METAGPT_ROOT / "metagpt"
 PROMPT_PATH = SOURCE_ROOT / "prompts"
 SKILL_DIRECTORY = SOURCE_ROOT / "skills"
 TOOL_SCHEMA_PATH = METAGPT_ROOT / "metagpt/tools/schemas"
+TOOL_SCHEMA_CACHE_PATH = CONFIG_ROOT / "tool_schemas"
+SYMBOLS_CACHE_PATH = CONFIG_ROOT / "symbols_cache"
 TOOL_LIBS_PATH = METAGPT_ROOT / "metagpt/tools/libs"
 
 # REAL CONSTS
@@ -130,4 +132,10 @@ LLM_API_TIMEOUT = 300
 
 RAG_ENGINE_DIR = "rag_engine"
 
-EVAL_RAG_ENGINE_DIR = "eval_rag_engine"
\ No newline at end of file
+EVAL_RAG_ENGINE_DIR = "eval_rag_engine"
+
+EVAL_CHECKPOINT_FILENAME = "eval_checkpoint.json"
+
+INTEPRETATION_CACHE_FILENAME = "intepretation_cache.json"
+
+ROLE_MEMORY_DIR = "role_memory"
@@ -88,16 +88,19 @@ class Context(BaseModel):
             return self.cost_manager
 
     def llm(self) -> BaseLLM:
-        """Return a LLM instance, fixme: support cache"""
-        # if self._llm is None:
-        self._llm = create_llm_instance(self.config.llm)
+        """Return the LLM instance of this context, cached until `config.llm` is replaced"""
+        if self._llm is None or self._llm.config is not self.config.llm:
+            self._llm = create_llm_instance(self.config.llm)
         if self._llm.cost_manager is None:
             self._llm.cost_manager = self._select_costmanager(self.config.llm)
         return self._llm
 
     def llm_with_cost_manager_from_llm_config(self, llm_config: LLMConfig) -> BaseLLM:
-        """Return a LLM instance, fixme: support cache"""
-        # if self._llm is None:
+        """Return a new LLM instance for a role or an action.
+
+        The instance holds per-role state such as the system prompt, so it is not cached, but its underlying client is
+        shared through `LLM_CLIENT_POOL` with every instance of the same endpoint and credentials.
+        """
         llm = create_llm_instance(llm_config)
         if llm.cost_manager is None:
             llm.cost_manager = self._select_costmanager(llm_config)
@@ -4,13 +4,16 @@
 
 import asyncio
 from abc import abstractmethod
+from collections import defaultdict
+from contextlib import nullcontext
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Set, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Optional, Set, Union
 
 from gymnasium import spaces
 from gymnasium.core import ActType, ObsType
-from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, SerializeAsAny, model_validator
 
+from metagpt.const import MESSAGE_ROUTE_TO_ALL
 from metagpt.context import Context
 from metagpt.environment.api.env_api import (
     EnvAPIAbstract,
@@ -18,9 +21,10 @@ from metagpt.environment.api.env_api import (
     WriteAPIRegistry,
 )
 from metagpt.environment.base_env_space import BaseEnvAction, BaseEnvObsParams
+from metagpt.environment.event_log import EnvEventLog
 from metagpt.logs import logger
 from metagpt.schema import Message
-from metagpt.utils.common import get_function_schema, is_coroutine_func, is_send_to
+from metagpt.utils.common import get_function_schema, is_coroutine_func
 
 if TYPE_CHECKING:
     from metagpt.roles.role import Role  # noqa: F401
@@ -131,9 +135,12 @@ class Environment(ExtEnv):
     desc: str = Field(default="")  # 环境描述
     roles: dict[str, SerializeAsAny["Role"]] = Field(default_factory=dict, validate_default=True)
     member_addrs: Dict["Role", Set] = Field(default_factory=dict, exclude=True)
-    history: str = ""  # For debug
+    event_log: EnvEventLog = Field(default_factory=EnvEventLog, exclude=True)
     context: Context = Field(default_factory=Context, exclude=True)
 
+    _routes: Dict[str, Set["Role"]] = PrivateAttr(default_factory=lambda: defaultdict(set))  # address -> roles
+    _wakeups: Dict["Role", asyncio.Event] = PrivateAttr(default_factory=dict)  # set by `run_until_idle`
+
     def reset(
         self,
         *,
@@ -182,15 +189,18 @@ class Environment(ExtEnv):
         in RFC 113.
         """
         logger.debug(f"publish_message: {message.dump()}")
-        found = False
         # According to the routing feature plan in Chapter 2.2.3.2 of RFC 113
-        for role, addrs in self.member_addrs.items():
-            if is_send_to(message, addrs):
-                role.put_message(message)
-                found = True
-        if not found:
+        if MESSAGE_ROUTE_TO_ALL in message.send_to:
+            recipients = list(self.member_addrs)
+        else:
+            recipients = {role for addr in message.send_to for role in self._routes.get(addr, ())}
+        for role in recipients:
+            role.put_message(message)
+            if role in self._wakeups:
+                self._wakeups[role].set()
+        if not recipients:
             logger.warning(f"Message no recipients: {message.dump()}")
-        self.history += f"\n{message}"  # For debug
+        self.event_log.append(message, recipients=[role.name for role in recipients])
 
         return True
 
@@ -207,6 +217,65 @@ class Environment(ExtEnv):
             await asyncio.gather(*futures)
             logger.debug(f"is idle: {self.is_idle}")
 
+    async def run_until_idle(self, max_steps: int = 3, max_concurrency: int = 0, on_step: Callable = None):
+        """Event-driven alternative to `run`: every role runs as its own task, woken up when a message is delivered to
+        it, so that a role never waits for the others. Stops once no role is running nor has pending messages.
+
+        Args:
+            max_steps: Reactions of each role, after which the role stops observing.
+            max_concurrency: Roles running at the same time, 0 means unlimited.
+            on_step: Called before every role run, e.g. to check the budget.
+        """
+        roles = list(self.roles.values())
+        self._wakeups = {role: asyncio.Event() for role in roles}
+        for event in self._wakeups.values():
+            event.set()  # let every role observe once, as the first round of `run` does
+        active = set(roles)
+        done = asyncio.Event()
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else nullcontext()
+        running = 0
+
+        def check_done():
+            if running == 0 and not any(self._wakeups[role].is_set() for role in active):
+                done.set()
+                for event in self._wakeups.values():
+                    event.set()  # release the waiting roles
+
+        async def role_loop(role: "Role"):
+            nonlocal running
+            steps = 0
+            while True:
+                await self._wakeups[role].wait()
+                if done.is_set():
+                    return
+                self._wakeups[role].clear()
+                running += 1
+                try:
+                    if on_step:
+                        on_step()
+                    async with semaphore:
+                        rsp = await role.run()
+                finally:
+                    running -= 1
+                steps += 1 if rsp else 0
+                if steps >= max_steps:
+                    active.discard(role)
+                    logger.debug(f"{role.name} stops after {steps} steps.")
+                elif not role.rc.msg_buffer.empty():
+                    self._wakeups[role].set()
+                check_done()
+                if role not in active:
+                    return
+
+        tasks = [asyncio.create_task(role_loop(role)) for role in roles]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._wakeups = {}
+        logger.debug(f"is idle: {self.is_idle}")
+
     def get_roles(self) -> dict[str, "Role"]:
         """获得环境内的所有角色
         Process all Role runs at once
@@ -235,8 +304,17 @@ class Environment(ExtEnv):
         return self.member_addrs.get(obj, {})
 
     def set_addresses(self, obj, addresses):
-        """Set the addresses of the object"""
+        """Set the addresses of the object, while updating the routing table"""
+        for addr in self.member_addrs.get(obj, set()):
+            self._routes[addr].discard(obj)
         self.member_addrs[obj] = addresses
+        for addr in addresses:
+            self._routes[addr].add(obj)
+
+    @property
+    def history(self) -> str:
+        """The published messages as text, for debug and as the shared context of debating roles"""
+        return self.event_log.render()
 
     def archive(self, auto_archive=True):
         if auto_archive and self.context.git_repo:
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Desc   : append-only log of the messages published in an environment
+
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+
+from metagpt.schema import Message
+
+
+class EnvEvent(BaseModel):
+    """A message published in an environment and the names of the roles it was delivered to"""
+
+    timestamp: float
+    message: Message
+    recipients: list[str] = []
+
+    def dump(self) -> str:
+        return json.dumps(
+            {"timestamp": self.timestamp, "message": json.loads(self.message.dump()), "recipients": self.recipients},
+            ensure_ascii=False,
+        )
+
+
+class EnvEventLog(BaseModel):
+    """Ring buffer of the latest `max_events` events, 0 means unbounded, every event is also appended to the JSON
+    lines file `sink` if it is set.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    max_events: int = 10000
+    sink: Optional[Path] = None
+
+    _events: deque = PrivateAttr(default_factory=deque)
+    _rendered: Optional[str] = PrivateAttr(default=None)
+
+    def append(self, message: Message, recipients: list[str]) -> EnvEvent:
+        event = EnvEvent(timestamp=time.time(), message=message, recipients=recipients)
+        self._events.append(event)
+        if self.max_events and len(self._events) > self.max_events:
+            self._events.popleft()
+        self._rendered = None
+        if self.sink:
+            self.sink.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.sink, "a", encoding="utf-8") as writer:
+                writer.write(f"{event.dump()}\n")
+        return event
+
+    @property
+    def events(self) -> list[EnvEvent]:
+        return list(self._events)
+
+    def render(self) -> str:
+        """Render the buffered messages as the debug history text, one message per line"""
+        if self._rendered is None:
+            self._rendered = "".join(f"\n{event.message}" for event in self._events)
+        return self._rendered
+
+    def clear(self):
+        self._events.clear()
+        self._rendered = None
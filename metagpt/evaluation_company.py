@@ -22,7 +22,8 @@ def generate_repo(
     investment=3.0,
     total_rounds=5,
     evaluation_rounds=3,
-    project_path=""
+    project_path="",
+    evaluation_concurrency=4,
 ) -> ProjectRepo:
     """Run the evaluation company logic to assess modularized code quality.
     
@@ -31,6 +32,7 @@ def generate_repo(
         total_rounds (int): Total number of rounds to run the evaluation
         evaluation_rounds (int): Number of rounds specifically for evaluation discussions
         project_path (str): Path to the project being evaluated
+        evaluation_concurrency (int): Maximum number of chunk debates running at the same time
         
     Returns:
         ProjectRepo: Repository containing evaluation results and artifacts
@@ -42,14 +44,14 @@ def generate_repo(
         Inspector
     )
 
-    from metagpt.team import Team
+    from metagpt.team import Team, run_company
 
     # Initialize agentops for tracking if API key provided
     if config.agentops_api_key != "":
         agentops.init(config.agentops_api_key, tags=["software_company"])
 
     # Update configuration with CLI parameters
-    config.update_via_cli(project_path, evaluation_rounds)
+    config.update_via_cli(project_path, evaluation_rounds, evaluation_concurrency)
     ctx = Context(config=config)
 
     # Create and configure the evaluation team
@@ -64,7 +66,7 @@ def generate_repo(
     # Start evaluation process
     company.invest(investment)
     company.run_project("New Project Started.")
-    asyncio.run(company.run(n_round=total_rounds))
+    asyncio.run(run_company(company, n_round=total_rounds))
 
     # Clean up agentops session
     if config.agentops_api_key != "":
@@ -78,6 +80,7 @@ def startup(
     investment: float = typer.Option(default=5.0, help="Dollar amount to invest in the AI company."),
     total_rounds: int = typer.Option(default=8, help="Number of rounds for the simulation."),
     evaluation_rounds: int = typer.Option(default=3, help="Number of rounds for the evaluation."),
+    evaluation_concurrency: int = typer.Option(default=4, help="Number of chunks evaluated concurrently."),
     project_path: str = typer.Option(
         default="./workspace",
         help="Specify the directory path of the old version project to fulfill the incremental requirements.",
@@ -98,7 +101,8 @@ def startup(
         investment,
         total_rounds,
         evaluation_rounds,
-        project_path
+        project_path,
+        evaluation_concurrency,
     )
 
 
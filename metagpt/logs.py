@@ -7,6 +7,8 @@
 """
 
 import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 
 from loguru import logger as _logger
@@ -14,6 +16,7 @@ from loguru import logger as _logger
 from metagpt.const import METAGPT_ROOT
 
 _print_level = "INFO"
+_llm_stream_listeners: ContextVar[tuple] = ContextVar("llm_stream_listeners", default=())
 
 
 def define_log_level(print_level="INFO", logfile_level="DEBUG", name: str = None):
@@ -36,6 +39,18 @@ logger = define_log_level()
 
 def log_llm_stream(msg):
     _llm_stream_log(msg)
+    for listener in _llm_stream_listeners.get():
+        listener(msg)
+
+
+@contextmanager
+def listen_llm_stream(func):
+    """Call func with every chunk streamed by the LLM in the block, an exception raised by func aborts the request"""
+    token = _llm_stream_listeners.set(_llm_stream_listeners.get() + (func,))
+    try:
+        yield
+    finally:
+        _llm_stream_listeners.reset(token)
 
 
 def set_llm_stream_logfunc(func):
@@ -7,11 +7,13 @@
 """
 
 from metagpt.memory.memory import Memory
+from metagpt.memory.windowed_memory import WindowedMemory
 
 # from metagpt.memory.longterm_memory import LongTermMemory
 
 
 __all__ = [
     "Memory",
+    "WindowedMemory",
     # "LongTermMemory",
 ]
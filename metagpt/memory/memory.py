@@ -7,9 +7,9 @@
 @Modified By: mashenquan, 2023-11-1. According to RFC 116: Updated the type of index key.
 """
 from collections import defaultdict
-from typing import DefaultDict, Iterable, Set
+from typing import Any, DefaultDict, Iterable, Set
 
-from pydantic import BaseModel, Field, SerializeAsAny
+from pydantic import BaseModel, Field, PrivateAttr, SerializeAsAny
 
 from metagpt.const import IGNORED_MESSAGE_ID
 from metagpt.schema import Message
@@ -23,13 +23,47 @@ class Memory(BaseModel):
     index: DefaultDict[str, list[SerializeAsAny[Message]]] = Field(default_factory=lambda: defaultdict(list))
     ignore_id: bool = False
 
+    # Hash indexes rebuilt from storage, `_keys` buckets messages by id and content for O(1) dedup
+    _keys: DefaultDict[tuple, list[Message]] = PrivateAttr(default_factory=lambda: defaultdict(list))
+    _roles: DefaultDict[str, list[Message]] = PrivateAttr(default_factory=lambda: defaultdict(list))
+
+    def model_post_init(self, __context: Any):
+        for message in self.storage:
+            self._index(message)
+
+    @staticmethod
+    def _key(message: Message) -> tuple:
+        return message.id, message.content
+
+    def _index(self, message: Message):
+        self._keys[self._key(message)].append(message)
+        self._roles[message.role].append(message)
+
+    def _unindex(self, message: Message):
+        self._remove_from(self._keys, self._key(message), message)
+        self._remove_from(self._roles, message.role, message)
+        if message.cause_by:
+            self._remove_from(self.index, message.cause_by, message)
+
+    @staticmethod
+    def _remove_from(index: dict[Any, list[Message]], key: Any, message: Message):
+        bucket = index.get(key)
+        if bucket and message in bucket:
+            bucket.remove(message)
+            if not bucket:
+                del index[key]
+
+    def _contains(self, message: Message) -> bool:
+        return message in self._keys.get(self._key(message), [])
+
     def add(self, message: Message):
         """Add a new message to storage, while updating the index"""
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
-        if message in self.storage:
+        if self._contains(message):
             return
         self.storage.append(message)
+        self._index(message)
         if message.cause_by:
             self.index[message.cause_by].append(message)
 
@@ -39,7 +73,7 @@ class Memory(BaseModel):
 
     def get_by_role(self, role: str) -> list[Message]:
         """Return all messages of a specified role"""
-        return [message for message in self.storage if message.role == role]
+        return list(self._roles.get(role, []))
 
     def get_by_content(self, content: str) -> list[Message]:
         """Return all messages containing a specified content"""
@@ -49,8 +83,7 @@ class Memory(BaseModel):
         """delete the newest message from the storage"""
         if len(self.storage) > 0:
             newest_msg = self.storage.pop()
-            if newest_msg.cause_by and newest_msg in self.index[newest_msg.cause_by]:
-                self.index[newest_msg.cause_by].remove(newest_msg)
+            self._unindex(newest_msg)
         else:
             newest_msg = None
         return newest_msg
@@ -60,13 +93,14 @@ class Memory(BaseModel):
         if self.ignore_id:
             message.id = IGNORED_MESSAGE_ID
         self.storage.remove(message)
-        if message.cause_by and message in self.index[message.cause_by]:
-            self.index[message.cause_by].remove(message)
+        self._unindex(message)
 
     def clear(self):
         """Clear storage and index"""
         self.storage = []
         self.index = defaultdict(list)
+        self._keys = defaultdict(list)
+        self._roles = defaultdict(list)
 
     def count(self) -> int:
         """Return the number of messages in storage"""
@@ -82,10 +116,15 @@ class Memory(BaseModel):
 
     def find_news(self, observed: list[Message], k=0) -> list[Message]:
         """find news (previously unseen messages) from the the most recent k memories, from all memories when k=0"""
-        already_observed = self.get(k)
+        if k:
+            already_observed = defaultdict(list)
+            for message in self.get(k):
+                already_observed[self._key(message)].append(message)
+        else:
+            already_observed = self._keys
         news: list[Message] = []
         for i in observed:
-            if i in already_observed:
+            if i in already_observed.get(self._key(i), []):
                 continue
             news.append(i)
         return news
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : windowed_memory.py
+@Desc    : Memory keeping a bounded hot window of the latest messages in RAM, older messages spill to an append-only
+    JSON lines log on disk from which they can be paged back.
+"""
+import hashlib
+from itertools import islice
+from pathlib import Path
+from typing import Any, Optional
+
+from pydantic import PrivateAttr
+
+from metagpt.const import IGNORED_MESSAGE_ID
+from metagpt.memory.memory import Memory
+from metagpt.schema import Message
+from metagpt.utils.token_counter import count_output_tokens
+
+TOKEN_COUNT_MODEL = "gpt-4"  # only used to pick the cl100k_base encoding
+
+
+class WindowedMemory(Memory):
+    """Memory bounded by `max_messages` and `max_tokens`, 0 means unlimited.
+
+    `get` and the indexes only cover the hot window, which is what roles format into their prompts. Messages evicted
+    from the window are appended to `spill_path`, or dropped if it is not set, and still count as seen by `add`.
+    """
+
+    max_messages: int = 0
+    max_tokens: int = 0
+    spill_path: Optional[Path] = None
+    spilled: int = 0  # number of messages in the spill log
+
+    _spilled_keys: set[bytes] = PrivateAttr(default_factory=set)  # digests, RAM does not grow with the contents
+    _token_counts: dict[tuple, int] = PrivateAttr(default_factory=dict)  # by the dedup key of Memory
+    _total_tokens: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any):
+        super().model_post_init(__context)
+        for message in self.storage:
+            self._total_tokens += self._count_tokens(message)
+        for message in self.get_spilled():
+            self._spilled_keys.add(self._spilled_key(message))
+
+    def _spilled_key(self, message: Message) -> bytes:
+        message_id, content = self._key(message)
+        return hashlib.blake2b(f"{message_id}\0{content}".encode("utf-8"), digest_size=16).digest()
+
+    def _count_tokens(self, message: Message) -> int:
+        if not self.max_tokens:
+            return 0
+        key = self._key(message)
+        if key not in self._token_counts:
+            self._token_counts[key] = count_output_tokens(str(message), TOKEN_COUNT_MODEL)
+        return self._token_counts[key]
+
+    def _unindex(self, message: Message):
+        self._total_tokens -= self._count_tokens(message)
+        super()._unindex(message)
+        key = self._key(message)
+        if key not in self._keys:
+            self._token_counts.pop(key, None)
+
+    def add(self, message: Message):
+        """Add a new message to the hot window, spilling the oldest messages beyond the limits"""
+        if self.ignore_id:
+            message.id = IGNORED_MESSAGE_ID
+        if self._spilled_key(message) in self._spilled_keys or self._contains(message):
+            return
+        super().add(message)
+        self._total_tokens += self._count_tokens(message)
+        self._evict()
+
+    def _evict(self):
+        evicted = []
+        while len(self.storage) > 1 and (
+            (self.max_messages and len(self.storage) > self.max_messages)
+            or (self.max_tokens and self._total_tokens > self.max_tokens)
+        ):
+            message = self.storage.pop(0)
+            self._unindex(message)
+            evicted.append(message)
+        if evicted:
+            self._spill(evicted)
+
+    def _spill(self, messages: list[Message]):
+        if self.spill_path:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as writer:
+                writer.writelines(f"{message.dump()}\n" for message in messages)
+        self._spilled_keys.update(self._spilled_key(message) for message in messages)
+        self.spilled += len(messages)
+
+    def find_news(self, observed: list[Message], k=0) -> list[Message]:
+        """find news (previously unseen messages) from the the most recent k memories, from all memories including the
+        spilled ones when k=0"""
+        news = super().find_news(observed, k)
+        if k or not self._spilled_keys:
+            return news
+        return [i for i in news if self._spilled_key(i) not in self._spilled_keys]
+
+    def get_spilled(self, offset: int = 0, limit: int = 0) -> list[Message]:
+        """Page back spilled messages from the oldest, return all of them from offset when limit=0"""
+        if not self.spill_path or not self.spill_path.exists():
+            return []
+        with open(self.spill_path, "r", encoding="utf-8") as reader:
+            lines = islice(reader, offset, offset + limit if limit else None)
+            return [message for message in map(Message.load, lines) if message]
+
+    def clear(self):
+        """Clear the hot window, the indexes and the spill log"""
+        super().clear()
+        if self.spill_path:
+            self.spill_path.unlink(missing_ok=True)
+        self.spilled = 0
+        self._spilled_keys = set()
+        self._token_counts = {}
+        self._total_tokens = 0
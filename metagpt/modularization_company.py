@@ -43,7 +43,7 @@ def generate_repo(
         QaEngineer
     )
     
-    from metagpt.team import Team
+    from metagpt.team import Team, run_company
 
     # Update config with project path and create context
     config.update_via_cli(project_path)
@@ -75,7 +75,7 @@ def generate_repo(
     # Fund and start the company
     company.invest(investment)
     company.run_project("New Project Started.")
-    asyncio.run(company.run(n_round=n_round))
+    asyncio.run(run_company(company, n_round=n_round))
 
     return ctx.repo
 
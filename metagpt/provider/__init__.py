@@ -6,19 +6,27 @@
 @File    : __init__.py
 """
 
-from metagpt.provider.google_gemini_api import GeminiLLM
-from metagpt.provider.ollama_api import OllamaLLM
-from metagpt.provider.openai_api import OpenAILLM
-from metagpt.provider.zhipuai_api import ZhiPuAILLM
-from metagpt.provider.azure_openai_api import AzureOpenAILLM
-from metagpt.provider.metagpt_api import MetaGPTLLM
-from metagpt.provider.human_provider import HumanProvider
-from metagpt.provider.spark_api import SparkLLM
-from metagpt.provider.qianfan_api import QianFanLLM
-from metagpt.provider.dashscope_api import DashScopeLLM
-from metagpt.provider.anthropic_api import AnthropicLLM
-from metagpt.provider.bedrock_api import BedrockLLM
-from metagpt.provider.ark_api import ArkLLM
+from metagpt.utils.lazy_import import lazy_attributes
+
+# Providers are imported on first use, each of them pulls in the SDK of its vendor
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "GeminiLLM": "metagpt.provider.google_gemini_api",
+        "OllamaLLM": "metagpt.provider.ollama_api",
+        "OpenAILLM": "metagpt.provider.openai_api",
+        "ZhiPuAILLM": "metagpt.provider.zhipuai_api",
+        "AzureOpenAILLM": "metagpt.provider.azure_openai_api",
+        "MetaGPTLLM": "metagpt.provider.metagpt_api",
+        "HumanProvider": "metagpt.provider.human_provider",
+        "SparkLLM": "metagpt.provider.spark_api",
+        "QianFanLLM": "metagpt.provider.qianfan_api",
+        "DashScopeLLM": "metagpt.provider.dashscope_api",
+        "AnthropicLLM": "metagpt.provider.anthropic_api",
+        "BedrockLLM": "metagpt.provider.bedrock_api",
+        "ArkLLM": "metagpt.provider.ark_api",
+    },
+)
 
 __all__ = [
     "GeminiLLM",
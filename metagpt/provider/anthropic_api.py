@@ -8,7 +8,7 @@ from metagpt.configs.llm_config import LLMConfig, LLMType
 from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.logs import log_llm_stream
 from metagpt.provider.base_llm import BaseLLM
-from metagpt.provider.llm_provider_registry import register_provider
+from metagpt.provider.llm_provider_registry import LLM_CLIENT_POOL, register_provider
 
 
 @register_provider([LLMType.ANTHROPIC, LLMType.CLAUDE])
@@ -19,7 +19,9 @@ class AnthropicLLM(BaseLLM):
 
     def __init_anthropic(self):
         self.model = self.config.model
-        self.aclient: AsyncAnthropic = AsyncAnthropic(api_key=self.config.api_key, base_url=self.config.base_url)
+        self.aclient: AsyncAnthropic = LLM_CLIENT_POOL.get_or_create(
+            self.config, lambda: AsyncAnthropic(api_key=self.config.api_key, base_url=self.config.base_url)
+        )
 
     def _const_kwargs(self, messages: list[dict], stream: bool = False) -> dict:
         kwargs = {
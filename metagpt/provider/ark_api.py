@@ -25,7 +25,7 @@ from volcenginesdkarkruntime.types.chat import ChatCompletion, ChatCompletionChu
 from metagpt.configs.llm_config import LLMType
 from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.logs import log_llm_stream
-from metagpt.provider.llm_provider_registry import register_provider
+from metagpt.provider.llm_provider_registry import LLM_CLIENT_POOL, register_provider
 from metagpt.provider.openai_api import OpenAILLM
 from metagpt.utils.token_counter import DOUBAO_TOKEN_COSTS
 
@@ -45,8 +45,7 @@ class ArkLLM(OpenAILLM):
             self.config.endpoint or self.config.model
         )  # endpoint name, See more: https://console.volcengine.com/ark/region:ark+cn-beijing/endpoint
         self.pricing_plan = self.config.pricing_plan or self.model
-        kwargs = self._make_client_kwargs()
-        self.aclient = AsyncArk(**kwargs)
+        self.aclient = LLM_CLIENT_POOL.get_or_create(self.config, lambda: AsyncArk(**self._make_client_kwargs()))
 
     def _make_client_kwargs(self) -> dict:
         kvs = {
@@ -10,7 +10,7 @@ from openai import AsyncAzureOpenAI
 from openai._base_client import AsyncHttpxClientWrapper
 
 from metagpt.configs.llm_config import LLMType
-from metagpt.provider.llm_provider_registry import register_provider
+from metagpt.provider.llm_provider_registry import LLM_CLIENT_POOL, register_provider
 from metagpt.provider.openai_api import OpenAILLM
 
 
@@ -21,9 +21,10 @@ class AzureOpenAILLM(OpenAILLM):
     """
 
     def _init_client(self):
-        kwargs = self._make_client_kwargs()
         # https://learn.microsoft.com/zh-cn/azure/ai-services/openai/how-to/migration?tabs=python-new%2Cdalle-fix
-        self.aclient = AsyncAzureOpenAI(**kwargs)
+        self.aclient = LLM_CLIENT_POOL.get_or_create(
+            self.config, lambda: AsyncAzureOpenAI(**self._make_client_kwargs())
+        )
         self.model = self.config.model  # Used in _calc_usage & _cons_kwargs
         self.pricing_plan = self.config.pricing_plan or self.model
 
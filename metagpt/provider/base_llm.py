@@ -28,6 +28,8 @@ from metagpt.logs import logger
 from metagpt.schema import Message
 from metagpt.utils.common import log_and_reraise
 from metagpt.utils.cost_manager import CostManager, Costs
+from metagpt.provider.llm_scheduler import with_request_scheduler
+from metagpt.utils.llm_cache import with_response_cache
 
 
 class BaseLLM(ABC):
@@ -187,6 +189,7 @@ class BaseLLM(ABC):
     async def _achat_completion_stream(self, messages: list[dict], timeout: int = USE_CONFIG_TIMEOUT) -> str:
         """_achat_completion_stream implemented by inherited class"""
 
+    @with_response_cache
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_random_exponential(min=1, max=60),
@@ -194,6 +197,7 @@ class BaseLLM(ABC):
         retry=retry_if_exception_type(ConnectionError),
         retry_error_callback=log_and_reraise,
     )
+    @with_request_scheduler
     async def acompletion_text(
         self, messages: list[dict], stream: bool = False, timeout: int = USE_CONFIG_TIMEOUT
     ) -> str:
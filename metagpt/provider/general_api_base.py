@@ -3,6 +3,7 @@
 # @Desc   : refs to openai 0.x sdk
 
 import asyncio
+import atexit
 import json
 import os
 import platform
@@ -10,6 +11,7 @@ import re
 import sys
 import threading
 import time
+import weakref
 from contextlib import asynccontextmanager
 from enum import Enum
 from typing import (
@@ -232,12 +234,14 @@ class APIRequestor:
         api_type=None,
         api_version=None,
         organization=None,
+        session_pool: Optional["ClientSessionPool"] = None,
     ):
         self.base_url = base_url or openai.base_url
         self.api_key = key or openai.api_key
         self.api_type = ApiType.from_str(api_type) if api_type else ApiType.from_str("openai")
         self.api_version = api_version or openai.api_version
         self.organization = organization or openai.organization
+        self.session_pool = session_pool or default_session_pool
 
     @overload
     def request(
@@ -388,22 +392,21 @@ class APIRequestor:
         request_id: Optional[str] = None,
         request_timeout: Optional[Union[float, Tuple[float, float]]] = None,
     ) -> Tuple[Union[OpenAIResponse, AsyncGenerator[OpenAIResponse, None]], bool, str]:
-        ctx = aiohttp_session()
-        session = await ctx.__aenter__()
+        session = await self.session_pool.get_session()
+        result = await self.arequest_raw(
+            method.lower(),
+            url,
+            session,
+            params=params,
+            supplied_headers=headers,
+            files=files,
+            request_id=request_id,
+            request_timeout=request_timeout,
+        )
         try:
-            result = await self.arequest_raw(
-                method.lower(),
-                url,
-                session,
-                params=params,
-                supplied_headers=headers,
-                files=files,
-                request_id=request_id,
-                request_timeout=request_timeout,
-            )
             resp, got_stream = await self._interpret_async_response(result, stream)
         except Exception:
-            await ctx.__aexit__(None, None, None)
+            result.release()
             raise
         if got_stream:
 
@@ -413,11 +416,12 @@ class APIRequestor:
                     async for r in resp:
                         yield r
                 finally:
-                    await ctx.__aexit__(None, None, None)
+                    # Give the connection back to the pool, it is closed if the stream was not read to the end
+                    result.release()
 
             return wrap_resp(), got_stream, self.api_key
         else:
-            await ctx.__aexit__(None, None, None)
+            result.release()
             return resp, got_stream, self.api_key
 
     def request_headers(self, method: str, extra, request_id: Optional[str]) -> Dict[str, str]:
@@ -620,3 +624,102 @@ class APIRequestor:
 async def aiohttp_session() -> AsyncIterator[aiohttp.ClientSession]:
     async with aiohttp.ClientSession() as session:
         yield session
+
+
+class ClientSessionPool:
+    """Long-lived aiohttp client sessions, one per event loop, so that requests reuse keep-alive connections instead
+    of paying DNS, TCP and TLS setup each time.
+
+    The number of connections created and reused is counted in `connections_created` and `connections_reused`.
+    `close` closes the session of the running loop. A session is also closed when its loop shuts down through
+    `asyncio.run`, which cancels the pending tasks, including the one closing the session, before closing the loop.
+
+    :param limit: Maximum number of connections of a session, 0 for no limit.
+    :param limit_per_host: Maximum number of connections to the same host, 0 for no limit.
+    :param keepalive_timeout: Seconds an idle connection is kept open.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 0, keepalive_timeout: float = 30.0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.connections_created = 0
+        self.connections_reused = 0
+        self._sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()  # event loop -> session
+        self._closers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()  # event loop -> task closing its session
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the session of the running event loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            self._drop_closed_loops()
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_end.append(self._on_connection_created)
+            trace_config.on_connection_reuseconn.append(self._on_connection_reused)
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host, keepalive_timeout=self.keepalive_timeout
+            )
+            session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+            self._sessions[loop] = session
+            closer = self._closers.pop(loop, None)
+            if closer:
+                closer.cancel()
+            self._closers[loop] = loop.create_task(self._close_on_cancel(session), name="ClientSessionPool.close")
+        return session
+
+    async def close(self):
+        """Close the session of the running event loop and its connections."""
+        loop = asyncio.get_running_loop()
+        self._sessions.pop(loop, None)
+        closer = self._closers.pop(loop, None)
+        if closer:
+            closer.cancel()
+            await asyncio.gather(closer, return_exceptions=True)
+
+    def close_all(self):
+        """Close the sessions of the event loops which can still run, called at exit."""
+        for loop, closer in list(self._closers.items()):
+            if not loop.is_closed() and not loop.is_running():
+                closer.cancel()
+                loop.run_until_complete(asyncio.gather(closer, return_exceptions=True))
+        self._drop_closed_loops()
+        self._sessions.clear()
+        self._closers.clear()
+
+    @property
+    def reuse_ratio(self) -> float:
+        total = self.connections_created + self.connections_reused
+        return self.connections_reused / total if total else 0.0
+
+    def _drop_closed_loops(self):
+        for loop, session in list(self._sessions.items()):
+            if loop.is_closed():
+                # The loop was closed without cancelling its tasks, the connections can no longer be closed
+                # gracefully, release them without the unclosed connector error
+                if session.connector is not None:
+                    session.connector._close()
+                session.detach()
+                del self._sessions[loop]
+        for loop, closer in list(self._closers.items()):
+            if loop.is_closed():
+                closer._log_destroy_pending = False  # a task of a closed loop can not be cancelled
+                del self._closers[loop]
+
+    @staticmethod
+    async def _close_on_cancel(session: aiohttp.ClientSession):
+        """Wait until cancelled, by `close` or by the shutdown of the event loop, then close the session."""
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            await session.close()
+
+    async def _on_connection_created(self, session, trace_config_ctx, params):
+        self.connections_created += 1
+
+    async def _on_connection_reused(self, session, trace_config_ctx, params):
+        self.connections_reused += 1
+
+
+default_session_pool = ClientSessionPool()
+atexit.register(default_session_pool.close_all)
@@ -5,9 +5,39 @@
 @Author  : alexanderwu
 @File    : llm_provider_registry.py
 """
+import asyncio
+import importlib
+import inspect
+import weakref
+from typing import Any, Callable
+
 from metagpt.configs.llm_config import LLMConfig, LLMType
+from metagpt.logs import logger
 from metagpt.provider.base_llm import BaseLLM
 
+# Modules registering the providers, imported when their provider is first requested
+PROVIDER_MODULES = {
+    LLMType.OPENAI: "metagpt.provider.openai_api",
+    LLMType.FIREWORKS: "metagpt.provider.openai_api",
+    LLMType.OPEN_LLM: "metagpt.provider.openai_api",
+    LLMType.MOONSHOT: "metagpt.provider.openai_api",
+    LLMType.MISTRAL: "metagpt.provider.openai_api",
+    LLMType.YI: "metagpt.provider.openai_api",
+    LLMType.OPENROUTER: "metagpt.provider.openai_api",
+    LLMType.ANTHROPIC: "metagpt.provider.anthropic_api",
+    LLMType.CLAUDE: "metagpt.provider.anthropic_api",
+    LLMType.SPARK: "metagpt.provider.spark_api",
+    LLMType.ZHIPUAI: "metagpt.provider.zhipuai_api",
+    LLMType.GEMINI: "metagpt.provider.google_gemini_api",
+    LLMType.METAGPT: "metagpt.provider.metagpt_api",
+    LLMType.AZURE: "metagpt.provider.azure_openai_api",
+    LLMType.OLLAMA: "metagpt.provider.ollama_api",
+    LLMType.QIANFAN: "metagpt.provider.qianfan_api",
+    LLMType.DASHSCOPE: "metagpt.provider.dashscope_api",
+    LLMType.BEDROCK: "metagpt.provider.bedrock_api",
+    LLMType.ARK: "metagpt.provider.ark_api",
+}
+
 
 class LLMProviderRegistry:
     def __init__(self):
@@ -18,9 +48,93 @@ class LLMProviderRegistry:
 
     def get_provider(self, enum: LLMType):
         """get provider instance according to the enum"""
+        if enum not in self.providers and enum in PROVIDER_MODULES:
+            importlib.import_module(PROVIDER_MODULES[enum])  # registers the provider
         return self.providers[enum]
 
 
+class LLMClientPool:
+    """Process-wide pool of provider clients.
+
+    LLM instances carry per-role state such as the system prompt and the cost manager, so every role keeps its own
+    instance, but instances talking to the same endpoint with the same credentials share one client, and with it
+    one keep-alive HTTP connection pool.
+
+    The connections of a client belong to the event loop they were opened in, so clients are pooled per event loop
+    and instances hold a `PooledClient`, which uses the client of the running loop. Clients of closed event loops
+    are dropped.
+    """
+
+    def __init__(self):
+        self._clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()  # event loop -> {client key: client}
+        self._loopless_clients = {}  # clients used outside of any event loop
+
+    @staticmethod
+    def client_key(config: LLMConfig) -> tuple:
+        """Fields of the config which the client depends on"""
+        return (
+            config.api_type,
+            config.base_url,
+            config.api_key,
+            config.api_version,
+            config.access_key,
+            config.secret_key,
+            config.proxy,
+        )
+
+    def get_or_create(self, config: LLMConfig, factory: Callable[[], Any]) -> "PooledClient":
+        """Return the pooled client for the config, the client of each event loop is created by factory on first use"""
+        return PooledClient(self, self.client_key(config), factory)
+
+    def get_client(self, key: tuple, factory: Callable[[], Any]) -> Any:
+        """Return the client of the running event loop for the key, create it by factory if not existed"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            clients = self._loopless_clients
+        else:
+            clients = self._clients.get(loop)
+            if clients is None:
+                self._drop_closed_loops()
+                clients = self._clients[loop] = {}
+        if key not in clients:
+            clients[key] = factory()
+        return clients[key]
+
+    async def aclose(self):
+        """Close the clients of the running event loop and their connection pools, must be awaited before the event
+        loop is closed. LLM instances create new clients on their next use."""
+        clients = list(self._clients.pop(asyncio.get_running_loop(), {}).values())
+        for client in clients:
+            close = getattr(client, "close", None)
+            if not close:
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Close {client.__class__.__name__} failed: {e}")
+
+    def _drop_closed_loops(self):
+        for loop in list(self._clients.keys()):
+            if loop.is_closed():
+                # The connections died with their loop, only forget the clients
+                del self._clients[loop]
+
+
+class PooledClient:
+    """Client held by LLM instances, forwarding to the pooled client of the running event loop"""
+
+    def __init__(self, pool: LLMClientPool, key: tuple, factory: Callable[[], Any]):
+        self._pool = pool
+        self._key = key
+        self._factory = factory
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool.get_client(self._key, self._factory), name)
+
+
 def register_provider(keys):
     """register provider to registry"""
 
@@ -40,5 +154,15 @@ def create_llm_instance(config: LLMConfig) -> BaseLLM:
     return LLM_REGISTRY.get_provider(config.api_type)(config)
 
 
+async def close_llm_clients():
+    """Shutdown hook closing the pooled clients and HTTP sessions of the running event loop"""
+    # Imported here, the registry is imported by every provider and must not load aiohttp for them
+    from metagpt.provider.general_api_base import default_session_pool
+
+    await LLM_CLIENT_POOL.aclose()
+    await default_session_pool.close()
+
+
 # Registry instance
 LLM_REGISTRY = LLMProviderRegistry()
+LLM_CLIENT_POOL = LLMClientPool()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : llm_scheduler.py
+@Desc    : Process-wide scheduler of LLM requests, enforcing the requests/min, tokens/min and concurrency budgets
+    of each model, serving queued requests by priority and pausing when the provider answers with Retry-After.
+"""
+import asyncio
+import functools
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Optional
+
+from metagpt.configs.llm_config import LLMConfig
+from metagpt.logs import logger
+from metagpt.utils.token_counter import count_input_tokens, count_output_tokens
+
+WINDOW_SECONDS = 60
+
+
+class LLMPriority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+_PRIORITY: ContextVar[LLMPriority] = ContextVar("llm_priority", default=LLMPriority.INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: LLMPriority):
+    """Set the priority of the LLM requests issued inside the block, including by the tasks it creates"""
+    token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+class LLMRequestScheduler:
+    """Rate limiter of one model, 0 means unlimited for any budget.
+
+    Requests wait in a priority queue, only the head of the queue is admitted once the sliding one-minute window
+    has room for one more request and its estimated tokens.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_concurrency: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self._requests: deque[float] = deque()
+        self._tokens: deque[tuple[float, int]] = deque()
+        self._running = 0
+        self._paused_until = 0.0
+        self._waiters: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond: Optional[asyncio.Condition] = None
+        self._loop = None
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    def _expire(self, now: float):
+        while self._requests and now - self._requests[0] >= WINDOW_SECONDS:
+            self._requests.popleft()
+        while self._tokens and now - self._tokens[0][0] >= WINDOW_SECONDS:
+            self._tokens.popleft()
+
+    def _delay(self, tokens: int) -> float:
+        """Seconds to wait before a request of tokens fits in the budgets, inf until a running request ends"""
+        now = time.monotonic()
+        self._expire(now)
+        if self._paused_until > now:
+            return self._paused_until - now
+        if self.max_concurrency and self._running >= self.max_concurrency:
+            return math.inf
+        if self.rpm and len(self._requests) >= self.rpm:
+            return self._requests[0] + WINDOW_SECONDS - now
+        if self.tpm and self._tokens:
+            used = sum(n for _, n in self._tokens)
+            for ts, n in self._tokens:
+                if used + tokens <= self.tpm:
+                    break
+                used -= n
+                if used + tokens <= self.tpm:
+                    return ts + WINDOW_SECONDS - now
+        return 0
+
+    async def acquire(self, tokens: int, priority: LLMPriority = LLMPriority.INTERACTIVE):
+        cond = self._condition()
+        ticket = (int(priority), next(self._seq))
+        async with cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    delay = math.inf
+                    if self._waiters[0] == ticket:
+                        delay = self._delay(tokens)
+                        if delay <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(cond.wait(), timeout=None if delay == math.inf else delay)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                cond.notify_all()
+                raise
+            heapq.heappop(self._waiters)
+            now = time.monotonic()
+            self._requests.append(now)
+            self._tokens.append((now, tokens))
+            self._running += 1
+            cond.notify_all()
+
+    async def release(self, tokens: int = 0):
+        """End a request, tokens are the completion tokens to account for in addition to the estimated ones"""
+        cond = self._condition()
+        async with cond:
+            self._running -= 1
+            if tokens:
+                self._tokens.append((time.monotonic(), tokens))
+            cond.notify_all()
+
+    async def pause(self, seconds: float):
+        """Admit no request during seconds, e.g. when the provider answers with a Retry-After header"""
+        cond = self._condition()
+        async with cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            cond.notify_all()
+
+
+_SCHEDULERS: dict[tuple, LLMRequestScheduler] = {}
+
+
+def get_scheduler(config: LLMConfig) -> Optional[LLMRequestScheduler]:
+    """Return the scheduler shared by every LLM instance of the same model, None if no budget is configured"""
+    if not (config.rpm or config.tpm or config.max_concurrency):
+        return None
+    key = (config.api_type, config.base_url, config.model)
+    if key not in _SCHEDULERS:
+        _SCHEDULERS[key] = LLMRequestScheduler(
+            rpm=config.rpm, tpm=config.tpm, max_concurrency=config.max_concurrency
+        )
+    return _SCHEDULERS[key]
+
+
+def estimate_tokens(messages: list[dict], model: str) -> int:
+    """Estimate the prompt tokens of messages, falling back to the cl100k_base encoding for unknown models"""
+    try:
+        return count_input_tokens(messages, model)
+    except (NotImplementedError, KeyError, TypeError):
+        text = "\n".join(str(msg.get("content", "")) for msg in messages)
+        return count_output_tokens(text, model or "")
+
+
+def get_retry_after(e: Exception) -> Optional[float]:
+    """Seconds of the Retry-After header of the response of a failed request"""
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def with_request_scheduler(func):
+    """Decorate `acompletion_text` to go through the scheduler of the model of the LLM"""
+
+    @functools.wraps(func)
+    async def wrapper(self, messages: list[dict], *args, **kwargs) -> str:
+        scheduler = get_scheduler(self.config) if self.config else None
+        if not scheduler:
+            return await func(self, messages, *args, **kwargs)
+
+        model = self.model or self.config.model
+        await scheduler.acquire(estimate_tokens(messages, model), priority=_PRIORITY.get())
+        completion_tokens = 0
+        try:
+            rsp = await func(self, messages, *args, **kwargs)
+            completion_tokens = count_output_tokens(rsp or "", model or "")
+            return rsp
+        except Exception as e:
+            retry_after = get_retry_after(e)
+            if retry_after:
+                logger.warning(f"Rate limited by {model}, pause requests for {retry_after}s")
+                await scheduler.pause(retry_after)
+            raise
+        finally:
+            await scheduler.release(completion_tokens)
+
+    return wrapper
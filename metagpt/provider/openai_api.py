@@ -29,10 +29,12 @@ from metagpt.const import USE_CONFIG_TIMEOUT
 from metagpt.logs import log_llm_stream, logger
 from metagpt.provider.base_llm import BaseLLM
 from metagpt.provider.constant import GENERAL_FUNCTION_SCHEMA
-from metagpt.provider.llm_provider_registry import register_provider
+from metagpt.provider.llm_provider_registry import LLM_CLIENT_POOL, register_provider
+from metagpt.provider.llm_scheduler import with_request_scheduler
 from metagpt.utils.common import CodeParser, decode_image, log_and_reraise
 from metagpt.utils.cost_manager import CostManager
 from metagpt.utils.exceptions import handle_exception
+from metagpt.utils.llm_cache import with_response_cache
 from metagpt.utils.token_counter import (
     count_input_tokens,
     count_output_tokens,
@@ -65,8 +67,7 @@ class OpenAILLM(BaseLLM):
         """https://github.com/openai/openai-python#async-usage"""
         self.model = self.config.model  # Used in _calc_usage & _cons_kwargs
         self.pricing_plan = self.config.pricing_plan or self.model
-        kwargs = self._make_client_kwargs()
-        self.aclient = AsyncOpenAI(**kwargs)
+        self.aclient = LLM_CLIENT_POOL.get_or_create(self.config, lambda: AsyncOpenAI(**self._make_client_kwargs()))
 
     def _make_client_kwargs(self) -> dict:
         kwargs = {"api_key": self.config.api_key, "base_url": self.config.base_url}
@@ -145,6 +146,7 @@ class OpenAILLM(BaseLLM):
     async def acompletion(self, messages: list[dict], timeout=USE_CONFIG_TIMEOUT) -> ChatCompletion:
         return await self._achat_completion(messages, timeout=self.get_timeout(timeout))
 
+    @with_response_cache
     @retry(
         wait=wait_random_exponential(min=1, max=60),
         stop=stop_after_attempt(6),
@@ -152,6 +154,7 @@ class OpenAILLM(BaseLLM):
         retry=retry_if_exception_type(APIConnectionError),
         retry_error_callback=log_and_reraise,
     )
+    @with_request_scheduler
     async def acompletion_text(self, messages: list[dict], stream=False, timeout=USE_CONFIG_TIMEOUT) -> str:
         """when streaming, print each token in place."""
         if stream:
@@ -1,9 +1,12 @@
 """Simple Engine."""
 
+import asyncio
+import hashlib
 import json
 import os
 import time
 import nest_asyncio
+import numpy as np
 from typing import Any, Optional, Union
 
 from llama_index.core import SimpleDirectoryReader, ServiceContext, VectorStoreIndex
@@ -13,6 +16,7 @@ from llama_index.core.embeddings.mock_embed_model import MockEmbedding
 from llama_index.core.indices.base import BaseIndex
 from llama_index.core.ingestion.pipeline import run_transformations
 from llama_index.core.llms import LLM
+from pathlib import Path
 from statistics import mean
 from llama_index.core.node_parser import SentenceSplitter, SemanticSplitterNodeParser
 from llama_index.core.postprocessor.types import BaseNodePostprocessor
@@ -22,16 +26,20 @@ from llama_index.core.response_synthesizers import (
     BaseSynthesizer,
     get_response_synthesizer,
 )
-from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.retrievers import BaseRetriever, VectorIndexRetriever
+from llama_index.core.vector_stores.types import VectorStoreQueryMode, VectorStoreQueryResult
 from llama_index.core.schema import (
     BaseNode,
     Document,
+    MetadataMode,
     NodeWithScore,
     QueryBundle,
     QueryType,
     TransformComponent,
 )
 
+from llama_index.vector_stores.faiss import FaissVectorStore
+
 from llama_index.core.evaluation import (
     DatasetGenerator,
     FaithfulnessEvaluator,
@@ -40,6 +48,7 @@ from llama_index.core.evaluation import (
 )
 
 from metagpt.config2 import config
+from metagpt.logs import logger
 from metagpt.rag.factories import (
     get_index,
     get_rag_embedding,
@@ -50,18 +59,27 @@ from metagpt.rag.factories import (
 from metagpt.rag.interface import NoEmbedding, RAGObject
 from metagpt.rag.parsers import OmniParse
 from metagpt.rag.retrievers.base import ModifiableRAGRetriever, PersistableRAGRetriever
+from metagpt.rag.retrievers.bm25_retriever import DynamicBM25Retriever
 from metagpt.rag.retrievers.hybrid_retriever import SimpleHybridRetriever
 from metagpt.rag.schema import (
     BaseIndexConfig,
     BaseRankerConfig,
     BaseRetrieverConfig,
     BM25RetrieverConfig,
+    FAISSIndexConfig,
+    IndexUpdateReport,
     ObjectNode,
     OmniParseOptions,
     OmniParseType,
     ParseResultType,
 )
-from metagpt.utils.common import import_class
+from metagpt.utils.common import import_class, read_json_file, write_json_file
+
+# Persisted alongside the index, maps node id to its content fingerprint and source file
+FINGERPRINTS_FILENAME = "fingerprints.json"
+
+# Engines loaded by SimpleEngine.from_index_cached, shared process-wide
+_ENGINE_CACHE: dict[tuple, "SimpleEngine"] = {}
 
 
 class SimpleEngine(RetrieverQueryEngine):
@@ -88,6 +106,7 @@ class SimpleEngine(RetrieverQueryEngine):
             callback_manager=callback_manager,
         )
         self._transformations = transformations or self._default_transformations()
+        self.index_update_report: Optional[IndexUpdateReport] = None
 
     @staticmethod
     def get_eval_results(key, eval_results):
@@ -209,6 +228,76 @@ class SimpleEngine(RetrieverQueryEngine):
             ranker_configs=ranker_configs,
         )
     
+    @classmethod
+    def from_nodes_incrementally(
+        cls,
+        nodes: list[BaseNode],
+        persist_dir: Union[str, os.PathLike],
+        transformations: Optional[list[TransformComponent]] = None,
+        embed_model: BaseEmbedding = None,
+        llm: LLM = None,
+        retriever_configs: list[BaseRetrieverConfig] = None,
+        ranker_configs: list[BaseRankerConfig] = None,
+    ) -> "SimpleEngine":
+        """From nodes, reusing the embeddings of a FAISS index previously persisted to persist_dir.
+
+        Every node is fingerprinted by its embedding content and the embed model. Nodes whose fingerprint is already
+        in the persisted index get their previous embedding back, so only new or changed nodes are embedded, and
+        persisted nodes which are no longer given are dropped. The engine and the updated fingerprints are then
+        persisted to persist_dir, and what was reused is reported in `index_update_report`.
+
+        Args:
+            nodes: Nodes to index.
+            persist_dir: The directory of the persisted index, which is created on the first run.
+            transformations: Parse documents to nodes. Default [SentenceSplitter].
+            embed_model: Parse nodes to embedding. Must supported by llama index. Default OpenAIEmbedding.
+            llm: Must supported by llama index. Default OpenAI.
+            retriever_configs: Configuration for retrievers. If more than one config, will use SimpleHybridRetriever.
+            ranker_configs: Configuration for rankers.
+        """
+        persist_dir = Path(persist_dir)
+        embed_model = cls._resolve_embed_model(embed_model, retriever_configs)
+        persisted = cls._load_persisted_embeddings(persist_dir, embed_model)
+
+        fingerprints = {}
+        report = IndexUpdateReport()
+        changed_files = set()
+        for node in nodes:
+            fingerprint = cls._node_fingerprint(node, embed_model)
+            file_path = node.metadata.get("file_path", "")
+            fingerprints[node.node_id] = {"fingerprint": fingerprint, "file_path": file_path}
+            if node.embedding is None and fingerprint in persisted:
+                node.embedding = persisted[fingerprint]
+                report.reused += 1
+            else:
+                report.embedded += 1
+                changed_files.add(file_path)
+
+        # Persisted fingerprints no longer given belong to stale nodes
+        old_files = {i["file_path"] for i in cls._read_fingerprints(persist_dir).values()}
+        report.deleted = len(persisted.keys() - {i["fingerprint"] for i in fingerprints.values()})
+        report.changed_files = sorted(changed_files)
+        report.deleted_files = sorted(old_files - {i["file_path"] for i in fingerprints.values()})
+
+        engine = cls._from_nodes(
+            nodes=nodes,
+            transformations=transformations,
+            embed_model=embed_model,
+            llm=llm,
+            retriever_configs=retriever_configs,
+            ranker_configs=ranker_configs,
+        )
+        persist_dir.mkdir(parents=True, exist_ok=True)
+        engine.persist(persist_dir)
+        write_json_file(persist_dir / FINGERPRINTS_FILENAME, fingerprints)
+
+        engine.index_update_report = report
+        logger.info(
+            f"Incremental index update of {persist_dir} | reused: {report.reused}, embedded: {report.embedded}, "
+            f"deleted: {report.deleted}"
+        )
+        return engine
+
     @classmethod
     def from_objs(
         cls,
@@ -257,7 +346,50 @@ class SimpleEngine(RetrieverQueryEngine):
     ) -> "SimpleEngine":
         """Load from previously maintained index by self.persist(), index_config contains persis_path."""
         index = get_index(index_config, embed_model=cls._resolve_embed_model(embed_model, [index_config]))
-        return cls._from_index(index, llm=llm, retriever_configs=retriever_configs, ranker_configs=ranker_configs)
+        return cls._from_index(
+            index,
+            llm=llm,
+            retriever_configs=retriever_configs,
+            ranker_configs=ranker_configs,
+            persist_path=index_config.persist_path,
+        )
+
+    @classmethod
+    def from_index_cached(
+        cls,
+        index_config: BaseIndexConfig,
+        embed_model: BaseEmbedding = None,
+        llm: LLM = None,
+        retriever_configs: list[BaseRetrieverConfig] = None,
+        ranker_configs: list[BaseRankerConfig] = None,
+    ) -> "SimpleEngine":
+        """Same as from_index, but the engine is loaded once per process and shared by all callers.
+
+        Engines are keyed by the persist directory, a fingerprint of the files persisted in it and the configs, so an
+        index persisted again is reloaded on next use. The shared engine is meant for retrieval, add nodes to an
+        engine of your own.
+        """
+        persist_dir = Path(index_config.persist_path).resolve()
+        key = (
+            persist_dir,
+            cls._persist_dir_fingerprint(persist_dir),
+            repr(index_config),
+            repr(retriever_configs),
+            repr(ranker_configs),
+            id(embed_model) if embed_model else None,
+            id(llm) if llm else None,
+        )
+        if key not in _ENGINE_CACHE:
+            for stale in [k for k in _ENGINE_CACHE if k[0] == persist_dir and k[1] != key[1]]:
+                del _ENGINE_CACHE[stale]
+            _ENGINE_CACHE[key] = cls.from_index(
+                index_config,
+                embed_model=embed_model,
+                llm=llm,
+                retriever_configs=retriever_configs,
+                ranker_configs=ranker_configs,
+            )
+        return _ENGINE_CACHE[key]
 
     async def asearch(self, content: str, **kwargs) -> str:
         """Inplement tools.SearchInterface"""
@@ -281,6 +413,32 @@ class SimpleEngine(RetrieverQueryEngine):
         self._try_reconstruct_obj(nodes)
         return nodes
 
+    async def aretrieve_many(self, queries: list[QueryType]) -> list[list[NodeWithScore]]:
+        """Retrieve the nodes of several queries at once, in the order of the queries.
+
+        The queries are embedded together by a batch call of the embed model, and a FAISS index is searched with a
+        single matrix query, as a BM25 index is scored by a single sparse matrix product. Other retrievers retrieve
+        the queries concurrently, reusing the batch embeddings when they are vector retrievers.
+        """
+        query_bundles = [QueryBundle(query) if isinstance(query, str) else query for query in queries]
+        if not query_bundles:
+            return []
+        await self._aembed_query_bundles(query_bundles)
+
+        if self._is_plain_faiss_retriever():
+            results = self._search_faiss(query_bundles)
+        elif isinstance(self.retriever, DynamicBM25Retriever):
+            results = self.retriever.retrieve_many([i.query_str for i in query_bundles])
+        else:
+            results = await asyncio.gather(*[self.retriever.aretrieve(bundle) for bundle in query_bundles])
+
+        nodes_list = []
+        for nodes, query_bundle in zip(results, query_bundles):
+            nodes = self._apply_node_postprocessors(nodes, query_bundle=query_bundle)
+            self._try_reconstruct_obj(nodes)
+            nodes_list.append(nodes)
+        return nodes_list
+
     def add_docs(self, input_files: list[str]):
         """Add docs to retriever. retriever must has add_nodes func."""
         self._ensure_retriever_modifiable()
@@ -334,10 +492,12 @@ class SimpleEngine(RetrieverQueryEngine):
         llm: LLM = None,
         retriever_configs: list[BaseRetrieverConfig] = None,
         ranker_configs: list[BaseRankerConfig] = None,
+        persist_path: Union[str, os.PathLike] = None,
     ) -> "SimpleEngine":
         llm = llm or get_rag_llm()
 
-        retriever = get_retriever(configs=retriever_configs, index=index)  # Default index.as_retriever
+        # Default index.as_retriever, persist_path lets retrievers reuse what they persisted along with the index
+        retriever = get_retriever(configs=retriever_configs, index=index, persist_path=persist_path)
         rankers = get_rankers(configs=ranker_configs, llm=llm)  # Default []
 
         return cls(
@@ -367,12 +527,94 @@ class SimpleEngine(RetrieverQueryEngine):
         if not isinstance(self.retriever, required_type):
             raise TypeError(f"The retriever is not of type {required_type.__name__}: {type(self.retriever)}")
 
+    async def _aembed_query_bundles(self, query_bundles: list[QueryBundle]):
+        """Fill in the embedding of the query bundles embedded as a single string, in one batch."""
+        embed_model = getattr(self.retriever, "_embed_model", None)
+        if not isinstance(embed_model, BaseEmbedding):
+            return
+        pending = [i for i in query_bundles if i.embedding is None and len(i.embedding_strs) == 1]
+        if not pending:
+            return
+        # Text and query embeddings are the same for the embed models of get_rag_embedding
+        embeddings = await embed_model.aget_text_embedding_batch([i.embedding_strs[0] for i in pending])
+        for query_bundle, embedding in zip(pending, embeddings):
+            query_bundle.embedding = embedding
+
+    def _is_plain_faiss_retriever(self) -> bool:
+        """Whether the retriever is a vector retriever of a FAISS index without filters, which may be searched directly.
+
+        Besides FAISSRetriever, this is the VectorIndexRetriever of the engines loaded by `from_index_cached`. Its node
+        and doc ids are not checked, FaissVectorStore ignores them when queried.
+        """
+        retriever = self.retriever
+        return (
+            isinstance(retriever, VectorIndexRetriever)
+            and isinstance(retriever._vector_store, FaissVectorStore)
+            and retriever._vector_store_query_mode == VectorStoreQueryMode.DEFAULT
+            and retriever._filters is None
+        )
+
+    def _search_faiss(self, query_bundles: list[QueryBundle]) -> list[list[NodeWithScore]]:
+        """Search the FAISS index of the retriever for all the embedded query bundles with a single matrix query."""
+        retriever = self.retriever
+        embeddings = np.array([i.embedding for i in query_bundles], dtype="float32")
+        distances, indices = retriever._vector_store.client.search(embeddings, retriever._similarity_top_k)
+
+        results = []
+        for row_distances, row_indices in zip(distances, indices):
+            found = [(str(idx), float(dist)) for dist, idx in zip(row_distances, row_indices) if idx >= 0]
+            query_result = VectorStoreQueryResult(ids=[i[0] for i in found], similarities=[i[1] for i in found])
+            results.append(retriever._build_node_list_from_query_result(query_result))
+        return results
+
     def _save_nodes(self, nodes: list[BaseNode]):
         self.retriever.add_nodes(nodes)
 
     def _persist(self, persist_dir: str, **kwargs):
         self.retriever.persist(persist_dir, **kwargs)
 
+    @staticmethod
+    def _node_fingerprint(node: BaseNode, embed_model: BaseEmbedding) -> str:
+        """Fingerprint of what gets embedded for a node, identical fingerprints share the same embedding."""
+        content = node.get_content(metadata_mode=MetadataMode.EMBED)
+        payload = json.dumps([content, embed_model.model_name], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _persist_dir_fingerprint(persist_dir: Path) -> tuple:
+        """Name, size and modification time of the files persisted in persist_dir."""
+        if not persist_dir.is_dir():
+            return ()
+        with os.scandir(persist_dir) as entries:
+            files = sorted((entry.name, entry.stat()) for entry in entries if entry.is_file())
+        return tuple((name, stat.st_size, stat.st_mtime_ns) for name, stat in files)
+
+    @staticmethod
+    def _read_fingerprints(persist_dir: Path) -> dict[str, dict]:
+        pathname = persist_dir / FINGERPRINTS_FILENAME
+        if not pathname.exists():
+            return {}
+        try:
+            return read_json_file(pathname)
+        except ValueError:
+            logger.warning(f"Invalid fingerprints {pathname}, all nodes will be embedded")
+            return {}
+
+    @classmethod
+    def _load_persisted_embeddings(cls, persist_dir: Path, embed_model: BaseEmbedding) -> dict[str, list[float]]:
+        """Load the embeddings of a persisted FAISS index, keyed by the fingerprint of their node."""
+        fingerprints = cls._read_fingerprints(persist_dir)
+        if not fingerprints:
+            return {}
+
+        index = get_index(FAISSIndexConfig(persist_path=persist_dir), embed_model=embed_model)
+        faiss_index = index.vector_store.client
+        embeddings = {}
+        for faiss_id, node_id in index.index_struct.nodes_dict.items():
+            if node_id in fingerprints:
+                embeddings[fingerprints[node_id]["fingerprint"]] = faiss_index.reconstruct(int(faiss_id)).tolist()
+        return embeddings
+
     @staticmethod
     def _try_reconstruct_obj(nodes: list[NodeWithScore]):
         """If node is object, then dynamically reconstruct object, and save object to node.metadata["obj"]."""
@@ -27,6 +27,7 @@ from metagpt.rag.schema import (
     ElasticsearchKeywordRetrieverConfig,
     ElasticsearchRetrieverConfig,
     FAISSRetrieverConfig,
+    HybridRetrieverConfig,
 )
 
 
@@ -62,14 +63,25 @@ class RetrieverFactory(ConfigBasedFactory):
     def get_retriever(self, configs: list[BaseRetrieverConfig] = None, **kwargs) -> RAGRetriever:
         """Creates and returns a retriever instance based on the provided configurations.
 
-        If multiple retrievers, using SimpleHybridRetriever.
+        If multiple retrievers, using SimpleHybridRetriever, which fuses the results as set by a HybridRetrieverConfig
+        among the configs.
         """
+        hybrid_configs = [config for config in configs or [] if isinstance(config, HybridRetrieverConfig)]
+        configs = [config for config in configs or [] if not isinstance(config, HybridRetrieverConfig)]
         if not configs:
             return self._create_default(**kwargs)
 
         retrievers = super().get_instances(configs, **kwargs)
-
-        return SimpleHybridRetriever(*retrievers) if len(retrievers) > 1 else retrievers[0]
+        if len(retrievers) == 1:
+            return retrievers[0]
+
+        hybrid_config = hybrid_configs[0] if hybrid_configs else HybridRetrieverConfig()
+        return SimpleHybridRetriever(
+            *retrievers,
+            timeouts=[config.timeout for config in configs],
+            weights=[config.fusion_weight for config in configs],
+            **hybrid_config.model_dump(),
+        )
 
     def _create_default(self, **kwargs) -> RAGRetriever:
         index = self._extract_index(None, **kwargs) or self._build_default_index(**kwargs)
@@ -85,6 +97,7 @@ class RetrieverFactory(ConfigBasedFactory):
     def _create_bm25_retriever(self, config: BM25RetrieverConfig, **kwargs) -> DynamicBM25Retriever:
         index = self._extract_index(config, **kwargs)
         nodes = list(index.docstore.docs.values()) if index else self._extract_nodes(config, **kwargs)
+        config.persist_path = self._val_from_config_or_kwargs("persist_path", config, **kwargs)
 
         return DynamicBM25Retriever(nodes=nodes, **config.model_dump())
 
@@ -1,16 +1,235 @@
 """BM25 retriever."""
-from typing import Callable, Optional
+import hashlib
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional, Union
 
+import numpy as np
 from llama_index.core import VectorStoreIndex
+from llama_index.core.base.base_retriever import BaseRetriever
 from llama_index.core.callbacks.base import CallbackManager
 from llama_index.core.constants import DEFAULT_SIMILARITY_TOP_K
-from llama_index.core.schema import BaseNode, IndexNode
+from llama_index.core.schema import BaseNode, IndexNode, NodeWithScore, QueryBundle
+from llama_index.core.utils import globals_helper
 from llama_index.retrievers.bm25 import BM25Retriever
-from rank_bm25 import BM25Okapi
+from nltk.stem import PorterStemmer
+from scipy import sparse
+
+from metagpt.logs import logger
+
+BM25_INDEX_FILENAME = "bm25_index.npz"
+WORD_PATTERN = re.compile(r"\w+")
+
+_stemmer = PorterStemmer()
+
+
+@lru_cache(maxsize=100000)
+def _stem(word: str) -> str:
+    return _stemmer.stem(word)
+
+
+@lru_cache(maxsize=1)
+def _stopwords() -> frozenset[str]:
+    return frozenset(globals_helper.stopwords)
+
+
+def tokenize_remove_stopwords(text: str) -> list[str]:
+    """Same tokens as the default tokenizer of llama_index's BM25Retriever, the stems of the distinct keywords of the
+    text, without going through the pandas value counts of `simple_extract_keywords` and with the stems cached.
+    """
+    stopwords = _stopwords()
+    keywords = {word for word in WORD_PATTERN.findall(text.lower()) if word not in stopwords}
+    return [_stem(word) for word in keywords]
+
+
+class BM25Index:
+    """BM25Okapi index maintained incrementally, scoring the same as `rank_bm25.BM25Okapi`.
+
+    The term frequencies of each document are kept as sparse rows, with the document lengths and the document
+    frequencies of the terms, so adding or deleting a document costs its number of tokens. Deleted rows are
+    tombstoned and dropped once they outnumber the live ones. The BM25 weights depend on corpus wide statistics, they
+    are recomputed with a few vectorized operations on the first query after a change.
+
+    The index may be queried and changed from several threads, `lock` is held by every method reading or changing
+    the rows, and by callers mapping the rows of the scores back to nodes.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.vocabulary: dict[str, int] = {}
+        self.doc_freqs: list[int] = []  # by term id
+        self.node_ids: list[Optional[str]] = []  # by row, None if deleted
+        self.hashes: list[str] = []  # by row, the hash of the content tokenized
+        self.doc_lens: list[int] = []  # by row, 0 if deleted
+        self.rows: dict[str, int] = {}  # node id -> row
+        self.total_len = 0
+        self.version = 0  # changed whenever rows are added, deleted or renumbered
+        self._term_ids: list[np.ndarray] = []  # by row
+        self._term_freqs: list[np.ndarray] = []  # by row
+        self._weights: Optional[sparse.csc_matrix] = None  # by column of term for the queries
+        self._deleted: Optional[np.ndarray] = None
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, node_id: str, tokens: Union[list[str], dict[str, int]], content_hash: str = ""):
+        """Add or replace the document of a node, `tokens` may be given as term frequencies."""
+        with self.lock:
+            self.delete(node_id)
+            freqs = tokens if isinstance(tokens, dict) else Counter(tokens)
+            term_ids = np.fromiter((self._term_id(term) for term in freqs), dtype=np.int64, count=len(freqs))
+            for i in term_ids:
+                self.doc_freqs[i] += 1
+            doc_len = sum(freqs.values())
+            self.rows[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+            self.hashes.append(content_hash)
+            self.doc_lens.append(doc_len)
+            self._term_ids.append(term_ids)
+            self._term_freqs.append(np.fromiter(freqs.values(), dtype=np.float64, count=len(freqs)))
+            self.total_len += doc_len
+            self._changed()
+
+    def delete(self, node_id: str) -> bool:
+        """Delete the document of a node, return False if there is none."""
+        with self.lock:
+            row = self.rows.pop(node_id, None)
+            if row is None:
+                return False
+            for i in self._term_ids[row]:
+                self.doc_freqs[i] -= 1
+            self.total_len -= self.doc_lens[row]
+            self.node_ids[row] = None
+            self.doc_lens[row] = 0
+            self._term_ids[row] = self._term_ids[row][:0]
+            self._term_freqs[row] = self._term_freqs[row][:0]
+            self._changed()
+            if len(self.node_ids) - len(self.rows) > max(1000, len(self.rows)):
+                self._compact()
+            return True
+
+    def get_scores(self, queries: list[list[str]]) -> np.ndarray:
+        """Score all rows against each tokenized query, one row of scores per query, -inf for the deleted rows.
+
+        Only the weight columns of the query terms are read, by a product with the sparse term counts of the queries.
+        """
+        with self.lock:
+            weights, deleted = self._get_weights()
+            columns = {}  # term id -> column of the query term counts
+            rows, cols, counts = [], [], []
+            for row, query in enumerate(queries):
+                freqs = Counter(i for i in map(self.vocabulary.get, query) if i is not None)
+                for term_id, freq in freqs.items():
+                    rows.append(row)
+                    cols.append(columns.setdefault(term_id, len(columns)))
+                    counts.append(freq)
+        query_freqs = sparse.csr_matrix((counts, (rows, cols)), shape=(len(queries), len(columns)))
+        scores = (query_freqs @ weights[:, list(columns)].T).toarray()
+        scores[:, deleted] = -np.inf
+        return scores
+
+    def save(self, pathname: Path):
+        """Save the live rows to a `.npz` file."""
+        with self.lock:
+            self._compact()
+            row_lens = [len(i) for i in self._term_ids]
+            np.savez_compressed(
+                pathname,
+                params=np.array([self.k1, self.b, self.epsilon]),
+                vocabulary=np.array(list(self.vocabulary), dtype=str),
+                node_ids=np.array(self.node_ids, dtype=str),
+                hashes=np.array(self.hashes, dtype=str),
+                row_lens=np.array(row_lens, dtype=np.int64),
+                term_ids=np.concatenate(self._term_ids) if row_lens else np.zeros(0, dtype=np.int64),
+                term_freqs=np.concatenate(self._term_freqs) if row_lens else np.zeros(0),
+            )
+
+    @classmethod
+    def load(cls, pathname: Path) -> "BM25Index":
+        with np.load(pathname) as data:
+            index = cls(*data["params"].tolist())
+            index.vocabulary = {term: i for i, term in enumerate(data["vocabulary"].tolist())}
+            index.node_ids = data["node_ids"].tolist()
+            index.hashes = data["hashes"].tolist()
+            splits = np.cumsum(data["row_lens"])[:-1]
+            index._term_ids = np.split(data["term_ids"], splits) if len(index.node_ids) else []
+            index._term_freqs = np.split(data["term_freqs"], splits) if len(index.node_ids) else []
+        index.doc_freqs = np.bincount(
+            np.concatenate(index._term_ids or [np.zeros(0, dtype=np.int64)]), minlength=len(index.vocabulary)
+        ).tolist()
+        index.doc_lens = [int(i.sum()) for i in index._term_freqs]
+        index.rows = {node_id: row for row, node_id in enumerate(index.node_ids)}
+        index.total_len = sum(index.doc_lens)
+        return index
+
+    def _term_id(self, term: str) -> int:
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = self.vocabulary[term] = len(self.vocabulary)
+            self.doc_freqs.append(0)
+        return term_id
+
+    def _changed(self):
+        self.version += 1
+        self._weights = None
+        self._deleted = None
+
+    def _get_weights(self) -> tuple[sparse.csc_matrix, np.ndarray]:
+        """The BM25 weights and the mask of the deleted rows, built together, called with `lock` held."""
+        if self._weights is not None:
+            return self._weights, self._deleted
+        corpus_size = len(self.rows)
+        avgdl = self.total_len / corpus_size if corpus_size else 1
+        doc_freqs = np.array(self.doc_freqs, dtype=np.float64)
+        present = doc_freqs > 0
+        idf = np.zeros(len(doc_freqs))
+        idf[present] = np.log(corpus_size - doc_freqs[present] + 0.5) - np.log(doc_freqs[present] + 0.5)
+        if present.any():
+            # Same floor as BM25Okapi for the words contained in more than half of the documents
+            idf[present & (idf < 0)] = self.epsilon * idf[present].mean()
+
+        row_lens = np.fromiter((len(i) for i in self._term_ids), dtype=np.int64, count=len(self._term_ids))
+        indptr = np.concatenate([[0], np.cumsum(row_lens)])
+        term_ids = np.concatenate(self._term_ids) if len(row_lens) else np.zeros(0, dtype=np.int64)
+        freqs = np.concatenate(self._term_freqs) if len(row_lens) else np.zeros(0)
+        doc_lens = np.repeat(np.array(self.doc_lens, dtype=np.float64), row_lens)
+        data = idf[term_ids] * freqs * (self.k1 + 1) / (freqs + self.k1 * (1 - self.b + self.b * doc_lens / avgdl))
+        weights = sparse.csr_matrix((data, term_ids, indptr), shape=(len(self.node_ids), len(self.vocabulary)))
+        self._deleted = np.array([i is None for i in self.node_ids], dtype=bool)
+        self._weights = weights.tocsc()
+        return self._weights, self._deleted
+
+    def _compact(self):
+        """Drop the deleted rows and the terms no longer used."""
+        if len(self.rows) == len(self.node_ids) and all(self.doc_freqs):
+            return
+        live = [row for row, node_id in enumerate(self.node_ids) if node_id is not None]
+        used = np.array(self.doc_freqs, dtype=np.int64) > 0
+        new_term_ids = np.cumsum(used) - 1
+        self.vocabulary = {term: int(new_term_ids[i]) for term, i in self.vocabulary.items() if used[i]}
+        self.doc_freqs = [i for i in self.doc_freqs if i > 0]
+        self.node_ids = [self.node_ids[i] for i in live]
+        self.hashes = [self.hashes[i] for i in live]
+        self.doc_lens = [self.doc_lens[i] for i in live]
+        self._term_ids = [new_term_ids[self._term_ids[i]] for i in live]
+        self._term_freqs = [self._term_freqs[i] for i in live]
+        self.rows = {node_id: row for row, node_id in enumerate(self.node_ids)}
+        self._changed()
 
 
 class DynamicBM25Retriever(BM25Retriever):
-    """BM25 retriever."""
+    """BM25 retriever.
+
+    Backed by an incrementally maintained `BM25Index`, adding or deleting nodes only tokenizes the nodes concerned.
+    The index is persisted to `BM25_INDEX_FILENAME` alongside the vector index, nodes whose content is unchanged are
+    not tokenized again when loading it back with `persist_path`.
+    """
 
     def __init__(
         self,
@@ -22,28 +241,101 @@ class DynamicBM25Retriever(BM25Retriever):
         object_map: Optional[dict] = None,
         verbose: bool = False,
         index: VectorStoreIndex = None,
+        persist_path: Optional[Union[str, Path]] = None,
     ) -> None:
-        super().__init__(
-            nodes=nodes,
-            tokenizer=tokenizer,
-            similarity_top_k=similarity_top_k,
+        self._tokenizer = tokenizer or tokenize_remove_stopwords
+        self._similarity_top_k = similarity_top_k
+        self._node_map: dict[str, BaseNode] = {}
+        self._nodes: list[Optional[BaseNode]] = []  # by row of the BM25 index, built on demand
+        self._nodes_version = -1
+        self.bm25 = self._load_bm25(persist_path)
+        BaseRetriever.__init__(
+            self,
             callback_manager=callback_manager,
             object_map=object_map,
             objects=objects,
             verbose=verbose,
         )
+        self._add_to_bm25(nodes)
+        for node_id in [i for i in self.bm25.rows if i not in self._node_map]:
+            self.bm25.delete(node_id)  # persisted nodes which were not given back
         self._index = index
 
     def add_nodes(self, nodes: list[BaseNode], **kwargs) -> None:
         """Support add nodes."""
-        self._nodes.extend(nodes)
-        self._corpus = [self._tokenizer(node.get_content()) for node in self._nodes]
-        self.bm25 = BM25Okapi(self._corpus)
+        self._add_to_bm25(nodes)
 
         if self._index:
             self._index.insert_nodes(nodes, **kwargs)
 
+    def delete_nodes(self, node_ids: list[str]) -> None:
+        """Delete nodes from the BM25 index."""
+        with self.bm25.lock:
+            for node_id in node_ids:
+                self.bm25.delete(node_id)
+                self._node_map.pop(node_id, None)
+
     def persist(self, persist_dir: str, **kwargs) -> None:
         """Support persist."""
         if self._index:
             self._index.storage_context.persist(persist_dir)
+        Path(persist_dir).mkdir(parents=True, exist_ok=True)
+        self.bm25.save(Path(persist_dir) / BM25_INDEX_FILENAME)
+
+    def retrieve_many(self, queries: list[str]) -> list[list[NodeWithScore]]:
+        """Retrieve the top nodes of several queries, scored together by a single sparse matrix product."""
+        tokenized = [self._tokenizer(query) for query in queries]
+        with self.bm25.lock:
+            if not queries or not len(self.bm25):
+                return [[] for _ in queries]
+            scores = self.bm25.get_scores(tokenized)
+            nodes = self._get_nodes()
+        top_k = min(self._similarity_top_k, len(self.bm25))
+        results = []
+        for row_scores in scores:
+            # Ties keep the order of the nodes, as the stable sort of BM25Retriever
+            threshold = np.partition(row_scores, len(row_scores) - top_k)[len(row_scores) - top_k]
+            candidates = np.flatnonzero(row_scores >= threshold)
+            top = candidates[np.argsort(-row_scores[candidates], kind="stable")[:top_k]]
+            results.append([NodeWithScore(node=nodes[i], score=float(row_scores[i])) for i in top])
+        return results
+
+    def _get_scored_nodes(self, query: str) -> list[NodeWithScore]:
+        tokens = self._tokenizer(query)
+        with self.bm25.lock:
+            if not len(self.bm25):
+                return []
+            scores = self.bm25.get_scores([tokens])[0]
+            nodes = self._get_nodes()
+        return [NodeWithScore(node=node, score=float(s)) for node, s in zip(nodes, scores) if node]
+
+    def _retrieve(self, query_bundle: QueryBundle) -> list[NodeWithScore]:
+        if query_bundle.custom_embedding_strs or query_bundle.embedding:
+            logger.warning("BM25Retriever does not support embeddings, skipping...")
+        return self.retrieve_many([query_bundle.query_str])[0]
+
+    def _add_to_bm25(self, nodes: list[BaseNode]):
+        for node in nodes:
+            content = node.get_content()
+            content_hash = hashlib.sha1(content.encode("utf-8")).hexdigest()
+            with self.bm25.lock:
+                row = self.bm25.rows.get(node.node_id)
+                if row is None or self.bm25.hashes[row] != content_hash:
+                    self.bm25.add(node.node_id, self._tokenizer(content), content_hash=content_hash)
+                self._node_map[node.node_id] = node
+
+    def _get_nodes(self) -> list[Optional[BaseNode]]:
+        if self._nodes_version != self.bm25.version:
+            self._nodes = [self._node_map.get(i) if i is not None else None for i in self.bm25.node_ids]
+            self._nodes_version = self.bm25.version
+        return self._nodes
+
+    @staticmethod
+    def _load_bm25(persist_path: Optional[Union[str, Path]]) -> BM25Index:
+        pathname = Path(persist_path) / BM25_INDEX_FILENAME if persist_path else None
+        if pathname and pathname.exists():
+            try:
+                return BM25Index.load(pathname)
+            except Exception as e:
+                logger.warning(f"Failed to load {pathname}, rebuild the BM25 index: {e}")
+        return BM25Index()
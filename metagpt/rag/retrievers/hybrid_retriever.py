@@ -1,42 +1,125 @@
 """Hybrid retriever."""
 
+import asyncio
 import copy
+import time
+from typing import Optional
 
-from llama_index.core.schema import BaseNode, QueryType
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryType
 
+from metagpt.logs import logger
 from metagpt.rag.retrievers.base import RAGRetriever
 
 
 class SimpleHybridRetriever(RAGRetriever):
-    """A composite retriever that aggregates search results from multiple retrievers."""
+    """A composite retriever that aggregates search results from multiple retrievers.
 
-    def __init__(self, *retrievers):
+    The retrievers are queried concurrently, retrievers without an async implementation in threads, so the latency is
+    the one of the slowest retriever. A retriever exceeding its timeout is left out of the results. The latency of each
+    retriever in the last retrieval is kept in `latencies`, None for a timeout.
+
+    Results are fused by `fusion_mode`:
+    - dedup: concatenated in the order of the retrievers, keeping the first occurrence of each node.
+    - rrf: reciprocal rank fusion, a node scores the sum of `weight / (rrf_k + rank)` over the retrievers.
+    - weighted: a node scores the weighted sum of its min-max normalized scores, higher scores must be better.
+    """
+
+    def __init__(
+        self,
+        *retrievers,
+        timeouts: Optional[list[Optional[float]]] = None,
+        weights: Optional[list[float]] = None,
+        fusion_mode: str = "dedup",
+        rrf_k: int = 60,
+        similarity_top_k: Optional[int] = None,
+    ):
         self.retrievers: list[RAGRetriever] = retrievers
+        self.timeouts = timeouts or [None] * len(retrievers)
+        self.weights = weights or [1.0] * len(retrievers)
+        self.fusion_mode = fusion_mode
+        self.rrf_k = rrf_k
+        self.similarity_top_k = similarity_top_k
+        self.latencies: list[Optional[float]] = [None] * len(retrievers)
         super().__init__()
 
     async def _aretrieve(self, query: QueryType, **kwargs):
         """Asynchronously retrieves and aggregates search results from all configured retrievers.
 
-        This method queries each retriever in the `retrievers` list with the given query and
-        additional keyword arguments. It then combines the results, ensuring that each node is
-        unique, based on the node's ID.
+        This method queries each retriever in the `retrievers` list concurrently with the given query and
+        additional keyword arguments, then fuses the results, so that each node is unique, based on the node's ID.
         """
-        all_nodes = []
-        for retriever in self.retrievers:
-            # Prevent retriever changing query
-            query_copy = copy.deepcopy(query)
-            nodes = await retriever.aretrieve(query_copy, **kwargs)
-            all_nodes.extend(nodes)
-
-        # combine all nodes
+        tasks = [self._timed_retrieve(i, query, **kwargs) for i in range(len(self.retrievers))]
+        results = await asyncio.gather(*tasks)
+        logger.debug(
+            "Hybrid retrieval latencies | "
+            + ", ".join(
+                f"{type(r).__name__}: " + ("timeout" if latency is None else f"{latency:.3f}s")
+                for r, latency in zip(self.retrievers, self.latencies)
+            )
+        )
+
+        if self.fusion_mode == "rrf":
+            result = self._fuse(results, self._rrf_scores)
+        elif self.fusion_mode == "weighted":
+            result = self._fuse(results, self._weighted_scores)
+        else:
+            result = self._dedup(results)
+        return result[: self.similarity_top_k] if self.similarity_top_k else result
+
+    async def _timed_retrieve(self, i: int, query: QueryType, **kwargs) -> list[NodeWithScore]:
+        retriever = self.retrievers[i]
+        # Prevent retriever changing query, retrievers replace the attributes of the query, e.g. the embedding
+        query_copy = copy.copy(query)
+        if type(retriever)._aretrieve is BaseRetriever._aretrieve:
+            # The retriever is synchronous, keep it from blocking the others
+            coro = asyncio.to_thread(retriever.retrieve, query_copy)
+        else:
+            coro = retriever.aretrieve(query_copy, **kwargs)
+        start = time.perf_counter()
+        try:
+            nodes = await asyncio.wait_for(coro, timeout=self.timeouts[i])
+        except asyncio.TimeoutError:
+            logger.warning(f"{type(retriever).__name__} timed out after {self.timeouts[i]}s, its results are left out")
+            self.latencies[i] = None
+            return []
+        self.latencies[i] = time.perf_counter() - start
+        return nodes
+
+    @staticmethod
+    def _dedup(results: list[list[NodeWithScore]]) -> list[NodeWithScore]:
         result = []
         node_ids = set()
-        for n in all_nodes:
-            if n.node.node_id not in node_ids:
-                result.append(n)
-                node_ids.add(n.node.node_id)
+        for nodes in results:
+            for n in nodes:
+                if n.node.node_id not in node_ids:
+                    result.append(n)
+                    node_ids.add(n.node.node_id)
         return result
 
+    def _fuse(self, results: list[list[NodeWithScore]], score_func) -> list[NodeWithScore]:
+        """Sum the fusion scores of each node over the retrievers, ties keep the order of `_dedup`."""
+        nodes = {}
+        scores = {}
+        for i, retrieved in enumerate(results):
+            for n, score in zip(retrieved, score_func(i, retrieved)):
+                nodes.setdefault(n.node.node_id, n.node)
+                scores[n.node.node_id] = scores.get(n.node.node_id, 0.0) + score
+        ranked = sorted(scores.items(), key=lambda i: i[1], reverse=True)
+        return [NodeWithScore(node=nodes[node_id], score=score) for node_id, score in ranked]
+
+    def _rrf_scores(self, i: int, nodes: list[NodeWithScore]) -> list[float]:
+        return [self.weights[i] / (self.rrf_k + rank) for rank in range(1, len(nodes) + 1)]
+
+    def _weighted_scores(self, i: int, nodes: list[NodeWithScore]) -> list[float]:
+        scores = [n.score or 0.0 for n in nodes]
+        if not scores:
+            return []
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [self.weights[i]] * len(scores)
+        return [self.weights[i] * (s - low) / (high - low) for s in scores]
+
     def add_nodes(self, nodes: list[BaseNode]) -> None:
         """Support add nodes."""
         for r in self.retrievers:
@@ -24,6 +24,30 @@ class BaseRetrieverConfig(BaseModel):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
     similarity_top_k: int = Field(default=5, description="Number of top-k similar results to return during retrieval.")
+    timeout: Optional[float] = Field(
+        default=None,
+        exclude=True,
+        description="Seconds to wait for the retriever in a hybrid retrieval, None for no limit.",
+    )
+    fusion_weight: float = Field(
+        default=1.0,
+        exclude=True,
+        description="Weight of the retriever in the rank or score fusion of a hybrid retrieval.",
+    )
+
+
+class HybridRetrieverConfig(BaseModel):
+    """Config for how SimpleHybridRetriever fuses the results of the retrievers, given along with their configs."""
+
+    fusion_mode: Literal["dedup", "rrf", "weighted"] = Field(
+        default="dedup",
+        description="dedup concatenates the results in the order of the retrievers, rrf fuses them by reciprocal "
+        "rank, weighted by the sum of their min-max normalized scores, the weights are the retrievers' fusion_weight.",
+    )
+    rrf_k: int = Field(default=60, description="Constant added to the ranks in reciprocal rank fusion.")
+    similarity_top_k: Optional[int] = Field(default=None, description="Number of fused results to return, all if None.")
+
+    _no_embedding: bool = PrivateAttr(default=True)
 
 
 class IndexRetrieverConfig(BaseRetrieverConfig):
@@ -59,6 +83,10 @@ class FAISSRetrieverConfig(IndexRetrieverConfig):
 class BM25RetrieverConfig(IndexRetrieverConfig):
     """Config for BM25-based retrievers."""
 
+    persist_path: Optional[Union[str, Path]] = Field(
+        default=None, description="The directory of a persisted BM25 index, whose tokens are reused."
+    )
+
     _no_embedding: bool = PrivateAttr(default=True)
 
 
@@ -216,6 +244,16 @@ class ObjectNode(TextNode):
         return metadata.model_dump()
 
 
+class IndexUpdateReport(BaseModel):
+    """Outcome of an incremental index update, see SimpleEngine.from_nodes_incrementally."""
+
+    reused: int = Field(default=0, description="Number of nodes whose persisted embedding was reused.")
+    embedded: int = Field(default=0, description="Number of new or changed nodes that were embedded.")
+    deleted: int = Field(default=0, description="Number of persisted nodes that no longer exist.")
+    changed_files: list[str] = Field(default_factory=list, description="Files with new or changed nodes.")
+    deleted_files: list[str] = Field(default_factory=list, description="Files no longer in the index.")
+
+
 class OmniParseType(str, Enum):
     """OmniParseType"""
 
@@ -12,20 +12,34 @@ This script is designed to create a symbols repository from the provided source
 from __future__ import annotations
 
 import ast
+import asyncio
+import hashlib
 import json
 import re
-import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 
-import pandas as pd
 from pydantic import BaseModel, Field, field_validator
 
-from metagpt.const import AGGREGATION, COMPOSITION, GENERALIZATION
+from metagpt.const import (
+    AGGREGATION,
+    COMPOSITION,
+    GENERALIZATION,
+    SYMBOLS_CACHE_PATH,
+)
 from metagpt.logs import logger
-from metagpt.utils.common import any_to_str, aread, remove_white_spaces
+from metagpt.utils.common import (
+    any_to_str,
+    aread,
+    read_json_file,
+    remove_white_spaces,
+    write_json_file,
+)
 from metagpt.utils.exceptions import handle_exception
 
+PARALLEL_PARSE_MIN_FILES = 8  # below which a process pool costs more than it saves
+
 
 class RepoFileInfo(BaseModel):
     """
@@ -425,9 +439,14 @@ class RepoParser(BaseModel):
 
     Attributes:
         base_directory (Path): The base directory of the project.
+        max_workers (int): The number of processes parsing the files, 0 means the number of CPUs, 1 parses in process.
+        cache_path (Optional[Path]): The file caching the parse results of each file by content hash. Default is
+            a file named by a hash of the base directory in `SYMBOLS_CACHE_PATH`, out of the analyzed project.
     """
 
     base_directory: Path = Field(default=None)
+    max_workers: int = 0
+    cache_path: Optional[Path] = None
 
     @classmethod
     @handle_exception(exception_type=Exception, default_return=[])
@@ -474,6 +493,8 @@ class RepoParser(BaseModel):
         """
         Builds a symbol repository from '.py' and '.js' files in the project directory.
 
+        Only the files changed since the last run are parsed, in parallel.
+
         Returns:
             List[RepoFileInfo]: A list of RepoFileInfo objects containing the extracted information.
         """
@@ -484,13 +505,76 @@ class RepoParser(BaseModel):
         extensions = ["*.py"]
         for ext in extensions:
             matching_files += directory.rglob(ext)
+        entries = self._parse_files(matching_files)
         for path in matching_files:
-            tree = self._parse_file(path)
-            file_info = self.extract_class_and_function_info(tree, path)
+            file_info = RepoFileInfo(file=str(path.relative_to(self.base_directory)), **entries[path]["symbols"])
             files_classes.append(file_info)
 
         return files_classes
 
+    def _parse_files(self, files: List[Path]) -> Dict[Path, dict]:
+        """
+        Parses Python files, reusing the cached results of the files whose content hash is unchanged.
+
+        Args:
+            files (List[Path]): The paths to the Python files.
+
+        Returns:
+            Dict[Path, dict]: The symbols, classes and imports of each file.
+        """
+        cache_path = self.cache_path or self._default_cache_path()
+        cache = self._load_cache(cache_path)
+        entries = {}
+        misses = []
+        updated = False
+        for path in files:
+            key = path.resolve().as_posix()
+            stat = path.stat()
+            file_stat = [stat.st_size, stat.st_mtime_ns]
+            entry = cache.get(key)
+            if entry and entry["stat"] == file_stat:
+                entries[path] = entry
+                continue
+            content_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+            if entry and entry["hash"] == content_hash:
+                entry["stat"] = file_stat
+                entries[path] = entry
+                updated = True
+                continue
+            misses.append((path, key, content_hash, file_stat))
+
+        pathnames = [str(path) for path, _, _, _ in misses]
+        if len(pathnames) >= PARALLEL_PARSE_MIN_FILES and self.max_workers != 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers or None) as executor:
+                results = list(executor.map(_parse_file_entry, pathnames, chunksize=16))
+        else:
+            results = [_parse_file_entry(i) for i in pathnames]
+        for (path, key, content_hash, file_stat), entry in zip(misses, results):
+            entry.update(hash=content_hash, stat=file_stat)
+            cache[key] = entry
+            entries[path] = entry
+            updated = True
+
+        if updated:
+            write_json_file(cache_path, cache, indent=None)
+        if misses:
+            logger.info(f"Parsed {len(misses)} changed files of {len(files)}")
+        return entries
+
+    def _default_cache_path(self) -> Path:
+        directory = self.base_directory.resolve().as_posix()
+        return SYMBOLS_CACHE_PATH / f"{hashlib.sha256(directory.encode('utf-8')).hexdigest()[:32]}.json"
+
+    @staticmethod
+    def _load_cache(cache_path: Path) -> Dict[str, dict]:
+        if not cache_path.exists():
+            return {}
+        try:
+            return read_json_file(cache_path)
+        except ValueError:
+            logger.warning(f"Invalid symbols cache {cache_path}, all files will be parsed")
+            return {}
+
     def generate_json_structure(self, output_path: Path):
         """
         Generates a JSON file documenting the repository structure.
@@ -508,6 +592,8 @@ class RepoParser(BaseModel):
         Args:
             output_path (Path): The path to the CSV file to be generated.
         """
+        import pandas as pd
+
         files_classes = [i.model_dump() for i in self.generate_symbols()]
         df = pd.DataFrame(files_classes)
         df.to_csv(output_path, index=False)
@@ -712,7 +798,10 @@ class RepoParser(BaseModel):
 
     async def rebuild_class_views(self, path: str | Path = None):
         """
-        Executes `pylint` to reconstruct the dot format class view repository file.
+        Reconstructs the class views and the class relationships of a package from the AST of its files.
+
+        The classes are those `pyreverse` would output in dot format, the namespaces of classes are prefixed with
+        the path of their file relative to the package root.
 
         Args:
             path (str | Path): The path to the target directory or file. Default is None.
@@ -725,22 +814,93 @@ class RepoParser(BaseModel):
         init_file = path / "__init__.py"
         if not init_file.exists():
             raise ValueError("Failed to import module __init__ with error:No module named __init__.")
-        command = f"pyreverse {str(path)} -o dot"
-        output_dir = path / "__dot__"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        result = subprocess.run(command, shell=True, check=True, cwd=str(output_dir))
-        if result.returncode != 0:
-            raise ValueError(f"{result}")
-        class_view_pathname = output_dir / "classes.dot"
-        class_views = await self._parse_classes(class_view_pathname)
-        relationship_views = await self._parse_class_relationships(class_view_pathname)
-        packages_pathname = output_dir / "packages.dot"
-        class_views, relationship_views, package_root = RepoParser._repair_namespaces(
-            class_views=class_views, relationship_views=relationship_views, path=path
-        )
-        class_view_pathname.unlink(missing_ok=True)
-        packages_pathname.unlink(missing_ok=True)
-        return class_views, relationship_views, package_root
+        files = list(path.rglob("*.py"))
+        # Hashing and parsing the files blocks, run it off the event loop
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(None, self._parse_files, files)
+        return self._create_class_views(path=path, entries=entries)
+
+    @staticmethod
+    def _create_class_views(
+        path: Path, entries: Dict[Path, dict]
+    ) -> (List[DotClassInfo], List[DotClassRelationship], str):
+        """
+        Creates the class views and the class relationships from the classes and imports parsed from each file.
+
+        Base classes and instantiated attribute types are resolved through the imports of their module, following
+        re-exports of the package, and only the relationships between classes of the package are kept.
+
+        Args:
+            path (Path): The path to the package.
+            entries (Dict[Path, dict]): The classes and imports parsed from each file of the package.
+
+        Returns:
+            Tuple[List[DotClassInfo], List[DotClassRelationship], str]: A tuple containing the class views,
+            relationships, and the root path of the package.
+        """
+        root = path.resolve()
+        while (root / "__init__.py").exists():
+            root = root.parent
+
+        modules = {}
+        for file_path, entry in entries.items():
+            rel_path = file_path.resolve().relative_to(root)
+            parts = rel_path.with_suffix("").parts
+            is_package = parts[-1] == "__init__"
+            if is_package:
+                # Classes of a package are prefixed with the path of the package, as `pyreverse` names them
+                parts = parts[:-1]
+                rel_path = rel_path.parent
+            modules[".".join(parts)] = (rel_path.as_posix(), entry, is_package)
+
+        namespaces = {}
+        class_views = []
+        for module, (rel_path, entry, _) in modules.items():
+            for c in entry["classes"]:
+                package = rel_path + ":" + c["qualname"].replace(".", ":")
+                namespaces[f"{module}.{c['qualname']}"] = package
+                class_views.append(
+                    RepoParser._create_class_info(
+                        package=package, name=c["name"], members=c["attributes"], functions=c["methods"]
+                    )
+                )
+
+        def resolve(module: str, ref: str, hops: int = 0) -> str:
+            _, entry, is_package = modules[module]
+            head, _, rest = ref.partition(".")
+            if any(c["qualname"] == head for c in entry["classes"]):
+                return f"{module}.{ref}"
+            if head not in entry["imports"]:
+                return ""
+            level, from_module, name = entry["imports"][head]
+            if level:
+                package_parts = module.split(".") if is_package else module.split(".")[:-1]
+                package_parts = package_parts[: len(package_parts) - level + 1]
+                from_module = ".".join(package_parts + ([from_module] if from_module else []))
+            dotted = ".".join(i for i in (from_module, name, rest) if i)
+            if dotted not in namespaces and name and from_module in modules and hops < 8:
+                # Re-exported, e.g. by the `__init__.py` of a package
+                return resolve(from_module, ".".join(i for i in (name, rest) if i), hops + 1) or dotted
+            return dotted
+
+        known = set(namespaces.values())
+        relationship_views = []
+        distinct = set()
+        for module, (_, entry, _) in modules.items():
+            for c in entry["classes"]:
+                owner = namespaces[f"{module}.{c['qualname']}"]
+                relationships = [(owner, resolve(module, i), GENERALIZATION, None) for i in c["bases"]]
+                relationships += [(resolve(module, ref), owner, kind, label) for label, ref, kind in c["instances"]]
+                for src, dest, relationship, label in relationships:
+                    src = namespaces.get(src, src)
+                    dest = namespaces.get(dest, dest)
+                    if src not in known or dest not in known or (src, dest, relationship, label) in distinct:
+                        continue
+                    distinct.add((src, dest, relationship, label))
+                    relationship_views.append(
+                        DotClassRelationship(src=src, dest=dest, relationship=relationship, label=label)
+                    )
+        return class_views, relationship_views, str(root)
 
     @staticmethod
     async def _parse_classes(class_view_pathname: Path) -> List[DotClassInfo]:
@@ -763,27 +923,46 @@ class RepoParser(BaseModel):
             if not package_name:
                 continue
             class_name, members, functions = re.split(r"(?<!\\)\|", info)
-            class_info = DotClassInfo(name=class_name)
-            class_info.package = package_name
-            for m in members.split("\n"):
-                if not m:
-                    continue
-                attr = DotClassAttribute.parse(m)
-                class_info.attributes[attr.name] = attr
-                for i in attr.compositions:
-                    if i not in class_info.compositions:
-                        class_info.compositions.append(i)
-            for f in functions.split("\n"):
-                if not f:
-                    continue
-                method = DotClassMethod.parse(f)
-                class_info.methods[method.name] = method
-                for i in method.aggregations:
-                    if i not in class_info.compositions and i not in class_info.aggregations:
-                        class_info.aggregations.append(i)
+            class_info = RepoParser._create_class_info(
+                package=package_name, name=class_name, members=members.split("\n"), functions=functions.split("\n")
+            )
             class_views.append(class_info)
         return class_views
 
+    @staticmethod
+    def _create_class_info(package: str, name: str, members: List[str], functions: List[str]) -> DotClassInfo:
+        """
+        Creates a DotClassInfo object from the dot format texts of the class attributes and methods.
+
+        Args:
+            package (str): The package of the class.
+            name (str): The name of the class.
+            members (List[str]): The dot format texts of the class attributes.
+            functions (List[str]): The dot format texts of the class methods.
+
+        Returns:
+            DotClassInfo: The DotClassInfo object representing the class.
+        """
+        class_info = DotClassInfo(name=name)
+        class_info.package = package
+        for m in members:
+            if not m:
+                continue
+            attr = DotClassAttribute.parse(m)
+            class_info.attributes[attr.name] = attr
+            for i in attr.compositions:
+                if i not in class_info.compositions:
+                    class_info.compositions.append(i)
+        for f in functions:
+            if not f:
+                continue
+            method = DotClassMethod.parse(f)
+            class_info.methods[method.name] = method
+            for i in method.aggregations:
+                if i not in class_info.compositions and i not in class_info.aggregations:
+                    class_info.aggregations.append(i)
+        return class_info
+
     @staticmethod
     async def _parse_class_relationships(class_view_pathname: Path) -> List[DotClassRelationship]:
         """
@@ -1021,3 +1200,195 @@ def is_func(node) -> bool:
         bool: True if the node represents a function, False otherwise.
     """
     return isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+
+
+def _parse_file_entry(pathname: str) -> dict:
+    """
+    Parses a Python file into its symbols, its classes as `pyreverse` would output them, and its imports.
+
+    It runs in the worker processes of RepoParser, and its result is cached as JSON.
+
+    Args:
+        pathname (str): The path to the Python file.
+
+    Returns:
+        dict: The symbols of the file, without the file name, its classes and its imports.
+    """
+    path = Path(pathname)
+    tree = RepoParser._parse_file(path)
+    file_info = RepoParser(base_directory=path.parent).extract_class_and_function_info(tree, path)
+    entry = {
+        "symbols": file_info.model_dump(exclude={"file"}),
+        "classes": _parse_class_defs(tree),
+        "imports": _parse_imports(tree),
+    }
+    return json.loads(json.dumps(entry, default=str))
+
+
+def _parse_class_defs(body: list, prefix: str = "") -> List[dict]:
+    """
+    Parses the classes defined in an AST body, including nested classes.
+
+    Like `pyreverse`, only the public attributes and methods are kept, properties are attributes, and the
+    attributes assigned to `self` in methods are attributes of the class.
+
+    Args:
+        body (list): The AST nodes of a module or a class body.
+        prefix (str): The qualified name prefix of nested classes.
+
+    Returns:
+        List[dict]: The qualified name, the name, the dot format attributes and methods, the base classes and the
+        instantiated attributes of each class.
+    """
+    classes = []
+    for node in body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        attributes = {}
+        methods = []
+        instances = []
+        for item in node.body:
+            if isinstance(item, (ast.Assign, ast.AnnAssign)):
+                _parse_class_attribute(item, owner=None, attributes=attributes, instances=instances)
+            elif is_func(item):
+                decorators = {
+                    d.attr if isinstance(d, ast.Attribute) else getattr(d, "id", "") for d in item.decorator_list
+                }
+                if decorators & {"setter", "getter", "deleter"}:
+                    continue
+                if decorators & {"property", "cached_property"}:
+                    if not item.name.startswith("_"):
+                        attributes.setdefault(item.name, item.name)
+                    continue
+                if not item.name.startswith("_"):
+                    methods.append(_method_to_dot(item, is_static="staticmethod" in decorators))
+                params = item.args.posonlyargs + item.args.args
+                if params and "staticmethod" not in decorators:
+                    annotations = {i.arg: i.annotation for i in params + item.args.kwonlyargs if i.annotation}
+                    for sub in ast.walk(item):
+                        if isinstance(sub, (ast.Assign, ast.AnnAssign)):
+                            _parse_class_attribute(
+                                sub,
+                                owner=params[0].arg,
+                                attributes=attributes,
+                                instances=instances,
+                                annotations=annotations,
+                            )
+        qualname = prefix + node.name
+        classes.append(
+            {
+                "qualname": qualname,
+                "name": node.name,
+                "attributes": sorted(attributes.values()),
+                "methods": sorted(methods),
+                "bases": [ast.unparse(i) for i in node.bases if isinstance(i, (ast.Name, ast.Attribute))],
+                "instances": instances,
+            }
+        )
+        classes.extend(_parse_class_defs(node.body, prefix=qualname + "."))
+    return classes
+
+
+def _parse_class_attribute(
+    node, owner: Optional[str], attributes: Dict[str, str], instances: List[list], annotations: Dict = None
+):
+    """
+    Parses the class attributes assigned by an assignment AST node, class variables if owner is None, otherwise the
+    attributes of the instance named owner.
+
+    The classes an attribute is composed of, instantiated or annotated, or aggregates, assigned from an annotated
+    argument, are added to instances.
+    """
+    targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+    for target in targets:
+        if owner is None and isinstance(target, ast.Name):
+            name = target.id
+        elif owner and isinstance(target, ast.Attribute) and getattr(target.value, "id", None) == owner:
+            name = target.attr
+        else:
+            continue
+        if name.startswith("_"):
+            continue
+        type_ = ""
+        if isinstance(node, ast.AnnAssign):
+            type_ = ast.unparse(node.annotation)
+        elif isinstance(node.value, ast.Constant) and node.value.value is not None:
+            type_ = type(node.value.value).__name__
+        if type_ or name not in attributes:
+            attributes[name] = f"{name} : {type_}" if type_ else name
+
+        if isinstance(node, ast.AnnAssign) and _annotated_class(node.annotation):
+            instances.append([name, _annotated_class(node.annotation), COMPOSITION])
+        elif isinstance(node.value, ast.Call) and isinstance(node.value.func, (ast.Name, ast.Attribute)):
+            instances.append([name, ast.unparse(node.value.func), COMPOSITION])
+        elif isinstance(node.value, ast.Name) and node.value.id in (annotations or {}):
+            ref = _annotated_class(annotations[node.value.id])
+            if ref:
+                instances.append([name, ref, AGGREGATION])
+
+
+def _annotated_class(annotation) -> str:
+    """Returns the class of a type annotation, unwrapping `Optional[...]` and `... | None`, if it is a single class."""
+    if isinstance(annotation, ast.Constant) and isinstance(annotation.value, str):
+        try:
+            annotation = ast.parse(annotation.value, mode="eval").body
+        except SyntaxError:
+            return ""
+    if isinstance(annotation, ast.Subscript) and getattr(annotation.value, "id", None) == "Optional":
+        return _annotated_class(annotation.slice)
+    if isinstance(annotation, ast.BinOp) and isinstance(annotation.op, ast.BitOr):
+        if isinstance(annotation.right, ast.Constant) and annotation.right.value is None:
+            return _annotated_class(annotation.left)
+    if isinstance(annotation, (ast.Name, ast.Attribute)):
+        return ast.unparse(annotation)
+    return ""
+
+
+def _method_to_dot(node, is_static: bool) -> str:
+    """Returns the dot format text of a method, without its `self` or `cls` argument and default values."""
+
+    def to_dot(arg: ast.arg, prefix: str = "") -> str:
+        return f"{prefix}{arg.arg}: {ast.unparse(arg.annotation)}" if arg.annotation else f"{prefix}{arg.arg}"
+
+    args = node.args
+    params = args.posonlyargs + args.args
+    if params and not is_static:
+        params = params[1:]
+    parts = [to_dot(i) for i in params]
+    if args.vararg:
+        parts.append(to_dot(args.vararg, prefix="*"))
+    parts += [to_dot(i) for i in args.kwonlyargs]
+    if args.kwarg:
+        parts.append(to_dot(args.kwarg, prefix="**"))
+    text = f"{node.name}({', '.join(parts)})"
+    if node.returns:
+        text += f": {ast.unparse(node.returns)}"
+    return text
+
+
+def _parse_imports(body: list) -> Dict[str, list]:
+    """
+    Parses the module level imports of an AST body, including the conditional ones.
+
+    Returns:
+        Dict[str, list]: The import level, the module and the imported name of each name bound by an import.
+    """
+    imports = {}
+    for node in body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    imports[alias.asname] = [0, alias.name, ""]
+                else:
+                    head = alias.name.split(".")[0]
+                    imports[head] = [0, head, ""]
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                if alias.name != "*":
+                    imports[alias.asname or alias.name] = [node.level, node.module or "", alias.name]
+        elif isinstance(node, (ast.If, ast.Try)):
+            for block in [node.body, node.orelse] + [getattr(node, "finalbody", [])]:
+                imports.update(_parse_imports(block))
+            for handler in getattr(node, "handlers", []):
+                imports.update(_parse_imports(handler.body))
+    return imports
@@ -6,21 +6,29 @@
 @File    : __init__.py
 """
 
-from metagpt.roles.role import Role
-from metagpt.roles.architect import Architect
-from metagpt.roles.project_manager import ProjectManager
-from metagpt.roles.qa_engineer import QaEngineer
-from metagpt.roles.code_interpreter import CodeInterpreter
-from metagpt.roles.notebook_converter import NotebookConverter
-from metagpt.roles.initializer import Initializer, evaluation_initializer
-from metagpt.roles.product_manager import ProductManager
-from metagpt.roles.engineer import Engineer
-from metagpt.roles.summarizer import Summarizer
-from metagpt.roles.reviewer import Reviewer
-from metagpt.roles.evaluator import Evaluator
-from metagpt.roles.inspector import Inspector
-from metagpt.roles.scorer import Scorer
+from metagpt.utils.lazy_import import lazy_attributes
 
+# Roles are imported on first use, so that importing a single role does not import the actions of all the others
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "Role": "metagpt.roles.role",
+        "Architect": "metagpt.roles.architect",
+        "ProjectManager": "metagpt.roles.project_manager",
+        "QaEngineer": "metagpt.roles.qa_engineer",
+        "CodeInterpreter": "metagpt.roles.code_interpreter",
+        "NotebookConverter": "metagpt.roles.notebook_converter",
+        "Initializer": "metagpt.roles.initializer",
+        "evaluation_initializer": "metagpt.roles.initializer",
+        "ProductManager": "metagpt.roles.product_manager",
+        "Engineer": "metagpt.roles.engineer",
+        "Summarizer": "metagpt.roles.summarizer",
+        "Reviewer": "metagpt.roles.reviewer",
+        "Evaluator": "metagpt.roles.evaluator",
+        "Inspector": "metagpt.roles.inspector",
+        "Scorer": "metagpt.roles.scorer",
+    },
+)
 
 __all__ = [
     "Role",
@@ -69,10 +69,10 @@ class Architect(Role):
         Returns:
             Message: Status message about architectural design completion
         """
-        # Initialize RAG engine with FAISS index for code context retrieval
+        # Load the shared RAG engine with FAISS index for code context retrieval
         pathname = self.git_repo.workdir / RAG_ENGINE_DIR
         config = FAISSIndexConfig(persist_path= pathname)
-        engine = SimpleEngine.from_index(index_config=config)
+        engine = SimpleEngine.from_index_cached(index_config=config)
 
         write_summary = []
 
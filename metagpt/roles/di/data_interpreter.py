@@ -1,17 +1,25 @@
 from __future__ import annotations
 
 import json
-from typing import Literal
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Literal, Optional
 
-from pydantic import Field, model_validator
+import nbformat
+from pydantic import Field, PrivateAttr, model_validator
 
 from metagpt.actions.di.ask_review import ReviewConst
 from metagpt.actions.di.execute_nb_code import ExecuteNbCode
+from metagpt.actions.di.kernel_pool import KernelPool
 from metagpt.actions.di.write_analysis_code import CheckData, WriteAnalysisCode
 from metagpt.logs import logger
+from metagpt.memory import Memory
 from metagpt.prompts.di.write_analysis_code import DATA_INFO
 from metagpt.roles import Role
-from metagpt.schema import Message, Task, TaskResult
+from metagpt.schema import Message, Plan, Task, TaskResult
+from metagpt.strategy.planner import Planner
 from metagpt.strategy.task_type import TaskType
 from metagpt.tools.tool_recommend import BM25ToolRecommender, ToolRecommender
 from metagpt.utils.common import CodeParser
@@ -39,10 +47,19 @@ class DataInterpreter(Role):
     use_plan: bool = True
     use_reflection: bool = False
     execute_code: ExecuteNbCode = Field(default_factory=ExecuteNbCode, exclude=True)
+    kernel_pool: Optional[KernelPool] = Field(default=None, exclude=True)  # can be shared by several interpreters
     tools: list[str] = []  # Use special symbol ["<all>"] to indicate use of all registered tools
     tool_recommender: ToolRecommender = None
     react_mode: Literal["plan_and_act", "react"] = "plan_and_act"
     max_react_loop: int = 10  # used for react mode
+    max_parallel_tasks: int = 1  # more than 1 takes on the independent tasks of a plan concurrently, in own kernels
+
+    # kernels of the finished tasks, with the code they ran by task id, kept for the tasks depending on them
+    _branch_executors: dict[str, tuple[ExecuteNbCode, dict[str, str]]] = PrivateAttr(default_factory=dict)
+    # files of the kernel namespaces saved by the finished tasks, with the code of the tasks they hold by task id, see
+    # `ExecuteNbCode.save_namespace`
+    _namespaces: dict[str, tuple[Path, dict[str, str]]] = PrivateAttr(default_factory=dict)
+    _namespace_dir: Optional[str] = PrivateAttr(default=None)
 
     @model_validator(mode="after")
     def set_plan_and_tool(self) -> "Interpreter":
@@ -52,6 +69,9 @@ class DataInterpreter(Role):
         )  # create a flag for convenience, overwrite any passed-in value
         if self.tools and not self.tool_recommender:
             self.tool_recommender = BM25ToolRecommender(tools=self.tools)
+        if self.kernel_pool:
+            self.execute_code.kernel_pool = self.kernel_pool
+        self.planner.max_parallel_tasks = self.max_parallel_tasks
         self.set_actions([WriteAnalysisCode])
         self._set_state(0)
         return self
@@ -88,56 +108,134 @@ class DataInterpreter(Role):
     async def _plan_and_act(self) -> Message:
         try:
             rsp = await super()._plan_and_act()
-            await self.execute_code.terminate()
+            await self._terminate_executors()
             return rsp
         except Exception as e:
-            await self.execute_code.terminate()
+            await self._terminate_executors()
             raise e
 
+    async def _terminate_executors(self):
+        await self.execute_code.terminate()
+        for execute_code, _ in self._branch_executors.values():
+            await execute_code.terminate()
+        self._branch_executors = {}
+        if self._namespace_dir:
+            shutil.rmtree(self._namespace_dir, ignore_errors=True)
+        self._namespace_dir, self._namespaces = None, {}
+
     async def _act_on_task(self, current_task: Task) -> TaskResult:
         """Useful in 'plan_and_act' mode. Wrap the output in a TaskResult for review and confirmation."""
         code, result, is_success = await self._write_and_exec_code()
         task_result = TaskResult(code=code, result=result, is_success=is_success)
         return task_result
 
-    async def _write_and_exec_code(self, max_retry: int = 3):
+    async def _act_on_branch(self, planner: Planner) -> TaskResult:
+        """Useful in 'plan_and_act' mode with max_parallel_tasks > 1. Take on the current task of the branch in a kernel
+        of its own, whose namespace is forked from the tasks it depends on."""
+        plan, task = planner.plan, planner.current_task
+        execute_code, namespace = await self._fork_executor(plan, task)
+        try:
+            code, result, is_success = await self._write_and_exec_code(planner=planner, execute_code=execute_code)
+            self._namespaces.pop(task.task_id, None)
+            if is_success and any(task.task_id in i.dependent_task_ids for i in plan.tasks):
+                # save the namespace for the dependent tasks which do not take over this kernel
+                self._namespace_dir = self._namespace_dir or tempfile.mkdtemp(prefix="metagpt_namespaces_")
+                path = Path(self._namespace_dir) / f"{uuid.uuid4().hex}.pkl"
+                if await execute_code.save_namespace(path):
+                    self._namespaces[task.task_id] = (path, {**namespace, task.task_id: code})
+        except BaseException:
+            await execute_code.terminate()
+            raise
+        previous, _ = self._branch_executors.pop(task.task_id, (None, None))
+        if previous:
+            await previous.terminate()
+        if is_success:
+            # keep the kernel for one of the tasks depending on this one
+            self._branch_executors[task.task_id] = (execute_code, {**namespace, task.task_id: code})
+        else:
+            await execute_code.terminate()
+        return TaskResult(code=code, result=result, is_success=is_success)
+
+    async def _fork_executor(self, plan: Plan, task: Task) -> tuple[ExecuteNbCode, dict[str, str]]:
+        """Take over the kernel of a task this task directly depends on, or start a new one, and bring in the variables
+        of the prerequisite tasks missing from its namespace, from the saved namespaces of these tasks or by running
+        their code again. Return the executor and the code of the tasks in its namespace by task id."""
+        dependencies = plan.get_dependency_tasks(task.task_id)
+        dependency_codes = {dependency.task_id: dependency.code for dependency in dependencies}
+        for task_id in task.dependent_task_ids:
+            execute_code, namespace = self._branch_executors.get(task_id, (None, {}))
+            # the kernel must not hold code of other branches, or code of tasks since updated by the plan
+            if execute_code and all(dependency_codes.get(i) == code for i, code in namespace.items()):
+                del self._branch_executors[task_id]
+                break
+        else:
+            execute_code, namespace = ExecuteNbCode(nb=nbformat.v4.new_notebook(), kernel_pool=self.kernel_pool), {}
+
+        for dependency in dependencies:
+            if dependency.task_id in namespace:
+                continue
+            path, codes = self._namespaces.get(dependency.task_id, (None, {}))
+            # a saved namespace holds the variables of the task and of its prerequisites, it may only replace variables
+            # of these tasks, the changes made in place by other tasks would be lost otherwise
+            if (
+                path
+                and set(namespace) <= set(codes)
+                and all(dependency_codes.get(i) == code for i, code in codes.items())
+                and await execute_code.load_namespace(path)
+            ):
+                namespace = {**namespace, **codes}
+                continue
+            logger.info(f"Run the code of task {dependency.task_id} again for task {task.task_id}")
+            success, error = await execute_code.execute_silently(dependency.code)
+            if not success:
+                logger.warning(f"Failed to run the code of task {dependency.task_id}: {error}")
+            namespace = {**namespace, dependency.task_id: dependency.code}
+        return execute_code, namespace
+
+    async def _write_and_exec_code(
+        self, max_retry: int = 3, planner: Planner = None, execute_code: ExecuteNbCode = None
+    ):
+        # a branch of the planner takes on its task with its own memory and kernel
+        working_memory = planner.working_memory if planner else self.working_memory
+        planner = planner or self.planner
+        execute_code = execute_code or self.execute_code
         counter = 0
         success = False
 
         # plan info
-        plan_status = self.planner.get_plan_status() if self.use_plan else ""
+        plan_status = planner.get_plan_status() if self.use_plan else ""
 
         # tool info
         if self.tool_recommender:
             context = (
-                self.working_memory.get()[-1].content if self.working_memory.get() else ""
+                working_memory.get()[-1].content if working_memory.get() else ""
             )  # thoughts from _think stage in 'react' mode
-            plan = self.planner.plan if self.use_plan else None
+            plan = planner.plan if self.use_plan else None
             tool_info = await self.tool_recommender.get_recommended_tool_info(context=context, plan=plan)
         else:
             tool_info = ""
 
         # data info
-        await self._check_data()
+        await self._check_data(planner, working_memory, execute_code)
 
         while not success and counter < max_retry:
             ### write code ###
-            code, cause_by = await self._write_code(counter, plan_status, tool_info)
+            code, cause_by = await self._write_code(counter, plan_status, tool_info, working_memory)
 
-            self.working_memory.add(Message(content=code, role="assistant", cause_by=cause_by))
+            working_memory.add(Message(content=code, role="assistant", cause_by=cause_by))
 
             ### execute code ###
-            result, success = await self.execute_code.run(code)
+            result, success = await execute_code.run(code)
             print(result)
 
-            self.working_memory.add(Message(content=result, role="user", cause_by=ExecuteNbCode))
+            working_memory.add(Message(content=result, role="user", cause_by=ExecuteNbCode))
 
             ### process execution result ###
             counter += 1
 
             if not success and counter >= max_retry:
                 logger.info("coding failed!")
-                review, _ = await self.planner.ask_review(auto_run=False, trigger=ReviewConst.CODE_REVIEW_TRIGGER)
+                review, _ = await planner.ask_review(auto_run=False, trigger=ReviewConst.CODE_REVIEW_TRIGGER)
                 if ReviewConst.CHANGE_WORDS[0] in review:
                     counter = 0  # redo the task again with help of human suggestions
 
@@ -148,28 +246,33 @@ class DataInterpreter(Role):
         counter: int,
         plan_status: str = "",
         tool_info: str = "",
+        working_memory: Memory = None,
     ):
         todo = self.rc.todo  # todo is WriteAnalysisCode
         logger.info(f"ready to {todo.name}")
         use_reflection = counter > 0 and self.use_reflection  # only use reflection after the first trial
 
         user_requirement = self.get_memories()[0].content
+        working_memory = working_memory or self.working_memory
 
         code = await todo.run(
             user_requirement=user_requirement,
             plan_status=plan_status,
             tool_info=tool_info,
-            working_memory=self.working_memory.get(),
+            working_memory=working_memory.get(),
             use_reflection=use_reflection,
         )
 
         return code, todo
 
-    async def _check_data(self):
+    async def _check_data(
+        self, planner: Planner = None, working_memory: Memory = None, execute_code: ExecuteNbCode = None
+    ):
+        planner = planner or self.planner
         if (
             not self.use_plan
-            or not self.planner.plan.get_finished_tasks()
-            or self.planner.plan.current_task.task_type
+            or not planner.plan.get_finished_tasks()
+            or planner.plan.current_task.task_type
             not in [
                 TaskType.DATA_PREPROCESS.type_name,
                 TaskType.FEATURE_ENGINEERING.type_name,
@@ -178,11 +281,11 @@ class DataInterpreter(Role):
         ):
             return
         logger.info("Check updated data")
-        code = await CheckData().run(self.planner.plan)
+        code = await CheckData().run(planner.plan)
         if not code.strip():
             return
-        result, success = await self.execute_code.run(code)
+        result, success = await (execute_code or self.execute_code).run(code)
         if success:
             print(result)
             data_info = DATA_INFO.format(info=result)
-            self.working_memory.add(Message(content=data_info, role="user", cause_by=CheckData))
+            (working_memory or self.working_memory).add(Message(content=data_info, role="user", cause_by=CheckData))
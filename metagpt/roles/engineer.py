@@ -19,6 +19,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 from collections import defaultdict
 from pathlib import Path
@@ -110,43 +111,89 @@ class Engineer(Role):
         return analysis.get("description"), analysis.get("constants")
 
     async def _act_sp_with_cr(self, review=False) -> Set[str]:
-        changed_files = set()
-        for todo in self.code_todos:
-            """
-            # Select essential information from the historical data to reduce the length of the prompt (summarized from human experience):
-            1. All from Architect
-            2. All from ProjectManager
-            3. Do we need other codes (currently needed)?
-            TODO: The goal is not to need it. After clear task decomposition, based on the design idea, you should be able to write a single file without needing other codes. If you can't, it means you need a clearer definition. This is the key to writing longer code.
-            """
-            coding_context = await todo.run()
-            # Code review
-            if review:
-                action = WriteCodeReview(i_context=coding_context, context=self.context, llm=self.llm)
-                self._init_action(action)
-                coding_context = await action.run()
-
-            dependencies = {coding_context.task_doc.root_relative_path}
-            if self.config.inc:
-                dependencies.add(coding_context.code_plan_and_change_doc.root_relative_path)
-            await self.project_repo.srcs.save(
-                filename=coding_context.filename,
-                dependencies=list(dependencies),
-                content=coding_context.code_doc.content,
-            )
-            msg = Message(
-                content=coding_context.model_dump_json(),
-                instruct_content=coding_context,
-                role=self.profile,
-                cause_by=WriteCode,
-            )
-            self.rc.memory.add(msg)
-
-            changed_files.add(coding_context.code_doc.filename)
+        """Write the code todos concurrently, up to `n_borg` at a time, each file only after the files it depends on
+        are saved, so that their code is available to the review."""
+        dependencies = self._code_dependencies()
+        saved = {filename: asyncio.Event() for filename in dependencies}
+        semaphore = asyncio.Semaphore(max(1, self.n_borg))
+
+        async def write(todo: WriteCode) -> CodingContext:
+            filename = todo.i_context.filename
+            try:
+                for i in dependencies[filename]:
+                    await saved[i].wait()
+                async with semaphore:
+                    return await self._write_code(todo, review)
+            finally:
+                saved[filename].set()
+
+        tasks = [asyncio.create_task(write(todo)) for todo in self.code_todos]
+        try:
+            coding_contexts = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        changed_files = {coding_context.code_doc.filename for coding_context in coding_contexts}
         if not changed_files:
             logger.info("Nothing has changed.")
         return changed_files
 
+    async def _write_code(self, todo: WriteCode, review: bool) -> CodingContext:
+        """
+        # Select essential information from the historical data to reduce the length of the prompt (summarized from human experience):
+        1. All from Architect
+        2. All from ProjectManager
+        3. Do we need other codes (currently needed)?
+        TODO: The goal is not to need it. After clear task decomposition, based on the design idea, you should be able to write a single file without needing other codes. If you can't, it means you need a clearer definition. This is the key to writing longer code.
+        """
+        coding_context = await todo.run()
+        # Code review
+        if review:
+            action = WriteCodeReview(i_context=coding_context, context=self.context, llm=self.llm)
+            self._init_action(action)
+            coding_context = await action.run()
+
+        dependencies = {coding_context.task_doc.root_relative_path}
+        if self.config.inc:
+            dependencies.add(coding_context.code_plan_and_change_doc.root_relative_path)
+        await self.project_repo.srcs.save(
+            filename=coding_context.filename,
+            dependencies=list(dependencies),
+            content=coding_context.code_doc.content,
+        )
+        msg = Message(
+            content=coding_context.model_dump_json(),
+            instruct_content=coding_context,
+            role=self.profile,
+            cause_by=WriteCode,
+        )
+        self.rc.memory.add(msg)
+        return coding_context
+
+    def _code_dependencies(self) -> dict[str, Set[str]]:
+        """Map the filename of each code todo to the filenames of the earlier todos it depends on.
+
+        The task list is ordered with prerequisites first, a file depends on the earlier files whose module names are
+        mentioned in its Integration Analysis, and the entry point `main.py` depends on all of them. Only earlier files
+        are considered, so the graph is acyclic.
+        """
+        dependencies = {}
+        for todo in self.code_todos:
+            filename = todo.i_context.filename
+            coding_context = CodingContext.loads(todo.i_context.content)
+            analysis = ""
+            if coding_context and coding_context.task_doc and coding_context.task_doc.content:
+                analysis_list = json.loads(coding_context.task_doc.content).get("Integration Analysis") or []
+                entry = next((i for i in analysis_list if isinstance(i, dict) and i.get("file") == filename), None)
+                analysis = json.dumps(entry) if entry else ""
+            dependencies[filename] = {
+                i
+                for i in dependencies
+                if Path(filename).name == "main.py" or re.search(rf"\b{re.escape(Path(i).stem)}\b", analysis)
+            }
+        return dependencies
+
     async def _act(self) -> Message | None:
         """Determines the mode of action based on whether code review is used."""
         if self.rc.todo is None:
@@ -338,10 +385,10 @@ class Engineer(Role):
         Returns:
             None. Updates self.code_todos and potentially sets a new todo action.
         """
-        # Initialize RAG engine with FAISS index for code retrieval
+        # Load the shared RAG engine with FAISS index for code retrieval
         pathname = self.git_repo.workdir / RAG_ENGINE_DIR
         config = FAISSIndexConfig(persist_path= pathname)
-        engine = SimpleEngine.from_index(index_config=config)
+        engine = SimpleEngine.from_index_cached(index_config=config)
 
         # Check if we're in bug fix mode - affects which files we process
         bug_fix = await self._is_fixbug()
@@ -350,36 +397,41 @@ class Engineer(Role):
         changed_task_files = self.project_repo.docs.task.changed_files
         changed_files = Documents()
 
-        # Process changes triggered by task modifications
+        # Collect the tasks triggered by task modifications
+        tasks = []
         for filename in changed_task_files:
             task_doc = await self.project_repo.docs.task.get(filename)
             task_list = self._parse_tasks(task_doc)
             for task_filename in task_list:
-                # Extract task details and use RAG to find relevant code
+                # Extract task details to find the relevant code
                 description, constants = self._parse_info_tasks(task_doc, task_filename)
-                pattern = r"(.*?)\#\#The following is the explaination of this part of code:"
-                nodes = await engine.aretrieve("What's the code relevant to the following description and constants: "+f"##description:({description}) ##constants:({str(constants)})")
-                
-                # Create documents and contexts for the task
-                original_code = Document(root_path=str(self.project_repo.src_relative_path), filename=task_filename, content="####".join([re.search(pattern, node.text, re.DOTALL).group(1) for node in nodes]))
-                context = CodingContext(
-                    code_doc= original_code,
-                    filename=task_filename,
-                    task_doc=task_doc,
-                )
-                coding_doc = Document(
-                    root_path=str(self.project_repo.src_relative_path),
-                    filename=task_filename,
-                    content=context.model_dump_json(),
+                query = "What's the code relevant to the following description and constants: "+f"##description:({description}) ##constants:({str(constants)})"
+                tasks.append((task_doc, task_filename, query))
+
+        # Use RAG to find the relevant code of all tasks in one batch
+        nodes_list = await engine.aretrieve_many([query for _, _, query in tasks])
+        pattern = r"(.*?)\#\#The following is the explaination of this part of code:"
+        for (task_doc, task_filename, _), nodes in zip(tasks, nodes_list):
+            # Create documents and contexts for the task
+            original_code = Document(root_path=str(self.project_repo.src_relative_path), filename=task_filename, content="####".join([re.search(pattern, node.text, re.DOTALL).group(1) for node in nodes]))
+            context = CodingContext(
+                code_doc= original_code,
+                filename=task_filename,
+                task_doc=task_doc,
+            )
+            coding_doc = Document(
+                root_path=str(self.project_repo.src_relative_path),
+                filename=task_filename,
+                content=context.model_dump_json(),
+            )
+
+            # Log potential conflicts and update changed files
+            if task_filename in changed_files.docs:
+                logger.warning(
+                    f"Log to expose potential conflicts: {coding_doc.model_dump_json()} & "
+                    f"{changed_files.docs[task_filename].model_dump_json()}"
                 )
-                
-                # Log potential conflicts and update changed files
-                if task_filename in changed_files.docs:
-                    logger.warning(
-                        f"Log to expose potential conflicts: {coding_doc.model_dump_json()} & "
-                        f"{changed_files.docs[task_filename].model_dump_json()}"
-                    )
-                changed_files.docs[task_filename] = coding_doc
+            changed_files.docs[task_filename] = coding_doc
 
         # Create WriteCode actions for all changed files
         self.code_todos = [
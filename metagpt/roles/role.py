@@ -23,6 +23,7 @@
 from __future__ import annotations
 
 from enum import Enum
+from pathlib import Path
 from typing import TYPE_CHECKING, Iterable, Optional, Set, Type, Union
 
 from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validator
@@ -30,9 +31,10 @@ from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, model_validat
 from metagpt.actions import Action, ActionOutput
 from metagpt.actions.action_node import ActionNode
 from metagpt.actions.add_requirement import UserRequirement
+from metagpt.const import ROLE_MEMORY_DIR
 from metagpt.context_mixin import ContextMixin
 from metagpt.logs import logger
-from metagpt.memory import Memory
+from metagpt.memory import Memory, WindowedMemory
 from metagpt.provider import HumanProvider
 from metagpt.schema import Message, MessageQueue, SerializationMixin
 from metagpt.strategy.planner import Planner
@@ -42,6 +44,7 @@ from metagpt.utils.repair_llm_raw_output import extract_state_value_from_output
 
 if TYPE_CHECKING:
     from metagpt.environment import Environment  # noqa: F401
+    from metagpt.schema import Task, TaskResult
 
 
 PREFIX_TEMPLATE = """You are a {profile}, named {name}, your goal is {goal}. """
@@ -168,6 +171,7 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
             self.llm = HumanProvider(None)
 
         self._check_actions()
+        self._set_memory_policy()
         self.llm.system_prompt = self._get_prefix()
         self.llm.cost_manager = self.context.cost_manager
         if not self.rc.watch:
@@ -241,6 +245,33 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
     def _setting(self):
         return f"{self.name}({self.profile})"
 
+    def _set_memory_policy(self):
+        """Bound the memory of the role as configured, its older messages spill to the workspace.
+
+        The spill log is named by the role and its environment, a new role starts it over instead of adding a file.
+        """
+        policy = self.config.role_memory
+        if not (policy.max_messages or policy.max_tokens):
+            return
+        role_name = self.name or self.profile or type(self).__name__
+        env_name = type(self.rc.env).__name__ if self.rc.env else "NoEnv"
+        spill_path = Path(self.config.workspace.path) / ROLE_MEMORY_DIR / f"{role_name}-{env_name}.jsonl"
+        if isinstance(self.rc.memory, WindowedMemory):
+            if not self.rc.memory.spilled and self.rc.memory.spill_path != spill_path:
+                # Joined an environment before anything spilled, a recovered spill log is kept
+                spill_path.unlink(missing_ok=True)
+                self.rc.memory.spill_path = spill_path
+            return
+        spill_path.unlink(missing_ok=True)  # left by a previous run of the role
+        memory = WindowedMemory(
+            max_messages=policy.max_messages,
+            max_tokens=policy.max_tokens,
+            spill_path=spill_path,
+            ignore_id=self.rc.memory.ignore_id,
+        )
+        memory.add_batch(self.rc.memory.get())
+        self.rc.memory = memory
+
     def _check_actions(self):
         """Check actions and set llm and prefix for each action."""
         self.set_actions(self.actions)
@@ -332,6 +363,7 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         self.rc.env = env
         if env:
             env.set_addresses(self, self.addresses)
+            self._set_memory_policy()
             self.llm.system_prompt = self._get_prefix()
             self.llm.cost_manager = self.context.cost_manager
             self.set_actions(self.actions)  # reset actions to update llm and prefix
@@ -426,13 +458,12 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
             news = [self.latest_observed_msg] if self.latest_observed_msg else []
         if not news:
             news = self.rc.msg_buffer.pop_all()
+        # Look up the read messages in the memory indexes, the ones already stored have been processed.
+        unseen = news if ignore_memory else self.rc.memory.find_news(news)
         # Store the read messages in your own memory to prevent duplicate processing.
-        old_messages = [] if ignore_memory else self.rc.memory.get()
         self.rc.memory.add_batch(news)
         # Filter out messages of interest.
-        self.rc.news = [
-            n for n in news if (n.cause_by in self.rc.watch or self.name in n.send_to) and n not in old_messages
-        ]
+        self.rc.news = [n for n in unseen if n.cause_by in self.rc.watch or self.name in n.send_to]
         self.latest_observed_msg = self.rc.news[-1] if self.rc.news else None  # record the latest observed msg
 
         # Design Rules:
@@ -484,6 +515,8 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         await self.planner.update_plan(goal=goal)
 
         # take on tasks until all finished
+        if self.planner.max_parallel_tasks > 1:
+            await self.planner.execute_in_parallel(self._act_on_branch)
         while self.planner.current_task:
             task = self.planner.current_task
             logger.info(f"ready to take on task {task}")
@@ -514,6 +547,21 @@ class Role(SerializationMixin, ContextMixin, BaseModel):
         """
         raise NotImplementedError
 
+    async def _act_on_branch(self, planner: Planner) -> TaskResult:
+        """Taking specific action to handle the current task of a branch of the planner, concurrently with other
+        branches, used when `planner.max_parallel_tasks` > 1
+
+        Args:
+            planner (Planner): branch of the planner, with the task to take on as its current task
+
+        Raises:
+            NotImplementedError: Specific Role must implement this method if expected to take on tasks in parallel
+
+        Returns:
+            TaskResult: Result from the actions
+        """
+        raise NotImplementedError
+
     async def react(self) -> Message:
         """Entry to one of three strategies by which Role reacts to the observed Message"""
         if self.rc.react_mode == RoleReactMode.REACT or self.rc.react_mode == RoleReactMode.BY_ORDER:
@@ -520,8 +520,41 @@ class Plan(BaseModel):
     def finish_current_task(self):
         """Finish current task, set Task.is_finished=True, set current task to next task"""
         if self.current_task_id:
-            self.current_task.is_finished = True
-            self._update_current_task()  # set to next task
+            self.finish_task(self.current_task_id)
+
+    def finish_task(self, task_id: str):
+        """Finish a task, which may not be the current one when tasks run in parallel, set current task to next task"""
+        self.task_map[task_id].is_finished = True
+        self._update_current_task()
+
+    def get_ready_tasks(self) -> list[Task]:
+        """return the unfinished tasks whose prerequisite tasks are all finished, in linearized order
+
+        Returns:
+            list[Task]: list of tasks which can be taken on now
+        """
+        return [
+            task
+            for task in self.tasks
+            if not task.is_finished
+            and all(self.has_task_id(i) and self.task_map[i].is_finished for i in task.dependent_task_ids)
+        ]
+
+    def get_dependency_tasks(self, task_id: str) -> list[Task]:
+        """return the tasks a task depends on, directly or not, in linearized order
+
+        Returns:
+            list[Task]: list of prerequisite tasks
+        """
+        dependencies = set()
+        stack = list(self.task_map[task_id].dependent_task_ids)
+        while stack:
+            dependent_id = stack.pop()
+            if dependent_id in dependencies or not self.has_task_id(dependent_id):
+                continue
+            dependencies.add(dependent_id)
+            stack.extend(self.task_map[dependent_id].dependent_task_ids)
+        return [task for task in self.tasks if task.task_id in dependencies]
 
     def get_finished_tasks(self) -> list[Task]:
         """return all finished tasks in correct linearized order
@@ -37,7 +37,7 @@ def generate_repo(
         ProjectManager,
         QaEngineer,
     )
-    from metagpt.team import Team
+    from metagpt.team import Team, run_company
 
     if config.agentops_api_key != "":
         agentops.init(config.agentops_api_key, tags=["software_company"])
@@ -70,7 +70,7 @@ def generate_repo(
 
     company.invest(investment)
     company.run_project(idea)
-    asyncio.run(company.run(n_round=n_round))
+    asyncio.run(run_company(company, n_round=n_round))
 
     if config.agentops_api_key != "":
         agentops.end_session("Success")
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 import json
+from typing import Awaitable, Callable
 
 from pydantic import BaseModel, Field
 
@@ -52,6 +54,8 @@ class Planner(BaseModel):
         default_factory=Memory
     )  # memory for working on each task, discarded each time a task is done
     auto_run: bool = False
+    max_parallel_tasks: int = 1  # more than 1 takes on the independent tasks of the plan concurrently
+    is_branch: bool = False  # a planner forked to take on a single task of the plan, see `fork`
 
     def __init__(self, goal: str = "", plan: Plan = None, **kwargs):
         plan = plan or Plan(goal=goal)
@@ -107,6 +111,62 @@ class Planner(BaseModel):
             # update plan according to user's feedback and to take on changed tasks
             await self.update_plan()
 
+    async def execute_in_parallel(self, act_on_branch: Callable[[Planner], Awaitable[TaskResult]]):
+        """
+        Take on the tasks of the plan as soon as their prerequisite tasks are finished, up to `max_parallel_tasks` at
+        a time, until all tasks are finished. Each task is taken on by `act_on_branch` with a branch of this planner.
+
+        In auto mode, a successful result is confirmed at once. Other results are processed like with
+        `process_task_result` once the running tasks are settled, so a failed task only holds back the tasks depending
+        on it, and the plan is never updated under a running task.
+        """
+        running: dict[asyncio.Task, tuple[Task, Planner]] = {}
+        settling: list[tuple[Task, Planner, TaskResult]] = []
+        try:
+            while True:
+                blocked = {task.task_id for task, _ in running.values()} | {task.task_id for task, _, _ in settling}
+                for task in self.plan.get_ready_tasks():
+                    if len(running) >= self.max_parallel_tasks:
+                        break
+                    if task.task_id in blocked:
+                        continue
+                    logger.info(f"ready to take on task {task}")
+                    branch = self.fork(task)
+                    running[asyncio.create_task(act_on_branch(branch))] = (task, branch)
+
+                if running:
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        task, branch = running.pop(future)
+                        task_result = future.result()
+                        if self.auto_run and task_result.is_success:
+                            task.update_task_result(task_result=task_result)
+                            self.plan.finish_task(task.task_id)
+                        else:
+                            settling.append((task, branch, task_result))
+                elif settling:
+                    for task, branch, task_result in settling:
+                        if self.plan.task_map.get(task.task_id) is not task:
+                            continue  # replaced by a plan update
+                        self.plan.current_task_id = task.task_id
+                        self.working_memory.add_batch(branch.working_memory.get())
+                        await self.process_task_result(task_result)
+                    settling = []
+                else:
+                    break
+        finally:
+            for future in running:
+                future.cancel()
+
+        unfinished = [task.task_id for task in self.plan.tasks if not task.is_finished]
+        if unfinished:
+            logger.warning(f"Tasks with unknown dependencies are left to be taken on one at a time: {unfinished}")
+
+    def fork(self, task: Task) -> Planner:
+        """Branch off a planner sharing the tasks of the plan, with `task` as its current task and its own memory"""
+        plan = self.plan.model_copy(update={"current_task_id": task.task_id})
+        return Planner(plan=plan, auto_run=self.auto_run, is_branch=True)
+
     async def ask_review(
         self,
         task_result: TaskResult = None,
@@ -159,7 +219,11 @@ class Planner(BaseModel):
 
     def get_plan_status(self) -> str:
         # prepare components of a plan status
-        finished_tasks = self.plan.get_finished_tasks()
+        if self.is_branch:
+            # the tasks taken on by other branches are not in the namespace of this one
+            finished_tasks = self.plan.get_dependency_tasks(self.current_task_id)
+        else:
+            finished_tasks = self.plan.get_finished_tasks()
         code_written = [remove_comments(task.code) for task in finished_tasks]
         code_written = "\n\n".join(code_written)
         task_results = [task.result for task in finished_tasks]
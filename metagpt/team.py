@@ -19,6 +19,7 @@ from metagpt.const import MESSAGE_ROUTE_TO_ALL, SERDESER_PATH
 from metagpt.context import Context
 from metagpt.environment import Environment
 from metagpt.logs import logger
+from metagpt.provider.llm_provider_registry import close_llm_clients
 from metagpt.roles import Role
 from metagpt.schema import Message
 from metagpt.utils.common import (
@@ -120,11 +121,21 @@ class Team(BaseModel):
         return self.run_project(idea=idea, send_to=send_to)
 
     @serialize_decorator
-    async def run(self, n_round=3, idea="", send_to="", auto_archive=True):
-        """Run company until target round or no money"""
+    async def run(self, n_round=3, idea="", send_to="", auto_archive=True, event_driven=False, max_concurrency=0):
+        """Run company until target round or no money.
+        With event_driven, roles react as soon as messages reach them instead of in rounds, n_round then bounds the
+        reactions of each role and max_concurrency the roles running at the same time.
+        """
         if idea:
             self.run_project(idea=idea, send_to=send_to)
 
+        if event_driven:
+            self._check_balance()
+            await self.env.run_until_idle(
+                max_steps=n_round, max_concurrency=max_concurrency, on_step=self._check_balance
+            )
+            n_round = 0
+
         while n_round > 0:
             if self.env.is_idle:
                 logger.debug("All roles are idle.")
@@ -136,3 +147,11 @@ class Team(BaseModel):
             logger.debug(f"max {n_round=} left.")
         self.env.archive(auto_archive)
         return self.env.history
+
+
+async def run_company(team: Team, n_round=3, event_driven=False) -> str:
+    """Run the team, then close the pooled LLM clients before the event loop is closed"""
+    try:
+        return await team.run(n_round=n_round, event_driven=event_driven)
+    finally:
+        await close_llm_clients()
@@ -7,10 +7,13 @@
 """
 
 from enum import Enum
-from metagpt.tools import libs  # this registers all tools
-from metagpt.tools.tool_registry import TOOL_REGISTRY
 
-_ = libs, TOOL_REGISTRY  # Avoid pre-commit error
+from metagpt.utils.lazy_import import lazy_attributes
+
+# The tool libraries are imported, and so registered, when the registry is first queried
+__getattr__, __dir__ = lazy_attributes(
+    __name__, {"libs": "metagpt.tools.libs", "TOOL_REGISTRY": "metagpt.tools.tool_registry"}
+)
 
 
 class SearchEngineType(Enum):
@@ -108,7 +108,9 @@ class ToolRecommender(BaseModel):
         recommended_tools = await self.recommend_tools(**kwargs)
         if not recommended_tools:
             return ""
-        tool_schemas = {tool.name: tool.schemas for tool in recommended_tools}
+        # serialized once by the registry, the same text as formatting a dict of the schemas
+        schema_strings = TOOL_REGISTRY.get_schema_strings([tool.name for tool in recommended_tools])
+        tool_schemas = "{" + ", ".join(f"{name!r}: {schemas}" for name, schemas in schema_strings.items()) + "}"
         return TOOL_INFO_PROMPT.format(tool_schemas=tool_schemas)
 
     async def recall_tools(self, context: str = "", plan: Plan = None, topk: int = 20) -> list[Tool]:
@@ -7,26 +7,42 @@
 """
 from __future__ import annotations
 
+import copy
+import functools
+import hashlib
+import importlib
 import inspect
+import json
 import os
+import tempfile
 from collections import defaultdict
 from pathlib import Path
+from typing import Optional
 
 import yaml
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
-from metagpt.const import TOOL_SCHEMA_PATH
+from metagpt.const import TOOL_SCHEMA_CACHE_PATH, TOOL_SCHEMA_PATH
 from metagpt.logs import logger
+from metagpt.tools import tool_convert
 from metagpt.tools.tool_convert import (
     convert_code_to_tool_schema,
     convert_code_to_tool_schema_ast,
 )
 from metagpt.tools.tool_data_type import Tool, ToolSchema
+from metagpt.utils import parse_docstring
 
 
 class ToolRegistry(BaseModel):
     tools: dict = {}
     tools_by_tags: dict = defaultdict(dict)  # two-layer k-v, {tag: {tool_name: {...}, ...}, ...}
+    schema_cache_path: Optional[Path] = TOOL_SCHEMA_CACHE_PATH  # None keeps the schema cache in memory only
+
+    # classes or functions registered without schemas, their code and schemas are made on first access
+    _sources: dict = PrivateAttr(default_factory=dict)
+    _libs_loaded: bool = PrivateAttr(default=False)
+    _schema_cache: dict = PrivateAttr(default_factory=dict)  # {source hash: {"schemas": {...}, "code": "..."}}
+    _schema_strings: dict = PrivateAttr(default_factory=dict)  # {tool_name: serialized schemas}
 
     def register_tool(
         self,
@@ -40,52 +56,151 @@ class ToolRegistry(BaseModel):
         include_functions: list[str] = None,
         verbose: bool = False,
     ):
-        if self.has_tool(tool_name):
+        if tool_name in self.tools:
             return
 
-        schema_path = schema_path or TOOL_SCHEMA_PATH / f"{tool_name}.yml"
+        if not schemas and tool_source_object is None:
+            return
 
-        if not schemas:
-            schemas = make_schema(tool_source_object, include_functions, schema_path)
+        schema_path = schema_path or TOOL_SCHEMA_PATH / f"{tool_name}.yml"
 
-        if not schemas:
-            return
+        tags = tags or []
+        tool = Tool(name=tool_name, path=tool_path, code=tool_code, tags=tags)
+        if schemas:
+            self._set_schemas(tool, schemas)
+        else:
+            self._sources[tool_name] = (tool_source_object, include_functions, schema_path, verbose)
+        self.tools[tool_name] = tool
+        for tag in tags:
+            self.tools_by_tags[tag].update({tool_name: tool})
+        if verbose:
+            logger.info(f"{tool_name} registered")
 
-        schemas["tool_path"] = tool_path  # corresponding code file path of the tool
+    def _set_schemas(self, tool: Tool, schemas: dict):
+        schemas["tool_path"] = tool.path  # corresponding code file path of the tool
         try:
             ToolSchema(**schemas)  # validation
         except Exception:
             pass
             # logger.warning(
-            #     f"{tool_name} schema not conforms to required format, but will be used anyway. Mismatch: {e}"
+            #     f"{tool.name} schema not conforms to required format, but will be used anyway. Mismatch: {e}"
             # )
-        tags = tags or []
-        tool = Tool(name=tool_name, path=tool_path, schemas=schemas, code=tool_code, tags=tags)
-        self.tools[tool_name] = tool
-        for tag in tags:
-            self.tools_by_tags[tag].update({tool_name: tool})
-        if verbose:
-            logger.info(f"{tool_name} registered")
-            logger.info(f"schema made at {str(schema_path)}, can be used for checking")
+        tool.schemas = schemas
+        self._schema_strings.pop(tool.name, None)
+
+    def _make_schemas(self, tool_names):
+        """Make the code and schemas of the tools registered without them, drop the tools whose schemas fail.
+
+        Schemas are cached by a hash of the source they are made from, in memory and in `schema_cache_path`, so a
+        tool whose source is unchanged is not inspected again, in this process or the next ones. With `verbose`, the
+        schemas are always made and written to their YAML `schema_path` for checking.
+        """
+        sources = self._sources
+        for tool_name in [i for i in tool_names if i in sources]:
+            tool_source_object, include_functions, schema_path, verbose = sources.pop(tool_name)
+            tool = self.tools[tool_name]
+            key = get_schema_key(tool_source_object, include_functions)
+            entry = None if verbose else self._load_schema(key)
+            if entry is None:
+                schemas = make_schema(tool_source_object, include_functions, schema_path if verbose else None)
+                if not schemas:
+                    self.tools.pop(tool_name)
+                    for tag in tool.tags:
+                        self.tools_by_tags[tag].pop(tool_name, None)
+                    continue
+                entry = {"schemas": schemas, "code": inspect.getsource(tool_source_object)}
+                self._save_schema(key, entry)
+                if verbose:
+                    logger.info(f"schema made at {str(schema_path)}, can be used for checking")
+            tool.code = tool.code or entry["code"]
+            self._set_schemas(tool, copy.deepcopy(entry["schemas"]))
+
+    def _load_schema(self, key: Optional[str]) -> Optional[dict]:
+        if not key:
+            return None
+        if key not in self._schema_cache and self.schema_cache_path:
+            filename = self.schema_cache_path / f"{key}.json"
+            try:
+                self._schema_cache[key] = json.loads(filename.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning(f"Invalid tool schema cache {filename}: {e}")
+        return self._schema_cache.get(key)
+
+    def _save_schema(self, key: Optional[str], entry: dict):
+        """Keep the schemas in memory and write them once to the cache, a cache file is never changed afterwards"""
+        if not key:
+            return
+        self._schema_cache[key] = entry
+        if not self.schema_cache_path:
+            return
+        filename = self.schema_cache_path / f"{key}.json"
+        if filename.exists():
+            return
+        try:
+            filename.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_filename = tempfile.mkstemp(dir=filename.parent, prefix=f".{key}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as writer:
+                    json.dump(entry, writer, ensure_ascii=False)
+                os.replace(tmp_filename, filename)
+            except BaseException:
+                Path(tmp_filename).unlink(missing_ok=True)
+                raise
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug(f"Failed to cache the tool schema at {filename}: {e}")
+
+    def _load_libs(self):
+        """Import the tool libraries, which registers the builtin tools"""
+        if not self._libs_loaded:
+            self._libs_loaded = True
+            importlib.import_module("metagpt.tools.libs")
 
     def has_tool(self, key: str) -> Tool:
-        return key in self.tools
+        return self.get_tool(key) is not None
 
     def get_tool(self, key) -> Tool:
+        self._load_libs()
+        self._make_schemas([key])
         return self.tools.get(key)
 
     def get_tools_by_tag(self, key) -> dict[str, Tool]:
+        self._load_libs()
+        self._make_schemas(list(self.tools_by_tags.get(key, {})))
         return self.tools_by_tags.get(key, {})
 
     def get_all_tools(self) -> dict[str, Tool]:
+        self._load_libs()
+        self._make_schemas(list(self.tools))
         return self.tools
 
     def has_tool_tag(self, key) -> bool:
+        self._load_libs()
         return key in self.tools_by_tags
 
     def get_tool_tags(self) -> list[str]:
+        self._load_libs()
         return list(self.tools_by_tags.keys())
 
+    def get_schema_strings(self, tool_names: list[str]) -> dict[str, str]:
+        """Get the schemas of tools serialized for prompts, by tool name, unknown tools are skipped.
+
+        The strings are serialized once per tool and reused until its schemas change.
+        """
+        self._load_libs()
+        self._make_schemas(tool_names)
+        cache = self._schema_strings
+        schema_strings = {}
+        for tool_name in tool_names:
+            tool = self.tools.get(tool_name)
+            if tool is None:
+                continue
+            if tool_name not in cache:
+                cache[tool_name] = str(tool.schemas)
+            schema_strings[tool_name] = cache[tool_name]
+        return schema_strings
+
 
 # Registry instance
 TOOL_REGISTRY = ToolRegistry()
@@ -100,13 +215,12 @@ def register_tool(tags: list[str] = None, schema_path: str = "", **kwargs):
         if "metagpt" in file_path:
             # split to handle ../metagpt/metagpt/tools/... where only metapgt/tools/... is needed
             file_path = "metagpt" + file_path.split("metagpt")[-1]
-        source_code = inspect.getsource(cls)
 
+        # the source code and the schemas are read on first access of the tool, not on import
         TOOL_REGISTRY.register_tool(
             tool_name=cls.__name__,
             tool_path=file_path,
             schema_path=schema_path,
-            tool_code=source_code,
             tags=tags,
             tool_source_object=cls,
             **kwargs,
@@ -116,12 +230,14 @@ def register_tool(tags: list[str] = None, schema_path: str = "", **kwargs):
     return decorator
 
 
-def make_schema(tool_source_object, include, path):
-    os.makedirs(os.path.dirname(path), exist_ok=True)  # Create the necessary directories
+def make_schema(tool_source_object, include, path=None):
+    """Make the schemas of a class or function, and write them to the YAML file `path` if given"""
     try:
         schema = convert_code_to_tool_schema(tool_source_object, include=include)
-        with open(path, "w", encoding="utf-8") as f:
-            yaml.dump(schema, f, sort_keys=False)
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)  # Create the necessary directories
+            with open(path, "w", encoding="utf-8") as f:
+                yaml.dump(schema, f, sort_keys=False)
     except Exception as e:
         schema = {}
         logger.error(f"Fail to make schema: {e}")
@@ -129,6 +245,31 @@ def make_schema(tool_source_object, include, path):
     return schema
 
 
+def get_schema_key(tool_source_object, include: list[str] = None) -> Optional[str]:
+    """Hash everything the schemas of a tool are made from: the files defining it and the classes it inherits from,
+    the included functions, and the code converting them. None if the source of the tool can not be found."""
+    source_files = [_get_source_file(i) for i in getattr(tool_source_object, "__mro__", [tool_source_object])]
+    if not source_files[0]:
+        return None
+    source_files += [_get_source_file(tool_convert), _get_source_file(parse_docstring)]
+    name = f"{tool_source_object.__module__}.{tool_source_object.__qualname__}"
+    data = json.dumps([name, include, [_hash_file(i) for i in source_files if i]])
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _get_source_file(obj) -> Optional[str]:
+    try:
+        filename = inspect.getsourcefile(obj)
+    except TypeError:  # builtin
+        return None
+    return filename if filename and os.path.exists(filename) else None
+
+
+@functools.lru_cache(maxsize=None)
+def _hash_file(filename: str) -> str:
+    return hashlib.sha256(Path(filename).read_bytes()).hexdigest()
+
+
 def validate_tool_names(tools: list[str]) -> dict[str, Tool]:
     assert isinstance(tools, list), "tools must be a list of str"
     valid_tools = {}
@@ -6,14 +6,19 @@
 @File    : __init__.py
 """
 
-from metagpt.utils.read_document import read_docx
-from metagpt.utils.singleton import Singleton
-from metagpt.utils.token_counter import (
-    TOKEN_COSTS,
-    count_input_tokens,
-    count_output_tokens,
-)
+from metagpt.utils.lazy_import import lazy_attributes
 
+__getattr__, __dir__ = lazy_attributes(
+    __name__,
+    {
+        "read_docx": "metagpt.utils.read_document",
+        "Singleton": "metagpt.utils.singleton",
+        "TOKEN_COSTS": "metagpt.utils.token_counter",
+        "count_input_tokens": "metagpt.utils.token_counter",
+        "count_output_tokens": "metagpt.utils.token_counter",
+        "count_tokens_batch": "metagpt.utils.token_counter",
+    },
+)
 
 __all__ = [
     "read_docx",
@@ -21,4 +26,5 @@ __all__ = [
     "TOKEN_COSTS",
     "count_input_tokens",
     "count_output_tokens",
+    "count_tokens_batch",
 ]
@@ -8,97 +8,240 @@
 """
 from __future__ import annotations
 
+import asyncio
+import atexit
 import json
+import os
 import re
+import sqlite3
+import tempfile
+import weakref
+from collections import defaultdict
+from contextlib import closing
 from pathlib import Path
-from typing import Set
+from typing import Dict, List, Set
 
-from metagpt.utils.common import aread, awrite
+from metagpt.utils.common import aread
 from metagpt.utils.exceptions import handle_exception
 
+JSON_BACKEND = "json"
+SQLITE_BACKEND = "sqlite"
+
+# Dependency files with pending changes are flushed when the process exits
+_instances = weakref.WeakSet()
+
 
 class DependencyFile:
     """A class representing a DependencyFile for managing dependencies.
 
+    Dependencies are kept in memory, together with an inverted index of the files depending on each file, and changes
+    are written behind: they are persisted once `flush_count` of them are pending, `flush_interval` seconds after the
+    first pending one, on `flush()`, or at exit. The file is reloaded only if it was changed by someone else.
+
     :param workdir: The working directory path for the DependencyFile.
+    :param flush_count: The number of pending changes which triggers a flush.
+    :param flush_interval: The maximum delay in seconds of a pending change.
+    :param backend: `json` rewrites `.dependencies.json` atomically, `sqlite` only writes the changed entries of
+        `.dependencies.db`.
     """
 
-    def __init__(self, workdir: Path | str):
+    def __init__(
+        self, workdir: Path | str, flush_count: int = 100, flush_interval: float = 1.0, backend: str = JSON_BACKEND
+    ):
         """Initialize a DependencyFile instance.
 
         :param workdir: The working directory path for the DependencyFile.
         """
-        self._dependencies = {}
-        self._filename = Path(workdir) / ".dependencies.json"
+        if backend not in (JSON_BACKEND, SQLITE_BACKEND):
+            raise ValueError(f"Unsupported dependency file backend: {backend}")
+        self._backend = backend
+        self._dependencies: Dict[str, List[str]] = {}
+        self._dependents: Dict[str, Set[str]] = defaultdict(set)
+        self._pending: Set[str] = set()  # keys changed since the last flush
+        self._flush_count = flush_count
+        self._flush_interval = flush_interval
+        self._flush_handle = None
+        self._loaded = False
+        self._loaded_mtime = None  # mtime of the file when it was last loaded or written
+        suffix = ".db" if backend == SQLITE_BACKEND else ".json"
+        self._filename = Path(workdir) / f".dependencies{suffix}"
+        _instances.add(self)
 
     async def load(self):
-        """Load dependencies from the file asynchronously."""
-        if not self._filename.exists():
-            return
-        json_data = await aread(self._filename)
-        json_data = re.sub(r"\\+", "/", json_data)  # Compatible with windows path
-        self._dependencies = json.loads(json_data)
+        """Load dependencies from the file asynchronously, discarding the changes not flushed yet."""
+        self._cancel_flush()
+        self._pending.clear()
+        if self._backend == SQLITE_BACKEND:
+            self._dependencies = self._read_sqlite()
+        elif self._filename.exists():
+            json_data = await aread(self._filename)
+            json_data = re.sub(r"\\+", "/", json_data)  # Compatible with windows path
+            self._dependencies = json.loads(json_data)
+        else:
+            self._dependencies = {}
+        self._dependents = defaultdict(set)
+        for key, dependencies in self._dependencies.items():
+            for i in dependencies:
+                self._dependents[i].add(key)
+        self._loaded = True
+        self._loaded_mtime = self._mtime()
 
     @handle_exception
     async def save(self):
-        """Save dependencies to the file asynchronously."""
-        data = json.dumps(self._dependencies)
-        await awrite(filename=self._filename, data=data)
+        """Save all dependencies to the file asynchronously."""
+        self._flush(full=True)
+
+    def flush(self):
+        """Persist the pending changes now."""
+        if self._pending:
+            self._flush()
 
     async def update(self, filename: Path | str, dependencies: Set[Path | str], persist=True):
         """Update dependencies for a file asynchronously.
 
         :param filename: The filename or path.
         :param dependencies: The set of dependencies.
-        :param persist: Whether to persist the changes immediately.
+        :param persist: Whether to persist the changes, they are written behind.
         """
         if persist:
-            await self.load()
+            await self._ensure_loaded()
 
-        root = self._filename.parent
-        try:
-            key = Path(filename).relative_to(root).as_posix()
-        except ValueError:
-            key = filename
-        key = str(key)
+        key = self._key(filename)
+        for i in self._dependencies.pop(key, []):
+            self._dependents[i].discard(key)
         if dependencies:
-            relative_paths = []
-            for i in dependencies:
-                try:
-                    s = str(Path(i).relative_to(root).as_posix())
-                except ValueError:
-                    s = str(i)
-                relative_paths.append(s)
-
+            relative_paths = [self._key(i) for i in dependencies]
             self._dependencies[key] = relative_paths
-        elif key in self._dependencies:
-            del self._dependencies[key]
+            for i in relative_paths:
+                self._dependents[i].add(key)
+        self._pending.add(key)
 
         if persist:
-            await self.save()
+            self._schedule_flush()
 
     async def get(self, filename: Path | str, persist=True):
         """Get dependencies for a file asynchronously.
 
         :param filename: The filename or path.
-        :param persist: Whether to load dependencies from the file immediately.
+        :param persist: Whether to load dependencies from the file if it was changed.
         :return: A set of dependencies.
         """
         if persist:
-            await self.load()
+            await self._ensure_loaded()
+        return set(self._dependencies.get(self._key(filename), {}))
 
-        root = self._filename.parent
-        try:
-            key = Path(filename).relative_to(root).as_posix()
-        except ValueError:
-            key = Path(filename).as_posix()
-        return set(self._dependencies.get(str(key), {}))
+    async def get_dependents(self, filename: Path | str, persist=True) -> Set[str]:
+        """Get the files depending on a file asynchronously.
+
+        :param filename: The filename or path.
+        :param persist: Whether to load dependencies from the file if it was changed.
+        :return: A set of dependent files.
+        """
+        if persist:
+            await self._ensure_loaded()
+        return set(self._dependents.get(self._key(filename), set()))
 
     def delete_file(self):
         """Delete the dependency file."""
+        self._cancel_flush()
+        self._pending.clear()
         self._filename.unlink(missing_ok=True)
+        self._dependencies = {}
+        self._dependents = defaultdict(set)
+        self._loaded = False
 
     @property
     def exists(self):
         """Check if the dependency file exists."""
         return self._filename.exists()
+
+    def _key(self, filename: Path | str) -> str:
+        try:
+            key = Path(filename).relative_to(self._filename.parent)
+        except ValueError:
+            key = Path(filename)
+        return key.as_posix()
+
+    def _mtime(self):
+        try:
+            return self._filename.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    async def _ensure_loaded(self):
+        """Load the file on first use, and again if someone else changed it while nothing is pending."""
+        if not self._loaded or (not self._pending and self._mtime() != self._loaded_mtime):
+            await self.load()
+
+    def _schedule_flush(self):
+        if len(self._pending) >= self._flush_count:
+            self._flush()
+            return
+        if self._flush_handle:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush()
+            return
+        self._flush_handle = loop.call_later(self._flush_interval, self._flush)
+
+    def _cancel_flush(self):
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    @handle_exception
+    def _flush(self, full: bool = False):
+        self._cancel_flush()
+        if self._backend == SQLITE_BACKEND:
+            self._write_sqlite(full=full)
+        else:
+            self._write_json()
+        self._pending.clear()
+        self._loaded = True
+        self._loaded_mtime = self._mtime()
+
+    def _write_json(self):
+        """Replace the file atomically, readers never see a partially written file."""
+        data = json.dumps(self._dependencies)
+        fd, tmp_filename = tempfile.mkstemp(dir=self._filename.parent, prefix=".dependencies.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as writer:
+                writer.write(data)
+            os.replace(tmp_filename, self._filename)
+        except BaseException:
+            Path(tmp_filename).unlink(missing_ok=True)
+            raise
+
+    def _read_sqlite(self) -> Dict[str, List[str]]:
+        if not self._filename.exists():
+            return {}
+        with closing(sqlite3.connect(self._filename)) as conn:
+            self._create_table(conn)
+            rows = conn.execute("SELECT filename, dependencies FROM dependencies").fetchall()
+        return {filename: json.loads(dependencies) for filename, dependencies in rows}
+
+    def _write_sqlite(self, full: bool = False):
+        keys = set(self._dependencies.keys()) if full else self._pending
+        with closing(sqlite3.connect(self._filename)) as conn, conn:
+            self._create_table(conn)
+            if full:
+                conn.execute("DELETE FROM dependencies")
+            conn.executemany(
+                "INSERT OR REPLACE INTO dependencies (filename, dependencies) VALUES (?, ?)",
+                [(i, json.dumps(self._dependencies[i])) for i in keys if i in self._dependencies],
+            )
+            conn.executemany(
+                "DELETE FROM dependencies WHERE filename = ?", [(i,) for i in keys if i not in self._dependencies]
+            )
+
+    @staticmethod
+    def _create_table(conn: sqlite3.Connection):
+        conn.execute("CREATE TABLE IF NOT EXISTS dependencies (filename TEXT PRIMARY KEY, dependencies TEXT NOT NULL)")
+
+
+@atexit.register
+def _flush_all():
+    for dependency_file in list(_instances):
+        dependency_file.flush()
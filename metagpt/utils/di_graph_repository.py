@@ -11,21 +11,37 @@
 from __future__ import annotations
 
 import json
+import os
+from collections import defaultdict
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
+import aiofiles
 import networkx
 
-from metagpt.utils.common import aread, awrite
+from metagpt.utils.common import aread
 from metagpt.utils.graph_repository import SPO, GraphRepository
 
+JOURNAL_SUFFIX = ".journal"
+COMPACT_MIN_CHANGES = 1000
+
 
 class DiGraphRepository(GraphRepository):
-    """Graph repository based on DiGraph."""
+    """Graph repository based on DiGraph.
+
+    The graph holds at most one edge from a subject to an object. Subjects and objects are indexed by the adjacency of
+    the DiGraph and predicates by `_predicates`, so selects only visit the edges of the most selective criterion.
+    Changes are journaled: `save` appends them to the JSON lines `.journal` file next to the `.json` file, and
+    compacts both into the `.json` file once the journal outgrows the graph.
+    """
 
     def __init__(self, name: str | Path, **kwargs):
         super().__init__(name=str(name), **kwargs)
         self._repo = networkx.DiGraph()
+        self._predicates: Dict[str, Dict[Tuple[str, str], None]] = defaultdict(dict)  # ordered set of edges
+        self._journal: List[list] = []  # changes not saved yet
+        self._journal_size = 0  # number of changes in the `.journal` file
+        self._saved_pathname: Optional[Path] = None  # the `.json` file the `.journal` file applies to
 
     async def insert(self, subject: str, predicate: str, object_: str):
         """Insert a new triple into the directed graph repository.
@@ -39,7 +55,16 @@ class DiGraphRepository(GraphRepository):
             await my_di_graph_repo.insert(subject="Node1", predicate="connects_to", object_="Node2")
             # Adds a directed relationship: Node1 connects_to Node2
         """
-        self._repo.add_edge(subject, object_, predicate=predicate)
+        self._add_edge(subject, predicate, object_)
+
+    async def insert_many(self, rows: List[SPO]):
+        """Insert triples into the directed graph repository in bulk.
+
+        Args:
+            rows (List[SPO]): The triples to insert.
+        """
+        for r in rows:
+            self._add_edge(r.subject, r.predicate, r.object_)
 
     async def select(self, subject: str = None, predicate: str = None, object_: str = None) -> List[SPO]:
         """Retrieve triples from the directed graph repository based on specified criteria.
@@ -56,16 +81,10 @@ class DiGraphRepository(GraphRepository):
             selected_triples = await my_di_graph_repo.select(subject="Node1", predicate="connects_to")
             # Retrieves directed relationships where Node1 is the subject and the predicate is 'connects_to'.
         """
-        result = []
-        for s, o, p in self._repo.edges(data="predicate"):
-            if subject and subject != s:
-                continue
-            if predicate and predicate != p:
-                continue
-            if object_ and object_ != o:
-                continue
-            result.append(SPO(subject=s, predicate=p, object_=o))
-        return result
+        return [
+            SPO(subject=s, predicate=p, object_=o)
+            for s, o, p in self._match(subject=subject, predicate=predicate, object_=object_)
+        ]
 
     async def delete(self, subject: str = None, predicate: str = None, object_: str = None) -> int:
         """Delete triples from the directed graph repository based on specified criteria.
@@ -82,13 +101,62 @@ class DiGraphRepository(GraphRepository):
             deleted_count = await my_di_graph_repo.delete(subject="Node1", predicate="connects_to")
             # Deletes directed relationships where Node1 is the subject and the predicate is 'connects_to'.
         """
-        rows = await self.select(subject=subject, predicate=predicate, object_=object_)
-        if not rows:
-            return 0
-        for r in rows:
-            self._repo.remove_edge(r.subject, r.object_)
+        rows = self._match(subject=subject, predicate=predicate, object_=object_)
+        for s, o, _ in rows:
+            self._remove_edge(s, o)
         return len(rows)
 
+    def _match(self, subject: str = None, predicate: str = None, object_: str = None) -> List[Tuple[str, str, str]]:
+        """Return the (subject, object, predicate) edges matching the criteria, looked up by the smallest index."""
+        if subject and object_:
+            data = self._repo.get_edge_data(subject, object_)
+            if data is None or (predicate and data.get("predicate") != predicate):
+                return []
+            return [(subject, object_, data.get("predicate"))]
+
+        candidates = []
+        if subject:
+            succ = self._repo.succ[subject] if subject in self._repo else {}
+            candidates.append((len(succ), lambda: ((subject, o, d.get("predicate")) for o, d in succ.items())))
+        if object_:
+            pred = self._repo.pred[object_] if object_ in self._repo else {}
+            candidates.append((len(pred), lambda: ((s, object_, d.get("predicate")) for s, d in pred.items())))
+        if predicate:
+            keys = self._predicates.get(predicate, {})
+            candidates.append((len(keys), lambda: ((s, o, predicate) for s, o in keys)))
+        if not candidates:
+            return list(self._repo.edges(data="predicate"))
+
+        _, edges = min(candidates, key=lambda i: i[0])
+        return [
+            (s, o, p)
+            for s, o, p in edges()
+            if (not subject or subject == s) and (not predicate or predicate == p) and (not object_ or object_ == o)
+        ]
+
+    def _add_edge(self, subject: str, predicate: str, object_: str, journal: bool = True):
+        self._unindex(subject, object_)
+        self._repo.add_edge(subject, object_, predicate=predicate)
+        self._predicates[predicate][(subject, object_)] = None
+        if journal:
+            self._journal.append(["+", subject, predicate, object_])
+
+    def _remove_edge(self, subject: str, object_: str, journal: bool = True):
+        self._unindex(subject, object_)
+        self._repo.remove_edge(subject, object_)
+        if journal:
+            self._journal.append(["-", subject, object_])
+
+    def _unindex(self, subject: str, object_: str):
+        data = self._repo.get_edge_data(subject, object_)
+        if data is None:
+            return
+        predicate = data.get("predicate")
+        edges = self._predicates.get(predicate, {})
+        edges.pop((subject, object_), None)
+        if not edges:
+            self._predicates.pop(predicate, None)
+
     def json(self) -> str:
         """Convert the directed graph repository to a JSON-formatted string."""
         m = networkx.node_link_data(self._repo)
@@ -98,21 +166,65 @@ class DiGraphRepository(GraphRepository):
     async def save(self, path: str | Path = None):
         """Save the directed graph repository to a JSON file.
 
+        The changes since the last save are appended to the `.journal` file if the JSON file was loaded from or saved
+        to the same place, otherwise, or if the journal outgrows the graph, the whole graph is written to the JSON file.
+
         Args:
             path (Union[str, Path], optional): The directory path where the JSON file will be saved.
                 If not provided, the default path is taken from the 'root' key in the keyword arguments.
         """
-        data = self.json()
-        path = path or self._kwargs.get("root")
+        path = Path(path or self._kwargs.get("root"))
         if not path.exists():
             path.mkdir(parents=True, exist_ok=True)
-        pathname = Path(path) / self.name
-        await awrite(filename=pathname.with_suffix(".json"), data=data, encoding="utf-8")
+        pathname = (path / self.name).with_suffix(".json")
+        journal_size = self._journal_size + len(self._journal)
+        if (
+            pathname == self._saved_pathname
+            and pathname.exists()
+            and journal_size <= max(COMPACT_MIN_CHANGES, sum(len(i) for i in self._predicates.values()))
+        ):
+            if self._journal:
+                data = "".join(json.dumps(i) + "\n" for i in self._journal)
+                async with aiofiles.open(
+                    str(pathname.with_suffix(JOURNAL_SUFFIX)), mode="a", encoding="utf-8"
+                ) as writer:
+                    await writer.write(data)
+            self._journal_size = journal_size
+        else:
+            await self._compact(pathname)
+            self._journal_size = 0
+        self._journal = []
+        self._saved_pathname = pathname
+
+    async def _compact(self, pathname: Path):
+        """Replace the JSON file atomically with the whole graph and drop the journal applying to the old one."""
+        tmp_pathname = pathname.with_name(f".{pathname.name}.tmp")
+        async with aiofiles.open(str(tmp_pathname), mode="w", encoding="utf-8") as writer:
+            await writer.write(self.json())
+        os.replace(tmp_pathname, pathname)
+        pathname.with_suffix(JOURNAL_SUFFIX).unlink(missing_ok=True)
 
     async def load(self, pathname: str | Path):
-        """Load a directed graph repository from a JSON file."""
+        """Load a directed graph repository from a JSON file and replay the changes of its `.journal` file."""
+        pathname = Path(pathname)
         data = await aread(filename=pathname, encoding="utf-8")
         self.load_json(data)
+        journal_pathname = pathname.with_suffix(JOURNAL_SUFFIX)
+        if journal_pathname.exists():
+            journal = await aread(filename=journal_pathname, encoding="utf-8")
+            for line in journal.splitlines():
+                if not line:
+                    continue
+                try:
+                    change = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # torn write at the end of the journal
+                if change[0] == "+":
+                    self._add_edge(*change[1:], journal=False)
+                elif self._repo.has_edge(*change[1:]):
+                    self._remove_edge(*change[1:], journal=False)
+                self._journal_size += 1
+        self._saved_pathname = pathname
 
     def load_json(self, val: str):
         """
@@ -133,6 +245,12 @@ class DiGraphRepository(GraphRepository):
             return self
         m = json.loads(val)
         self._repo = networkx.node_link_graph(m)
+        self._predicates = defaultdict(dict)
+        for s, o, p in self._repo.edges(data="predicate"):
+            self._predicates[p][(s, o)] = None
+        self._journal = []
+        self._journal_size = 0
+        self._saved_pathname = None
         return self
 
     @staticmethod
@@ -54,6 +54,7 @@ class FileRepository:
         pathname.parent.mkdir(parents=True, exist_ok=True)
         content = content if content else ""  # avoid `argument must be str, not None` to make it continue
         await awrite(filename=str(pathname), data=content)
+        self._git_repo.invalidate_status()
         logger.info(f"save to: {str(pathname)}")
 
         if dependencies is not None:
@@ -231,6 +232,7 @@ class FileRepository:
         if not pathname.exists():
             return
         pathname.unlink(missing_ok=True)
+        self._git_repo.invalidate_status()
 
         dependency_file = await self._git_repo.get_dependency()
         await dependency_file.update(filename=pathname, dependencies=None)
@@ -8,14 +8,17 @@
 """
 from __future__ import annotations
 
+import os
+import re
 import shutil
+import time
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 from git.repo import Repo
 from git.repo.fun import is_git_dir
-from gitignore_parser import parse_gitignore
+from gitignore_parser import rule_from_pattern
 
 from metagpt.logs import logger
 from metagpt.utils.dependency_file import DependencyFile
@@ -32,6 +35,40 @@ class ChangeType(Enum):
     UNTRACTED = "U"  # File is untracked (not added to version control)
 
 
+class GitignoreMatcher:
+    """The rules of a .gitignore file, compiled once and matched against paths in its directory.
+
+    :param full_path: The path of the .gitignore file, which may not exist.
+    """
+
+    def __init__(self, full_path: Path | str):
+        self._base_dir = Path(os.path.abspath(Path(full_path).parent))
+        self._prefix = os.path.join(str(self._base_dir), "")
+        self._rules = []
+        if not Path(full_path).exists():
+            return
+        base_path = self._base_dir.resolve()
+        with open(full_path) as reader:
+            for line in reader:
+                rule = rule_from_pattern(line.rstrip("\n"), base_path=base_path)
+                if rule:
+                    self._rules.append((re.compile(rule.regex), rule.negation, rule.directory_only))
+        self._rules.reverse()  # later rules override earlier ones
+
+    def __call__(self, full_path: Path | str, is_dir: bool = False) -> bool:
+        """Return True if the file, or the directory if is_dir, is ignored."""
+        full_path = str(full_path)
+        if full_path.startswith(self._prefix):
+            rel_path = full_path[len(self._prefix) :]
+        else:
+            rel_path = Path(os.path.abspath(full_path)).relative_to(self._base_dir).as_posix()
+        for regex, negation, directory_only in self._rules:
+            path = rel_path + "/" if negation and directory_only and is_dir else rel_path
+            if regex.search(path):
+                return not negation
+        return False
+
+
 class GitRepository:
     """A class representing a Git repository.
 
@@ -51,6 +88,9 @@ class GitRepository:
         self._repository = None
         self._dependency = None
         self._gitignore_rules = None
+        self._changed_files = None  # cached working tree status
+        self._changed_files_stamp = None
+        self._changed_files_time = 0  # time.time_ns() when the status was read
         if local_path:
             self.open(local_path=local_path, auto_init=auto_init)
 
@@ -61,9 +101,10 @@ class GitRepository:
         :param auto_init: If True, automatically initializes a new Git repository if the provided path is not a Git repository.
         """
         local_path = Path(local_path)
+        self.invalidate_status()
         if self.is_git_dir(local_path):
             self._repository = Repo(local_path)
-            self._gitignore_rules = parse_gitignore(full_path=str(local_path / ".gitignore"))
+            self._gitignore_rules = GitignoreMatcher(full_path=local_path / ".gitignore")
             return
         if not auto_init:
             return
@@ -83,7 +124,7 @@ class GitRepository:
             writer.write("\n".join(ignores))
         self._repository.index.add([".gitignore"])
         self._repository.index.commit("Add .gitignore")
-        self._gitignore_rules = parse_gitignore(full_path=gitignore_filename)
+        self._gitignore_rules = GitignoreMatcher(full_path=gitignore_filename)
 
     def add_change(self, files: Dict):
         """Add or remove files from the staging area based on the provided changes.
@@ -95,6 +136,7 @@ class GitRepository:
 
         for k, v in files.items():
             self._repository.index.remove(k) if v is ChangeType.DELETED else self._repository.index.add([k])
+        self.invalidate_status()
 
     def commit(self, comments):
         """Commit the staged changes with the given comments.
@@ -103,6 +145,7 @@ class GitRepository:
         """
         if self.is_valid:
             self._repository.index.commit(comments)
+            self.invalidate_status()
 
     def delete_repository(self):
         """Delete the entire repository directory."""
@@ -116,12 +159,36 @@ class GitRepository:
     def changed_files(self) -> Dict[str, str]:
         """Return a dictionary of changed files and their change types.
 
+        The status is cached until files are saved or deleted through a FileRepository, the git index or HEAD
+        changes, or a file walked by `get_files` is newer than the status. Call `invalidate_status` after changing
+        files by other means.
+
         :return: A dictionary where keys are file paths and values are change types.
         """
-        files = {i: ChangeType.UNTRACTED for i in self._repository.untracked_files}
-        changed_files = {f.a_path: ChangeType(f.change_type) for f in self._repository.index.diff(None)}
-        files.update(changed_files)
-        return files
+        stamp = self._status_stamp()
+        if self._changed_files is None or stamp != self._changed_files_stamp:
+            # File timestamps come from a coarse clock that may lag time.time_ns() by a few milliseconds
+            self._changed_files_time = time.time_ns() - 20_000_000
+            files = {i: ChangeType.UNTRACTED for i in self._repository.untracked_files}
+            changed_files = {f.a_path: ChangeType(f.change_type) for f in self._repository.index.diff(None)}
+            files.update(changed_files)
+            self._changed_files = files
+            self._changed_files_stamp = stamp
+        return dict(self._changed_files)
+
+    def invalidate_status(self):
+        """Drop the cached working tree status."""
+        self._changed_files = None
+
+    def _status_stamp(self) -> tuple:
+        git_dir = Path(self._repository.git_dir)
+        stamp = []
+        for i in ("index", "HEAD"):
+            try:
+                stamp.append((git_dir / i).stat().st_mtime_ns)
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
 
     @staticmethod
     def is_git_dir(local_path):
@@ -165,6 +232,10 @@ class GitRepository:
 
         :param comments: Comments for the archive commit.
         """
+        # Files may have been written without a FileRepository, e.g. RAG engines and caches
+        self.invalidate_status()
+        if self._dependency:
+            self._dependency.flush()
         logger.info(f"Archive: {list(self.changed_files.keys())}")
         self.add_change(self.changed_files)
         self.commit(comments)
@@ -208,6 +279,8 @@ class GitRepository:
         if new_path.exists():  # Recheck for windows os
             logger.warning(f"Failed to delete directory {str(new_path)}")
             return
+        if self._dependency:
+            self._dependency.flush()
         try:
             shutil.move(src=str(self.workdir), dst=str(new_path))
         except Exception as e:
@@ -218,7 +291,9 @@ class GitRepository:
                 return
         logger.info(f"Rename directory {str(self.workdir)} to {str(new_path)}")
         self._repository = Repo(new_path)
-        self._gitignore_rules = parse_gitignore(full_path=str(new_path / ".gitignore"))
+        self._dependency = None
+        self.invalidate_status()
+        self._gitignore_rules = GitignoreMatcher(full_path=new_path / ".gitignore")
 
     def get_files(self, relative_path: Path | str, root_relative_path: Path | str = None, filter_ignored=True) -> List:
         """
@@ -242,26 +317,46 @@ class GitRepository:
 
         if not root_relative_path:
             root_relative_path = Path(self.workdir) / relative_path
+        directory_path = Path(self.workdir) / relative_path
+        if not directory_path.exists():
+            return []
+        root_prefix = os.path.join(str(root_relative_path), "")
         files = []
         try:
-            directory_path = Path(self.workdir) / relative_path
-            if not directory_path.exists():
-                return []
-            for file_path in directory_path.iterdir():
-                if file_path.is_file():
-                    rpath = file_path.relative_to(root_relative_path)
-                    files.append(str(rpath))
+            for file_path in self._walk_files(directory_path, filter_ignored=filter_ignored):
+                if file_path.startswith(root_prefix):
+                    files.append(file_path[len(root_prefix) :])
                 else:
-                    subfolder_files = self.get_files(
-                        relative_path=file_path, root_relative_path=root_relative_path, filter_ignored=False
-                    )
-                    files.extend(subfolder_files)
+                    files.append(str(Path(file_path).relative_to(root_relative_path)))
         except Exception as e:
             logger.error(f"Error: {e}")
-        if not filter_ignored:
-            return files
-        filtered_files = self.filter_gitignore(filenames=files, root_relative_path=root_relative_path)
-        return filtered_files
+        return files
+
+    def _walk_files(self, directory_path: Path, filter_ignored=True) -> Iterator[str]:
+        """Yield the paths of the files under a directory, skipping ignored directories without entering them.
+
+        A file or directory modified after the cached status was read invalidates it.
+        """
+        rules = self._gitignore_rules if filter_ignored else None
+        stack = [str(directory_path)]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    is_dir = entry.is_dir()
+                    if rules and rules(entry.path, is_dir=is_dir):
+                        continue
+                    if self._changed_files is not None and self._is_newer_than_status(entry):
+                        self.invalidate_status()
+                    if is_dir:
+                        stack.append(entry.path)
+                    else:
+                        yield entry.path
+
+    def _is_newer_than_status(self, entry: os.DirEntry) -> bool:
+        try:
+            return entry.stat().st_mtime_ns >= self._changed_files_time
+        except FileNotFoundError:
+            return True
 
     def filter_gitignore(self, filenames: List[str], root_relative_path: Path | str = None) -> List[str]:
         """
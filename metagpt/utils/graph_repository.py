@@ -101,6 +101,21 @@ class GraphRepository(ABC):
         """
         pass
 
+    async def insert_many(self, rows: List[SPO]):
+        """Insert triples into the graph repository in bulk.
+
+        Implementations are expected to override it with a cheaper bulk operation, the default one inserts the triples
+        one by one.
+
+        Args:
+            rows (List[SPO]): The triples to insert.
+
+        Example:
+            await my_repository.insert_many([SPO(subject="Node1", predicate="connects_to", object_="Node2")])
+        """
+        for r in rows:
+            await self.insert(subject=r.subject, predicate=r.predicate, object_=r.object_)
+
     @abstractmethod
     async def select(self, subject: str = None, predicate: str = None, object_: str = None) -> List[SPO]:
         """Retrieve triples from the graph repository based on specified criteria.
@@ -178,64 +193,88 @@ class GraphRepository(ABC):
             await update_graph_db_with_file_info(my_graph_repo, my_file_info)
             # Updates 'my_graph_repo' with information from 'my_file_info'.
         """
-        await graph_db.insert(subject=file_info.file, predicate=GraphKeyword.IS, object_=GraphKeyword.SOURCE_CODE)
+        rows = []
+        rows.append(SPO(subject=file_info.file, predicate=GraphKeyword.IS, object_=GraphKeyword.SOURCE_CODE))
         file_types = {".py": "python", ".js": "javascript"}
         file_type = file_types.get(Path(file_info.file).suffix, GraphKeyword.NULL)
-        await graph_db.insert(subject=file_info.file, predicate=GraphKeyword.IS, object_=file_type)
+        rows.append(SPO(subject=file_info.file, predicate=GraphKeyword.IS, object_=file_type))
         for c in file_info.classes:
             class_name = c.get("name", "")
             # file -> class
-            await graph_db.insert(
-                subject=file_info.file,
-                predicate=GraphKeyword.HAS_CLASS,
-                object_=concat_namespace(file_info.file, class_name),
+            rows.append(
+                SPO(
+                    subject=file_info.file,
+                    predicate=GraphKeyword.HAS_CLASS,
+                    object_=concat_namespace(file_info.file, class_name),
+                )
             )
             # class detail
-            await graph_db.insert(
-                subject=concat_namespace(file_info.file, class_name),
-                predicate=GraphKeyword.IS,
-                object_=GraphKeyword.CLASS,
+            rows.append(
+                SPO(
+                    subject=concat_namespace(file_info.file, class_name),
+                    predicate=GraphKeyword.IS,
+                    object_=GraphKeyword.CLASS,
+                )
             )
             methods = c.get("methods", [])
             for fn in methods:
-                await graph_db.insert(
-                    subject=concat_namespace(file_info.file, class_name),
-                    predicate=GraphKeyword.HAS_CLASS_METHOD,
-                    object_=concat_namespace(file_info.file, class_name, fn),
+                rows.append(
+                    SPO(
+                        subject=concat_namespace(file_info.file, class_name),
+                        predicate=GraphKeyword.HAS_CLASS_METHOD,
+                        object_=concat_namespace(file_info.file, class_name, fn),
+                    )
                 )
-                await graph_db.insert(
-                    subject=concat_namespace(file_info.file, class_name, fn),
-                    predicate=GraphKeyword.IS,
-                    object_=GraphKeyword.CLASS_METHOD,
+                rows.append(
+                    SPO(
+                        subject=concat_namespace(file_info.file, class_name, fn),
+                        predicate=GraphKeyword.IS,
+                        object_=GraphKeyword.CLASS_METHOD,
+                    )
                 )
         for f in file_info.functions:
             # file -> function
-            await graph_db.insert(
-                subject=file_info.file, predicate=GraphKeyword.HAS_FUNCTION, object_=concat_namespace(file_info.file, f)
+            rows.append(
+                SPO(
+                    subject=file_info.file,
+                    predicate=GraphKeyword.HAS_FUNCTION,
+                    object_=concat_namespace(file_info.file, f),
+                )
             )
             # function detail
-            await graph_db.insert(
-                subject=concat_namespace(file_info.file, f), predicate=GraphKeyword.IS, object_=GraphKeyword.FUNCTION
+            rows.append(
+                SPO(
+                    subject=concat_namespace(file_info.file, f),
+                    predicate=GraphKeyword.IS,
+                    object_=GraphKeyword.FUNCTION,
+                )
             )
         for g in file_info.globals:
-            await graph_db.insert(
-                subject=concat_namespace(file_info.file, g),
-                predicate=GraphKeyword.IS,
-                object_=GraphKeyword.GLOBAL_VARIABLE,
+            rows.append(
+                SPO(
+                    subject=concat_namespace(file_info.file, g),
+                    predicate=GraphKeyword.IS,
+                    object_=GraphKeyword.GLOBAL_VARIABLE,
+                )
             )
         for code_block in file_info.page_info:
             if code_block.tokens:
-                await graph_db.insert(
-                    subject=concat_namespace(file_info.file, *code_block.tokens),
-                    predicate=GraphKeyword.HAS_PAGE_INFO,
-                    object_=code_block.model_dump_json(),
+                rows.append(
+                    SPO(
+                        subject=concat_namespace(file_info.file, *code_block.tokens),
+                        predicate=GraphKeyword.HAS_PAGE_INFO,
+                        object_=code_block.model_dump_json(),
+                    )
                 )
             for k, v in code_block.properties.items():
-                await graph_db.insert(
-                    subject=concat_namespace(file_info.file, k, v),
-                    predicate=GraphKeyword.HAS_PAGE_INFO,
-                    object_=code_block.model_dump_json(),
+                rows.append(
+                    SPO(
+                        subject=concat_namespace(file_info.file, k, v),
+                        predicate=GraphKeyword.HAS_PAGE_INFO,
+                        object_=code_block.model_dump_json(),
+                    )
                 )
+        await graph_db.insert_many(rows)
 
     @staticmethod
     async def update_graph_db_with_class_views(graph_db: "GraphRepository", class_views: List[DotClassInfo]):
@@ -266,63 +305,79 @@ class GraphRepository(ABC):
             await update_graph_db_with_class_views(my_graph_repo, [class_info1, class_info2])
             # Updates 'my_graph_repo' with class information from the provided list of DotClassInfo objects.
         """
+        rows = []
         for c in class_views:
             filename, _ = c.package.split(":", 1)
-            await graph_db.insert(subject=filename, predicate=GraphKeyword.IS, object_=GraphKeyword.SOURCE_CODE)
+            rows.append(SPO(subject=filename, predicate=GraphKeyword.IS, object_=GraphKeyword.SOURCE_CODE))
             file_types = {".py": "python", ".js": "javascript"}
             file_type = file_types.get(Path(filename).suffix, GraphKeyword.NULL)
-            await graph_db.insert(subject=filename, predicate=GraphKeyword.IS, object_=file_type)
-            await graph_db.insert(subject=filename, predicate=GraphKeyword.HAS_CLASS, object_=c.package)
-            await graph_db.insert(
-                subject=c.package,
-                predicate=GraphKeyword.IS,
-                object_=GraphKeyword.CLASS,
+            rows.append(SPO(subject=filename, predicate=GraphKeyword.IS, object_=file_type))
+            rows.append(SPO(subject=filename, predicate=GraphKeyword.HAS_CLASS, object_=c.package))
+            rows.append(
+                SPO(
+                    subject=c.package,
+                    predicate=GraphKeyword.IS,
+                    object_=GraphKeyword.CLASS,
+                )
             )
-            await graph_db.insert(subject=c.package, predicate=GraphKeyword.HAS_DETAIL, object_=c.model_dump_json())
+            rows.append(SPO(subject=c.package, predicate=GraphKeyword.HAS_DETAIL, object_=c.model_dump_json()))
             for vn, vt in c.attributes.items():
                 # class -> property
-                await graph_db.insert(
-                    subject=c.package,
-                    predicate=GraphKeyword.HAS_CLASS_PROPERTY,
-                    object_=concat_namespace(c.package, vn),
+                rows.append(
+                    SPO(
+                        subject=c.package,
+                        predicate=GraphKeyword.HAS_CLASS_PROPERTY,
+                        object_=concat_namespace(c.package, vn),
+                    )
                 )
                 # property detail
-                await graph_db.insert(
-                    subject=concat_namespace(c.package, vn),
-                    predicate=GraphKeyword.IS,
-                    object_=GraphKeyword.CLASS_PROPERTY,
+                rows.append(
+                    SPO(
+                        subject=concat_namespace(c.package, vn),
+                        predicate=GraphKeyword.IS,
+                        object_=GraphKeyword.CLASS_PROPERTY,
+                    )
                 )
-                await graph_db.insert(
-                    subject=concat_namespace(c.package, vn),
-                    predicate=GraphKeyword.HAS_DETAIL,
-                    object_=vt.model_dump_json(),
+                rows.append(
+                    SPO(
+                        subject=concat_namespace(c.package, vn),
+                        predicate=GraphKeyword.HAS_DETAIL,
+                        object_=vt.model_dump_json(),
+                    )
                 )
             for fn, ft in c.methods.items():
                 # class -> function
-                await graph_db.insert(
-                    subject=c.package,
-                    predicate=GraphKeyword.HAS_CLASS_METHOD,
-                    object_=concat_namespace(c.package, fn),
+                rows.append(
+                    SPO(
+                        subject=c.package,
+                        predicate=GraphKeyword.HAS_CLASS_METHOD,
+                        object_=concat_namespace(c.package, fn),
+                    )
                 )
                 # function detail
-                await graph_db.insert(
-                    subject=concat_namespace(c.package, fn),
-                    predicate=GraphKeyword.IS,
-                    object_=GraphKeyword.CLASS_METHOD,
+                rows.append(
+                    SPO(
+                        subject=concat_namespace(c.package, fn),
+                        predicate=GraphKeyword.IS,
+                        object_=GraphKeyword.CLASS_METHOD,
+                    )
                 )
-                await graph_db.insert(
-                    subject=concat_namespace(c.package, fn),
-                    predicate=GraphKeyword.HAS_DETAIL,
-                    object_=ft.model_dump_json(),
+                rows.append(
+                    SPO(
+                        subject=concat_namespace(c.package, fn),
+                        predicate=GraphKeyword.HAS_DETAIL,
+                        object_=ft.model_dump_json(),
+                    )
                 )
             for i in c.compositions:
-                await graph_db.insert(
-                    subject=c.package, predicate=GraphKeyword.IS_COMPOSITE_OF, object_=concat_namespace("?", i)
+                rows.append(
+                    SPO(subject=c.package, predicate=GraphKeyword.IS_COMPOSITE_OF, object_=concat_namespace("?", i))
                 )
             for i in c.aggregations:
-                await graph_db.insert(
-                    subject=c.package, predicate=GraphKeyword.IS_AGGREGATE_OF, object_=concat_namespace("?", i)
+                rows.append(
+                    SPO(subject=c.package, predicate=GraphKeyword.IS_AGGREGATE_OF, object_=concat_namespace("?", i))
                 )
+        await graph_db.insert_many(rows)
 
     @staticmethod
     async def update_graph_db_with_class_relationship_views(
@@ -348,17 +403,21 @@ class GraphRepository(ABC):
             # Updates 'my_graph_repo' with class relationship information from the provided list of DotClassRelationship objects.
 
         """
+        rows = []
         for r in relationship_views:
-            await graph_db.insert(
-                subject=r.src, predicate=GraphKeyword.IS + r.relationship + GraphKeyword.OF, object_=r.dest
+            rows.append(
+                SPO(subject=r.src, predicate=GraphKeyword.IS + r.relationship + GraphKeyword.OF, object_=r.dest)
             )
             if not r.label:
                 continue
-            await graph_db.insert(
-                subject=r.src,
-                predicate=GraphKeyword.IS + r.relationship + GraphKeyword.ON,
-                object_=concat_namespace(r.dest, r.label),
+            rows.append(
+                SPO(
+                    subject=r.src,
+                    predicate=GraphKeyword.IS + r.relationship + GraphKeyword.ON,
+                    object_=concat_namespace(r.dest, r.label),
+                )
             )
+        await graph_db.insert_many(rows)
 
     @staticmethod
     async def rebuild_composition_relationship(graph_db: "GraphRepository"):
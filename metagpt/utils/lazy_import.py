@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : lazy_import.py
+@Desc    : Module attributes imported on first access (PEP 562), so that importing a package does not import all of
+    its submodules and their heavy dependencies.
+"""
+import importlib
+import sys
+from typing import Callable
+
+
+def lazy_attributes(module_name: str, attributes: dict[str, str]) -> tuple[Callable, Callable]:
+    """Return the `__getattr__` and `__dir__` functions of a module whose attributes are imported on first access.
+
+    :param module_name: The `__name__` of the module.
+    :param attributes: The module to import each attribute from, by attribute name. An attribute named after a
+        submodule of `module_name` is the submodule itself.
+    """
+    module = sys.modules[module_name]
+
+    def __getattr__(name: str):
+        if name not in attributes:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        source = importlib.import_module(attributes[name])
+        value = source if attributes[name] == f"{module_name}.{name}" else getattr(source, name)
+        setattr(module, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(module)) | set(attributes))
+
+    return __getattr__, __dir__
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : llm_cache.py
+@Desc    : On-disk cache of LLM responses, keyed by the normalized messages, the model and the temperature.
+"""
+import functools
+import hashlib
+import json
+import sqlite3
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+
+from metagpt.configs.llm_cache_config import LLMCacheConfig, LLMCacheMode
+from metagpt.logs import log_llm_stream, logger
+
+
+class LLMCacheMissError(Exception):
+    """Raised in replay mode when a response is not in the cache"""
+
+
+class LLMResponseCache:
+    """SQLite store of LLM responses with TTL and LRU size eviction."""
+
+    def __init__(self, path: Path, ttl: int = 0, max_entries: int = 0):
+        self.path = Path(path).expanduser()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(messages: list[dict], model: str, temperature: float) -> str:
+        """Hash of the messages, whitespace around text contents is not significant"""
+        normalized = [
+            {"role": msg["role"], "content": msg["content"].strip() if isinstance(msg["content"], str) else msg["content"]}
+            for msg in messages
+        ]
+        payload = json.dumps([normalized, model, temperature], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        response, created_at = row
+        now = time.time()
+        if self.ttl and now - created_at > self.ttl:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+            return None
+        self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+        return response
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, response, now, now),
+        )
+        self._evict(now)
+        self._conn.commit()
+
+    def delete(self, key: str):
+        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._conn.commit()
+
+    def _evict(self, now: float):
+        if self.ttl:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        if self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+_CACHES: dict[Path, LLMResponseCache] = {}
+
+# The cache and key of the last response served or recorded in the current context, see `discard_cached_response`
+_last_response: ContextVar[Optional[tuple[LLMResponseCache, str]]] = ContextVar("_last_response", default=None)
+
+
+def get_response_cache(config: Optional[LLMCacheConfig]) -> Optional[LLMResponseCache]:
+    """Return the process-wide cache of the configured path, None if the cache is off"""
+    if not config or config.mode == LLMCacheMode.OFF:
+        return None
+    path = Path(config.path).expanduser()
+    if path not in _CACHES:
+        _CACHES[path] = LLMResponseCache(path, ttl=config.ttl, max_entries=config.max_entries)
+    return _CACHES[path]
+
+
+def with_response_cache(func):
+    """Decorate `acompletion_text` to serve and record responses according to `config.cache` of the LLM"""
+
+    @functools.wraps(func)
+    async def wrapper(self, messages: list[dict], stream: bool = False, **kwargs) -> str:
+        cache_config = self.config.cache if self.config else None
+        cache = get_response_cache(cache_config)
+        _last_response.set(None)
+        if not cache:
+            return await func(self, messages, stream=stream, **kwargs)
+
+        key = cache.make_key(messages, self.model or self.config.model, self.config.temperature)
+        rsp = cache.get(key)
+        if rsp is not None:
+            logger.debug(f"LLM response cache hit: {key}")
+            _last_response.set((cache, key))
+            if stream:
+                log_llm_stream(rsp)
+                log_llm_stream("\n")
+            return rsp
+        if cache_config.mode == LLMCacheMode.REPLAY:
+            raise LLMCacheMissError(f"No cached response in {cache.path} for key {key}")
+
+        rsp = await func(self, messages, stream=stream, **kwargs)
+        cache.put(key, rsp)
+        _last_response.set((cache, key))
+        return rsp
+
+    return wrapper
+
+
+def discard_cached_response():
+    """Delete from the cache the last response served or recorded in the current context, for a caller which could not
+    use it, so that its retry asks the LLM again instead of replaying the same response."""
+    last_response = _last_response.get()
+    if last_response:
+        cache, key = last_response
+        cache.delete(key)
+        _last_response.set(None)
+        logger.debug(f"LLM response discarded from the cache: {key}")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@File    : stream_parser.py
+@Desc    : Incremental parser of the `[CONTENT]` JSON object streamed by the LLM for an ActionNode.
+"""
+import json
+import re
+from typing import Any, Callable, Optional, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from metagpt.logs import logger
+
+FENCE_PATTERN = re.compile(r"\s*(`+[a-zA-Z]*\s*)?")
+
+
+class StreamParseError(ValueError):
+    """The streamed output can not be parsed into the output class, whatever the rest of the output"""
+
+
+class StreamingOutputParser:
+    """Consume the output of the LLM chunk by chunk and validate each top-level field of the JSON object following
+    `req_key` against `output_class` as soon as its value is complete.
+
+    A value of the wrong type or an object closed without its required fields raises
+    `StreamParseError` from `feed`, which cuts the generation off. Syntax the parser can not follow is left to the
+    repair of `llm_output_postprocess` on the full output.
+    """
+
+    def __init__(
+        self,
+        output_class: Type[BaseModel],
+        req_key: str = "[CONTENT]",
+        on_field: Optional[Callable[[str, Any], None]] = None,
+    ):
+        self.output_class = output_class
+        self.req_key = req_key
+        self.on_field = on_field
+        self.fields: dict[str, Any] = {}
+        self._keys = set()  # keys seen, including the ones whose value could not be decoded
+        self._buffer = ""
+        self._pos = -1  # scanning position in the buffer, -1 until the object is opened
+        self._search_from = 0  # where to look for req_key, the LLM may mention it before the content
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"  # key / colon / value / in_value
+        self._key = None
+        self._start = 0  # start of the current key or value
+        self._stopped = False
+
+    def feed(self, chunk: str):
+        self._buffer += chunk
+        if self._stopped:
+            return
+        if self._pos < 0 and not self._open():
+            return
+        self._scan()
+
+    def _open(self) -> bool:
+        while True:
+            idx = self._buffer.find(self.req_key, self._search_from)
+            if idx < 0:
+                return False
+            rest = self._buffer[idx + len(self.req_key) :]
+            remainder = rest[FENCE_PATTERN.match(rest).end() :]
+            if not remainder:
+                return False
+            if remainder[0] == "{":
+                break
+            self._search_from = idx + len(self.req_key)
+        self._pos = len(self._buffer) - len(remainder) + 1
+        self._depth = 1
+        return True
+
+    def _scan(self):
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            c = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        try:
+                            self._key = json.loads(buffer[self._start : i + 1])
+                        except json.JSONDecodeError:
+                            return self._stop()
+                        self._keys.add(self._key)
+                        self._expect = "colon"
+                continue
+            if c.isspace():
+                continue
+            if self._depth == 1 and self._expect == "key":
+                if c == '"':
+                    self._in_string = True
+                    self._start = i
+                elif c == "}":
+                    return self._close()
+                elif c != ",":
+                    return self._stop()
+                continue
+            if self._depth == 1 and self._expect == "colon":
+                if c != ":":
+                    return self._stop()
+                self._expect = "value"
+                continue
+            if self._depth == 1 and self._expect == "value":
+                self._start = i
+                self._expect = "in_value"
+            if c == '"':
+                self._in_string = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete(buffer[self._start : i])
+                    return self._close()
+            elif c == "," and self._depth == 1:
+                self._complete(buffer[self._start : i])
+                self._expect = "key"
+        self._pos = len(buffer)
+
+    def _complete(self, raw: str):
+        key = self._key
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return  # left to the repair of the full output
+        field = self.output_class.model_fields.get(key)
+        if field is None:
+            self.fields[key] = value
+            return
+        try:
+            value = TypeAdapter(field.annotation).validate_python(value)
+        except ValidationError as e:
+            raise StreamParseError(f"Invalid value of {key}: {e}")
+        self.fields[key] = value
+        if self.on_field:
+            self.on_field(key, value)
+
+    def _close(self):
+        self._stopped = True
+        if self._keys != set(self.fields) or self._keys - set(self.output_class.model_fields):
+            return  # values and keys may be repaired afterwards, e.g. the case of keys
+        try:
+            self.output_class(**self.fields)
+        except ValidationError as e:
+            raise StreamParseError(f"Invalid content: {e}")
+
+    def _stop(self):
+        logger.debug(f"Stop parsing the stream of {self.output_class.__name__} at an unexpected character")
+        self._stopped = True
@@ -1,6 +1,10 @@
 from typing import Generator, Sequence
 
-from metagpt.utils.token_counter import TOKEN_MAX, count_output_tokens
+from metagpt.utils.token_counter import (
+    TOKEN_MAX,
+    count_output_tokens,
+    count_tokens_batch,
+)
 
 
 def reduce_message_length(
@@ -25,7 +29,7 @@ def reduce_message_length(
     """
     max_token = TOKEN_MAX.get(model_name, 2048) - count_output_tokens(system_text, model_name) - reserved
     for msg in msgs:
-        if count_output_tokens(msg, model_name) < max_token or model_name not in TOKEN_MAX:
+        if model_name not in TOKEN_MAX or count_output_tokens(msg, model_name) < max_token:
             return msg
 
     raise RuntimeError("fail to reduce message length")
@@ -53,19 +57,21 @@ def generate_prompt_chunk(
     paragraphs = text.splitlines(keepends=True)
     current_token = 0
     current_lines = []
+    # Every paragraph is counted once, pending paragraphs are kept in reverse order to be popped from the end
+    pending = list(zip(paragraphs, count_tokens_batch(paragraphs, model_name)))[::-1]
 
     reserved = reserved + count_output_tokens(prompt_template + system_text, model_name)
     # 100 is a magic number to ensure the maximum context length is not exceeded
     max_token = TOKEN_MAX.get(model_name, 2048) - reserved - 100
 
-    while paragraphs:
-        paragraph = paragraphs.pop(0)
-        token = count_output_tokens(paragraph, model_name)
+    while pending:
+        paragraph, token = pending.pop()
         if current_token + token <= max_token:
             current_lines.append(paragraph)
             current_token += token
         elif token > max_token:
-            paragraphs = split_paragraph(paragraph) + paragraphs
+            parts = split_paragraph(paragraph)
+            pending.extend(list(zip(parts, count_tokens_batch(parts, model_name)))[::-1])
             continue
         else:
             yield prompt_template.format("".join(current_lines))
@@ -10,6 +10,8 @@ ref3: https://github.com/Significant-Gravitas/Auto-GPT/blob/master/autogpt/llm/t
 ref4: https://github.com/hwchase17/langchain/blob/master/langchain/chat_models/openai.py
 ref5: https://ai.google.dev/models/gemini
 """
+from functools import lru_cache
+
 import tiktoken
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletionChunk
@@ -331,13 +333,19 @@ SPARK_TOKENS = {
 }
 
 
-def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
-    """Return the number of tokens used by a list of messages."""
+@lru_cache(maxsize=None)
+def get_token_encoding(model: str) -> tiktoken.Encoding:
+    """Return the tiktoken encoding of a model, resolved once per process."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
         logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_input_tokens(messages, model="gpt-3.5-turbo-0125"):
+    """Return the number of tokens used by a list of messages."""
+    encoding = get_token_encoding(model)
     if model in {
         "gpt-3.5-turbo-0613",
         "gpt-3.5-turbo-16k-0613",
@@ -412,12 +420,21 @@ def count_output_tokens(string: str, model: str) -> int:
     Returns:
         int: The number of tokens in the text string.
     """
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.info(f"Warning: model {model} not found in tiktoken. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
-    return len(encoding.encode(string))
+    return len(get_token_encoding(model).encode(string))
+
+
+def count_tokens_batch(strings: list[str], model: str) -> list[int]:
+    """
+    Returns the number of tokens of each text string, encoding them in parallel threads.
+
+    Args:
+        strings (list[str]): The text strings.
+        model (str): The name of the encoding to use. (e.g., "gpt-3.5-turbo")
+
+    Returns:
+        list[int]: The number of tokens in each text string.
+    """
+    return [len(tokens) for tokens in get_token_encoding(model).encode_batch(strings)]
 
 
 def get_max_completion_tokens(messages: list[dict], model: str, default: int) -> int:
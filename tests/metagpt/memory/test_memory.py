@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+@Desc   : unittest of Memory, including the cost of its indexed paths as the memory grows
+"""
+
+import time
+
+from metagpt.memory import windowed_memory
+from metagpt.memory.memory import Memory
+from metagpt.memory.windowed_memory import WindowedMemory
+from metagpt.schema import Message
+
+
+def _make_messages(n: int, prefix: str = "msg") -> list[Message]:
+    return [
+        Message(id=f"{prefix}{i}", content=f"{prefix} {i}", role="user" if i % 2 else "assistant") for i in range(n)
+    ]
+
+
+def test_memory_dedup_and_index():
+    memory = Memory()
+    messages = _make_messages(10)
+    memory.add_batch(messages)
+    memory.add_batch(messages)
+    assert memory.count() == 10
+
+    assert len(memory.get_by_role("user")) == 5
+    assert memory.find_news(messages) == []
+    news = Message(id="new", content="new")
+    assert memory.find_news(messages[:3] + [news]) == [news]
+    assert memory.find_news(messages[:3], k=2) == messages[:3]
+
+    memory.delete(messages[1])
+    assert memory.find_news([messages[1]]) == [messages[1]]
+    assert len(memory.get_by_role("user")) == 4
+
+    memory.add(Message(content="req", cause_by="tests.CustomAction"))
+    assert len(memory.get_by_action("tests.CustomAction")) == 1
+    assert memory.delete_newest().content == "req"
+    assert memory.get_by_action("tests.CustomAction") == []
+
+
+def test_memory_ignore_id():
+    memory = Memory(ignore_id=True)
+    memory.add(Message(content="same"))
+    memory.add(Message(content="same"))
+    assert memory.count() == 1
+
+
+def test_windowed_memory_tokens_and_spill(tmp_path, monkeypatch):
+    monkeypatch.setattr(windowed_memory, "count_output_tokens", lambda text, model: len(text.split()))
+    spill_path = tmp_path / "role.jsonl"
+    memory = WindowedMemory(max_messages=3, max_tokens=1000, spill_path=spill_path)
+    messages = _make_messages(5)
+    memory.add_batch(messages)
+    assert memory.get() == messages[2:]
+    assert memory.spilled == 2
+    assert memory.get_spilled() == messages[:2]
+    assert memory.find_news(messages) == []
+
+    # deleting an equal but distinct message releases its tokens
+    total = memory._total_tokens
+    memory.delete(messages[4].model_copy())
+    assert memory._total_tokens == total - len(str(messages[4]).split())
+    assert len(memory._token_counts) == 2
+
+    memory.clear()
+    assert not spill_path.exists()
+    assert memory._total_tokens == 0
+
+
+def _time_per_message(memory: Memory, messages: list[Message]) -> tuple[float, float]:
+    start = time.perf_counter()
+    memory.add_batch(messages)
+    add = (time.perf_counter() - start) / len(messages)
+    start = time.perf_counter()
+    memory.find_news(messages)
+    find_news = (time.perf_counter() - start) / len(messages)
+    return add, find_news
+
+
+def test_memory_cost_stays_flat():
+    """add and find_news cost the same per message with 1k or 100k messages in memory"""
+    probe = 1000
+    small, large = Memory(), Memory()
+    small.add_batch(_make_messages(1_000, "old"))
+    large.add_batch(_make_messages(100_000, "old"))
+
+    # best of 3 runs, against noise
+    small_costs = min(_time_per_message(small, _make_messages(probe, f"new{i}_")) for i in range(3))
+    large_costs = min(_time_per_message(large, _make_messages(probe, f"new{i}_")) for i in range(3))
+    # a linear scan would be about 100 times slower with 100k messages
+    assert large_costs[0] < small_costs[0] * 5
+    assert large_costs[1] < small_costs[1] * 5